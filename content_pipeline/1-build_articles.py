@@ -5,6 +5,8 @@ from datetime import date
 from pathlib import Path
 import re
 
+from templating import CompiledTemplate, compile_template, format_problems
+
 ROOT = Path(__file__).resolve().parents[1]  # repo root
 TEMPLATE_PATH = ROOT / "content_pipeline" / "templates" / "article_template.html"
 OUT_DIR = ROOT / "artigos"
@@ -36,11 +38,9 @@ def sanitize_html(s: str) -> str:
     s = re.sub(r"<script.*?>.*?</script>", "", s, flags=re.DOTALL | re.IGNORECASE)
     return s.strip()
 
-def render(template: str, mapping: dict[str, str]) -> str:
-    out = template
-    for k, v in mapping.items():
-        out = out.replace(f"{{{{{k}}}}}", v)
-    return out
+def render(template: CompiledTemplate, mapping: dict[str, str]) -> str:
+    # não estrito: este template antigo não casa 100% com o template atual
+    return template.render(mapping, strict=False)
 
 def make_amazon_search_url(query: str) -> str:
     q = re.sub(r"\s+", "+", query.strip())
@@ -151,17 +151,18 @@ def build_articles() -> list[Article]:
     ]
 
 def main() -> None:
-    template = TEMPLATE_PATH.read_text(encoding="utf-8")
+    template = compile_template(TEMPLATE_PATH.read_text(encoding="utf-8"))
     OUT_DIR.mkdir(parents=True, exist_ok=True)
 
     articles = build_articles()
     written = 0
+    warned = False
 
     for a in articles:
         canonical = f"{SITE_BASE}/artigos/{a.slug}.html"
         evidence_li = "\n".join([f"<li>{re.escape(x).replace('&','&amp;').replace('<','&lt;').replace('>','&gt;')}</li>" for x in a.evidence_bullets])
 
-        html = render(template, {
+        mapping = {
             "TITLE": a.title,
             "DESCRIPTION": a.description,
             "CANONICAL": canonical,
@@ -179,7 +180,14 @@ def main() -> None:
             "CTA_URL": a.cta_url,
             "CONTENT_HTML": a.content_html,
             "EVIDENCE_BULLETS": evidence_li,
-        })
+        }
+        if not warned:
+            unknown, missing = template.check(mapping)
+            if unknown or missing:
+                print(f"[WARN] {format_problems(unknown, missing)}")
+            warned = True
+
+        html = render(template, mapping)
 
         out_path = OUT_DIR / f"{a.slug}.html"
         out_path.write_text(html, encoding="utf-8")
@@ -1,25 +1,92 @@
 from __future__ import annotations
+import argparse
+import hashlib
+import io
 import json
 import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 from datetime import datetime
+from typing import Iterable, Iterator
+
+from json_stream import iter_array_items
+from listing import publish_listing
+from related import compute_related, render_related
+from search_index import article_terms, assign_ids, publish_search_index
+from templating import CompiledTemplate, TemplateError, compile_template
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_PATH = os.path.join(BASE_DIR, "content_pipeline", "data", "articles.json")
 TPL_PATH = os.path.join(BASE_DIR, "content_pipeline", "templates", "article_template.html")
 OUT_DIR = os.path.join(BASE_DIR, "artigos")
 
+# listagem enxuta e paginada consumida por artigos/index.html
+LISTING_DIR = os.path.join(OUT_DIR, "listing")
+
+# índice de busca (shards por prefixo) e o cache de termos por artigo
+SEARCH_DIR = os.path.join(OUT_DIR, "search")
+SEARCH_CACHE_PATH = os.path.join(BASE_DIR, "content_pipeline", "data", "search_cache.json")
+SEARCH_CACHE_VERSION = 1
+
+# "Leia também" de cada artigo (TF-IDF sobre os termos do índice de busca)
+RELATED_CACHE_PATH = os.path.join(BASE_DIR, "content_pipeline", "data", "related_cache.json")
+
 # 🔥 NOVO: pasta dos corpos HTML
 BODY_DIR = os.path.join(BASE_DIR, "content_pipeline", "data", "article_bodies")
 
+# manifesto do build incremental: slug -> digest das entradas + arquivo gerado
+MANIFEST_PATH = os.path.join(BASE_DIR, "content_pipeline", "data", "build_manifest.json")
+MANIFEST_VERSION = 3
+
 CANONICAL_DOMAIN = "https://saudenaturalglobal.com.br"
 
+# leituras de disco do build (articles.json, template, corpos, manifesto e
+# caches), neste processo: não passam pelo inventário do site_pipeline, então
+# o build conta e devolve em "stats" -> [arquivos, bytes]
+_READS = [0, 0]
+
+
+def count_read(path: str) -> None:
+    _READS[0] += 1
+    _READS[1] += os.path.getsize(path)
+
 
 def load_json(path: str) -> dict:
+    count_read(path)
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
+def iter_articles(path: str) -> Iterator[dict]:
+    """Lê os artigos um a um do array "articles", validando cada registro.
+
+    Não carrega o JSON inteiro (nem todos os body_html) na memória: o build
+    começa a renderizar enquanto o arquivo ainda está sendo lido.
+    """
+    count_read(path)
+    try:
+        for i, a in enumerate(iter_array_items(path, "articles"), start=1):
+            if not isinstance(a, dict):
+                raise SystemExit(f"Artigo #{i} em articles.json não é um objeto")
+            if not safe(a.get("slug")):
+                raise SystemExit(f"Artigo #{i} sem 'slug' em articles.json")
+            date_modified = a.get("date_modified")
+            if date_modified is not None:
+                try:
+                    br_date(date_modified)
+                except (TypeError, ValueError):
+                    raise SystemExit(
+                        f"Artigo '{a['slug']}' com date_modified inválido: {date_modified!r} (use AAAA-MM-DD)"
+                    )
+            yield a
+    except ValueError as e:
+        raise SystemExit(f"Erro ao ler {path}: {e}")
+
+
 def load_template(path: str) -> str:
+    count_read(path)
     with open(path, "r", encoding="utf-8") as f:
         return f.read()
 
@@ -33,87 +100,390 @@ def safe(s: str) -> str:
     return (s or "").replace("\r", "").strip()
 
 
-# 🔥 NOVA FUNÇÃO (ESSENCIAL)
-def get_body_html(article: dict) -> str:
+def read_body_file(article: dict) -> str | None:
     body_file = article.get("body_file")
+    if not body_file:
+        return None
+    body_path = os.path.join(BODY_DIR, body_file)
+    if not os.path.exists(body_path):
+        return None
+    count_read(body_path)
+    with open(body_path, "r", encoding="utf-8") as f:
+        return f.read()
 
-    if body_file:
-        body_path = os.path.join(BODY_DIR, body_file)
 
-        if os.path.exists(body_path):
-            with open(body_path, "r", encoding="utf-8") as f:
-                return f.read()
+# 🔥 NOVA FUNÇÃO (ESSENCIAL)
+def get_body_html(article: dict) -> str:
+    body = read_body_file(article)
+    if body is not None:
+        return body
 
-        else:
-            print(f"⚠️ body_file não encontrado: {body_path}")
+    if article.get("body_file"):
+        print(f"⚠️ body_file não encontrado: {os.path.join(BODY_DIR, article['body_file'])}")
 
     return safe(article.get("body_html"))
 
 
-def render(template: str, ctx: dict) -> str:
-    out = template
-    for k, v in ctx.items():
-        out = out.replace("{{" + k + "}}", str(v))
-    return out
+def sha256_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
-def ensure_dirs() -> None:
-    os.makedirs(OUT_DIR, exist_ok=True)
+def content_digest(article: dict, date_modified: str) -> str:
+    """Digest do conteúdo do artigo: registro + body_file.
 
+    date_modified entra explicitamente porque, quando ausente no JSON, o
+    builder usa a data do dia (a página muda mesmo sem mudar a entrada).
+    """
+    h = hashlib.sha256()
+    h.update(json.dumps(article, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    h.update(b"\0")
+    body = read_body_file(article)
+    h.update(b"-" if body is None else body.encode("utf-8"))
+    h.update(b"\0")
+    h.update(date_modified.encode("utf-8"))
+    return h.hexdigest()
 
-def main() -> None:
-    ensure_dirs()
-    tpl = load_template(TPL_PATH)
-    data = load_json(DATA_PATH)
 
-    articles = data.get("articles", [])
-    if not articles:
-        raise SystemExit("Nenhum artigo encontrado em content_pipeline/data/articles.json")
+def article_digest(content: str, tpl_digest: str, related_html: str = "") -> str:
+    """Digest de tudo que influencia a página: conteúdo + template + relacionados."""
+    return sha256_text(content + "\0" + tpl_digest + "\0" + related_html)
 
-    for a in articles:
-        slug = safe(a.get("slug"))
-        if not slug:
-            raise SystemExit("Artigo sem 'slug' em articles.json")
 
-        filename = f"{slug}.html"
-        canonical = f"{CANONICAL_DOMAIN}/artigos/{filename}"
+def load_manifest(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    try:
+        data = load_json(path)
+    except (OSError, ValueError):
+        print(f"⚠️ manifesto inválido, refazendo build completo: {path}")
+        return {}
+    if data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("articles", {})
 
-        date_modified = a.get("date_modified", datetime.utcnow().strftime("%Y-%m-%d"))
 
-        # 🔥 AQUI É A MUDANÇA PRINCIPAL
-        body_html = get_body_html(a)
+def load_search_cache(path: str) -> dict:
+    """slug -> {"digest" (do conteúdo), "id" (fixo), "title", "pillar", "description", "terms"}."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        data = load_json(path)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != SEARCH_CACHE_VERSION:
+        return {}
+    return data.get("docs", {})
+
+
+def save_search_cache(path: str, docs: dict) -> None:
+    payload = {"version": SEARCH_CACHE_VERSION, "docs": dict(sorted(docs.items()))}
+    write_atomic(path, json.dumps(payload, ensure_ascii=False, separators=(",", ":")) + "\n")
+
 
-        ctx = {
-            "TITLE": safe(a.get("title")),
-            "DESCRIPTION": safe(a.get("description")),
-            "CANONONICAL": canonical,
-            "CANONICAL": canonical,
+def save_manifest(path: str, entries: dict) -> None:
+    payload = {"version": MANIFEST_VERSION, "articles": dict(sorted(entries.items()))}
+    write_atomic(path, json.dumps(payload, ensure_ascii=False, indent=2) + "\n")
 
-            "OG_TITLE": safe(a.get("og_title") or a.get("title")),
-            "OG_DESCRIPTION": safe(a.get("og_description") or a.get("description")),
-            "OG_IMAGE": safe(a.get("og_image") or "https://images.unsplash.com/photo-1589923188900-85dae523342b?q=80&w=1600&auto=format&fit=crop"),
 
-            "PILLAR": safe(a.get("pillar", "Conteúdo")),
-            "H1": safe(a.get("h1") or a.get("title")),
-            "INTRO": safe(a.get("intro")),
-            "READ_TIME": safe(a.get("read_time", "6–8 min")),
-            "DATE_MODIFIED": date_modified,
-            "DATE_MODIFIED_BR": br_date(date_modified),
+def write_atomic(path: str, text: str) -> None:
+    """Escreve em <path>.tmp e renomeia: nunca fica uma página pela metade."""
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
 
-            # 🔥 AGORA VEM DO ARQUIVO OU FALLBACK
-            "BODY_HTML": body_html,
 
-            "EVIDENCE": safe(a.get("evidence")),
-            "CTA_URL": safe(a.get("cta_url")),
-        }
+def render(template: CompiledTemplate, ctx: dict) -> str:
+    return template.render(ctx)
 
-        html = render(tpl, ctx)
-        out_path = os.path.join(OUT_DIR, filename)
 
-        with open(out_path, "w", encoding="utf-8") as f:
-            f.write(html)
+def ensure_dirs() -> None:
+    os.makedirs(OUT_DIR, exist_ok=True)
+
+
+def build_context(a: dict, slug: str, date_modified: str, body_html: str | None = None,
+                  related_html: str = "") -> dict:
+    filename = f"{slug}.html"
+    canonical = f"{CANONICAL_DOMAIN}/artigos/{filename}"
 
-        print(f"OK: gerado {out_path}")
+    # 🔥 AQUI É A MUDANÇA PRINCIPAL
+    if body_html is None:
+        body_html = get_body_html(a)
+
+    return {
+        "TITLE": safe(a.get("title")),
+        "DESCRIPTION": safe(a.get("description")),
+        "CANONICAL": canonical,
+
+        "OG_TITLE": safe(a.get("og_title") or a.get("title")),
+        "OG_DESCRIPTION": safe(a.get("og_description") or a.get("description")),
+        "OG_IMAGE": safe(a.get("og_image") or "https://images.unsplash.com/photo-1589923188900-85dae523342b?q=80&w=1200&h=630&auto=format&fit=crop"),
+
+        "PILLAR": safe(a.get("pillar", "Conteúdo")),
+        "H1": safe(a.get("h1") or a.get("title")),
+        "INTRO": safe(a.get("intro")),
+        "READ_TIME": safe(a.get("read_time", "6–8 min")),
+        "DATE_MODIFIED": date_modified,
+        "DATE_MODIFIED_BR": br_date(date_modified),
+
+        # 🔥 AGORA VEM DO ARQUIVO OU FALLBACK
+        "BODY_HTML": body_html,
+
+        "EVIDENCE": safe(a.get("evidence")),
+        "CTA_URL": safe(a.get("cta_url")),
+        "RELATED_HTML": related_html,
+    }
+
+
+# template compilado do processo atual (no modo --jobs, um por worker)
+_WORKER_TPL: CompiledTemplate | None = None
+
+
+def init_worker(tpl_source: str) -> None:
+    global _WORKER_TPL
+    _WORKER_TPL = compile_template(tpl_source)
+
+
+def search_fields(a: dict, body_html: str) -> dict:
+    return {
+        "title": safe(a.get("title")),
+        "description": safe(a.get("description")),
+        "intro": safe(a.get("intro")),
+        "body": body_html,
+    }
+
+
+def index_article(job: tuple) -> tuple:
+    """1ª passada: digest do conteúdo e, se ele mudou, os termos de busca.
+
+    Os relacionados dependem dos termos de todos os artigos, então nenhuma
+    página é renderizada antes desta passada terminar. Roda tanto no
+    processo principal quanto nos workers do --jobs; os prints (ex.:
+    body_file ausente) são capturados e devolvidos, para o processo
+    principal imprimir na ordem do articles.json.
+
+    Retorna (slug, digest do conteúdo, termos ou None, log, (início, duração, pid),
+    leituras de disco [arquivos, bytes]).
+    """
+    start = time.perf_counter()
+    reads = list(_READS)
+    a, slug, date_modified, prev_content = job
+    log = io.StringIO()
+    with redirect_stdout(log):
+        content = content_digest(a, date_modified)
+        terms = None
+        if content != prev_content:
+            terms = article_terms(search_fields(a, get_body_html(a)))
+    return (slug, content, terms, log.getvalue(), (start, time.perf_counter() - start, os.getpid()),
+            [_READS[0] - reads[0], _READS[1] - reads[1]])
+
+
+def build_article(job: tuple) -> tuple:
+    """2ª passada: renderiza o artigo se a página (conteúdo, template ou
+    relacionados) mudou.
+
+    Retorna (slug, digest da página, html ou None, log, (início, duração, pid),
+    leituras de disco [arquivos, bytes]).
+    """
+    start = time.perf_counter()
+    reads = list(_READS)
+    a, slug, date_modified, content, tpl_digest, related_html, prev_digest = job
+    log = io.StringIO()
+    with redirect_stdout(log):
+        digest = article_digest(content, tpl_digest, related_html)
+        html = None
+        if digest != prev_digest:
+            try:
+                html = render(_WORKER_TPL, build_context(a, slug, date_modified, related_html=related_html))
+            except TemplateError as e:
+                raise TemplateError(f"ao gerar '{slug}': {e}") from None
+    return (slug, digest, html, log.getvalue(), (start, time.perf_counter() - start, os.getpid()),
+            [_READS[0] - reads[0], _READS[1] - reads[1]])
+
+
+def map_ordered(pool: ProcessPoolExecutor, fn, items: Iterable, window: int) -> Iterator:
+    """Como pool.map, mas com no máximo `window` tarefas em voo.
+
+    pool.map consome o iterável inteiro antes de começar; aqui a leitura do
+    articles.json acompanha a renderização e a memória fica limitada.
+    """
+    pending: deque = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Gera as páginas de artigos a partir de articles.json.")
+    parser.add_argument("--force", action="store_true",
+                        help="ignora o manifesto e regera todas as páginas")
+    parser.add_argument("--jobs", type=int, default=1, metavar="N",
+                        help="renderiza em N processos (padrão: 1, serial)")
+    return parser.parse_args(argv)
+
+
+def build(force: bool = False, jobs: int = 1, exists=os.path.exists) -> dict:
+    """Roda o build e devolve o que mudou no disco: {"written": [...], "removed": [...]}.
+
+    `exists` permite ao pipeline responder pelo inventário em memória em vez
+    de ir ao disco para cada página. "stats" traz o tempo de cada artigo nas
+    duas passadas (índice e página), quantos saíram do manifesto (hits) ou
+    foram renderizados (misses) e as leituras de disco do build ("read",
+    somando as dos workers do --jobs).
+    """
+    reads_at_start = list(_READS)
+    worker_reads = [0, 0]
+    ensure_dirs()
+    tpl_source = load_template(TPL_PATH)
+    tpl_digest = sha256_text(tpl_source)
+
+    previous = {} if force else load_manifest(MANIFEST_PATH)
+    current: dict[str, dict] = {}
+    search_prev = {} if force else load_search_cache(SEARCH_CACHE_PATH)
+    search_docs: dict[str, dict] = {}
+    written: list[str] = []
+    removed: list[str] = []
+    listing: list[dict] = []
+    records: dict[str, dict] = {}
+    timings: list[tuple] = []
+    skipped = 0
+
+    def index_jobs():
+        for a in iter_articles(DATA_PATH):
+            slug = safe(a.get("slug"))
+            date_modified = a.get("date_modified", datetime.utcnow().strftime("%Y-%m-%d"))
+            record = {
+                "slug": slug,
+                "title": safe(a.get("title")),
+                "pillar": safe(a.get("pillar", "Conteúdo")),
+                "description": safe(a.get("description")),
+                "date_modified": date_modified,
+            }
+            listing.append(record)
+            records[slug] = record
+            prev_content = search_prev.get(slug, {}).get("digest")
+            yield (a, slug, date_modified, prev_content)
+
+    def render_jobs():
+        # articles.json é lido de novo (em streaming) em vez de guardar os artigos
+        for a in iter_articles(DATA_PATH):
+            slug = safe(a.get("slug"))
+            out_path = os.path.join(OUT_DIR, f"{slug}.html")
+
+            # sem manifesto ou sem a página no disco: força a renderização
+            prev = previous.get(slug)
+            prev_digest = prev.get("digest") if prev and exists(out_path) else None
+
+            related_html = render_related([records[r] for r in related.get(slug, []) if r in records])
+            yield (a, slug, records[slug]["date_modified"], search_docs[slug]["digest"],
+                   tpl_digest, related_html, prev_digest)
+
+    if jobs > 1:
+        pool = ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(tpl_source,))
+    else:
+        pool = None
+        init_worker(tpl_source)
+
+    def run(fn, items):
+        return map(fn, items) if pool is None else map_ordered(pool, fn, items, window=jobs * 4)
+
+    def page_rel(slug: str) -> str:
+        return os.path.relpath(os.path.join(OUT_DIR, f"{slug}.html"), BASE_DIR).replace(os.sep, "/")
+
+    try:
+        # map devolve na ordem de entrada: escrita e log determinísticos
+        warned = set()
+        for slug, content, terms, log, timing, reads in run(index_article, index_jobs()):
+            if pool is not None:
+                worker_reads = [worker_reads[0] + reads[0], worker_reads[1] + reads[1]]
+            if log:
+                print(log, end="")
+                warned.add(slug)
+            timings.append((page_rel(slug), *timing))
+
+            # termos só são recalculados quando o conteúdo muda
+            item = records[slug]
+            search_docs[slug] = {
+                "digest": content,
+                "id": search_prev.get(slug, {}).get("id"),
+                "title": item["title"],
+                "pillar": item["pillar"],
+                "description": item["description"],
+                "terms": terms if terms is not None else search_prev[slug]["terms"],
+            }
+
+        if not search_docs:
+            raise SystemExit("Nenhum artigo encontrado em content_pipeline/data/articles.json")
+        assign_ids(search_docs)
+
+        related, changed = compute_related(search_docs, RELATED_CACHE_PATH, force=force)
+        if changed:
+            written.append(RELATED_CACHE_PATH)
+
+        for slug, digest, html, log, timing, reads in run(build_article, render_jobs()):
+            if pool is not None:
+                worker_reads = [worker_reads[0] + reads[0], worker_reads[1] + reads[1]]
+            if log and slug not in warned:  # o aviso já saiu na 1ª passada
+                print(log, end="")
+
+            out_path = os.path.join(OUT_DIR, f"{slug}.html")
+            timings.append((page_rel(slug), *timing))
+            current[slug] = {"digest": digest, "output": os.path.relpath(out_path, BASE_DIR)}
+
+            if html is None:
+                skipped += 1
+                continue
+
+            write_atomic(out_path, html)
+            written.append(out_path)
+            print(f"OK: gerado {out_path}")
+    except TemplateError as e:
+        raise SystemExit(f"Template inválido: {e}")
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    # remove páginas de slugs que saíram do articles.json
+    for slug, prev in previous.items():
+        if slug in current:
+            continue
+        stale = os.path.join(BASE_DIR, prev.get("output", ""))
+        if prev.get("output") and os.path.isfile(stale):
+            os.remove(stale)
+            removed.append(stale)
+            print(f"OK: removido {stale}")
+
+    if current != previous:
+        save_manifest(MANIFEST_PATH, current)
+        written.append(MANIFEST_PATH)
+
+    if search_docs != search_prev:
+        save_search_cache(SEARCH_CACHE_PATH, search_docs)
+        written.append(SEARCH_CACHE_PATH)
+
+    # listagem e busca: sempre recalculadas (são baratas), mas só grava o que mudou
+    for result in (publish_listing(listing, LISTING_DIR), publish_search_index(search_docs, SEARCH_DIR)):
+        written += result["written"]
+        removed += result["removed"]
+
+    pages = len([p for p in written if p.endswith(".html")])
+    print(f"OK: {pages} gerado(s), {skipped} sem alteração, {len(removed)} removido(s).")
+    read = [_READS[0] - reads_at_start[0] + worker_reads[0], _READS[1] - reads_at_start[1] + worker_reads[1]]
+    return {"written": written, "removed": removed,
+            "stats": {"files": timings, "hits": skipped, "misses": len(current) - skipped, "read": read}}
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    build(force=args.force, jobs=args.jobs)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,110 @@
+from __future__ import annotations
+import json
+from typing import Iterator
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = " \t\n\r"
+# o que pode vir logo depois de um valor completo
+DELIMITERS = WHITESPACE + ",]}:"
+
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Buffer de texto que lê o arquivo aos pedaços e descarta o que já foi consumido."""
+
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size: int | None = None) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # compacta: mantém só o que ainda não foi consumido
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Próximo caractere não-branco (sem consumir); "" no fim do arquivo."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, ch: str) -> None:
+        got = self.peek()
+        if got != ch:
+            raise ValueError(f"JSON inválido: esperado {ch!r}, encontrado {got!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decodifica um valor JSON completo a partir da posição atual."""
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                obj, end = None, None
+            # número cortado no meio do bloco ("1." de "1.5") decodifica sem
+            # erro: só aceita o valor se depois dele vier um delimitador
+            if end is not None and (self.eof or (end < len(self.buf) and self.buf[end] in DELIMITERS)):
+                self.pos = end
+                return obj
+            if not self.fill(size):
+                if end is not None:
+                    self.pos = end
+                    return obj
+                raise ValueError("JSON inválido ou truncado")
+            # valores grandes: lê em blocos crescentes para não redecodificar demais
+            size *= 2
+
+
+def iter_array_items(path: str, key: str, chunk_size: int = CHUNK_SIZE) -> Iterator:
+    """Itera os itens de data[key] sem carregar o documento inteiro.
+
+    Espera um objeto JSON no topo; os outros campos são decodificados e
+    descartados. A memória fica limitada ao maior item do array.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        r = _Reader(f, chunk_size)
+        r.expect("{")
+        if r.peek() == "}":
+            return
+        while True:
+            name = r.value()
+            if not isinstance(name, str):
+                raise ValueError("JSON inválido: chave do objeto não é string")
+            r.expect(":")
+
+            if name == key:
+                r.expect("[")
+                if r.peek() == "]":
+                    r.pos += 1
+                else:
+                    while True:
+                        yield r.value()
+                        if r.peek() == ",":
+                            r.pos += 1
+                            continue
+                        r.expect("]")
+                        break
+            else:
+                r.value()
+
+            if r.peek() == ",":
+                r.pos += 1
+                continue
+            r.expect("}")
+            return
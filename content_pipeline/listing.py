@@ -0,0 +1,123 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import re
+import unicodedata
+
+# itens por página da listagem /artigos
+PAGE_SIZE = 24
+
+# variante com todos os artigos; as demais são uma por pilar
+ALL_VARIANT = "todos"
+
+# campos publicados (o resto do articles.json, inclusive body_html, fica de fora)
+LISTING_FIELDS = ("slug", "title", "pillar", "description", "date_modified")
+
+MANIFEST_NAME = "index.json"
+
+
+def slugify(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "outros"
+
+
+def sort_items(records: list[dict]) -> list[dict]:
+    """Mais recente primeiro; empate: título em ordem alfabética (A→Z).
+
+    Duas passadas estáveis: um reverse=True na chave (data, título)
+    inverteria também os títulos empatados.
+    """
+    items = sorted(records, key=lambda item: item["title"])
+    items.sort(key=lambda item: item["date_modified"], reverse=True)
+    return items
+
+
+def dumps(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def paginate(items: list, page_size: int = PAGE_SIZE) -> list[list]:
+    return [items[i:i + page_size] for i in range(0, len(items), page_size)] or [[]]
+
+
+def build_listing(records: list[dict], page_size: int = PAGE_SIZE) -> tuple[dict, dict]:
+    """Monta as páginas e o manifesto da listagem.
+
+    Retorna (manifesto, {nome do arquivo: conteúdo}). Os nomes levam o hash
+    do conteúdo, então podem ser cacheados para sempre; só o manifesto
+    (index.json) precisa ser revalidado.
+    """
+    items = sort_items(records)
+
+    variants = {ALL_VARIANT: ("Todos", items)}
+    for item in items:
+        key = slugify(item["pillar"])
+        if key == ALL_VARIANT:
+            key += "-pilar"
+        variants.setdefault(key, (item["pillar"], []))[1].append(item)
+
+    files = {}
+    manifest = {"page_size": page_size, "total": len(items), "variants": {}}
+    for key, (label, variant_items) in variants.items():
+        pages = paginate(variant_items, page_size)
+        names = []
+        for n, page_items in enumerate(pages, start=1):
+            body = dumps({"page": n, "pages": len(pages), "items": page_items}) + "\n"
+            name = hashed_name(f"{key}-{n}", body)
+            files[name] = body
+            names.append(name)
+        manifest["variants"][key] = {"label": label, "total": len(variant_items), "pages": names}
+    return manifest, files
+
+
+def publish_listing(records: list[dict], out_dir: str, page_size: int = PAGE_SIZE) -> dict:
+    """Escreve a listagem em out_dir; devolve {"written": [...], "removed": [...]}."""
+    manifest, files = build_listing(records, page_size)
+    return publish_hashed(out_dir, files, MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=2) + "\n")
+
+
+def hashed_name(stem: str, body: str) -> str:
+    digest = hashlib.sha256(body.encode("utf-8")).hexdigest()[:12]
+    return f"{stem}.{digest}.json"
+
+
+def write_text(path: str, text: str) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def publish_hashed(out_dir: str, files: dict, manifest_name: str, manifest_text: str) -> dict:
+    """Publica arquivos com hash no nome + um manifesto sem hash.
+
+    Arquivos que já existem não são regravados (mesmo nome = mesmo
+    conteúdo); os .json que o manifesto não cita mais são apagados.
+    Devolve {"written": [...], "removed": [...]}.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    written, removed = [], []
+
+    for name, body in files.items():
+        path = os.path.join(out_dir, name)
+        if not os.path.exists(path):
+            write_text(path, body)
+            written.append(path)
+
+    manifest_path = os.path.join(out_dir, manifest_name)
+    old = None
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            old = f.read()
+    if old != manifest_text:
+        write_text(manifest_path, manifest_text)
+        written.append(manifest_path)
+
+    for name in sorted(os.listdir(out_dir)):
+        if name != manifest_name and name.endswith(".json") and name not in files:
+            os.remove(os.path.join(out_dir, name))
+            removed.append(os.path.join(out_dir, name))
+
+    return {"written": written, "removed": removed}
@@ -0,0 +1,252 @@
+from __future__ import annotations
+import argparse
+import hashlib
+import heapq
+import html
+import json
+import math
+import os
+import random
+import time
+from collections import Counter, defaultdict
+
+try:  # opcional: com numpy + scipy a similaridade vira produto de matrizes esparsas
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = sparse = None
+
+# quantos "Leia também" por artigo
+RELATED_K = 4
+
+# cada artigo entra com os termos de maior TF-IDF: o resto pesa pouco no
+# cosseno e só alongaria as listas invertidas
+MAX_TERMS = 40
+
+# termos presentes em muitos artigos ("saude", "suplemento") quase não
+# distinguem um do outro e dominam o custo: cada termo custa df² somas. Ficam
+# de fora os que estão em mais de MAX_DF_RATIO do corpus (e em mais de
+# MIN_DF_CAP artigos, para não esvaziar sites pequenos)
+MAX_DF_RATIO = 0.05
+MIN_DF_CAP = 50
+
+# casas decimais do score na ordenação: numpy e Python somam em ordens
+# diferentes, e o desempate (slug) precisa ser o mesmo nos dois
+SCORE_DIGITS = 9
+
+# linhas da matriz de similaridade calculadas por vez (numpy); o bloco fica
+# esparso, então a memória acompanha os pares com termo em comum, não N
+BLOCK_ROWS = 512
+
+CACHE_VERSION = 1
+
+
+def tfidf_vectors(docs: dict) -> tuple[list[str], list[dict]]:
+    """docs: slug -> {"terms": {termo: peso}} (os termos do índice de busca).
+
+    O peso do termo no artigo já soma título, descrição, intro e corpo com
+    pesos por campo; aqui vira TF sublinear x IDF, sem os termos comuns
+    demais, cortado em MAX_TERMS e normalizado (norma 1), para o produto
+    escalar ser o cosseno. As duas implementações usam estes mesmos vetores.
+    """
+    slugs = sorted(docs)
+    n = len(slugs)
+    df = Counter(t for s in slugs for t in docs[s]["terms"])
+    max_df = max(MIN_DF_CAP, MAX_DF_RATIO * n)
+    idf = {t: math.log((1 + n) / (1 + c)) for t, c in df.items() if c <= max_df}
+    vectors = []
+    for s in slugs:
+        weights = {t: (1 + math.log(tf)) * idf[t] for t, tf in docs[s]["terms"].items()
+                   if tf > 0 and t in idf}
+        top = heapq.nlargest(MAX_TERMS, weights.items(), key=lambda kv: (kv[1], kv[0]))
+        norm = math.sqrt(sum(w * w for _, w in top))
+        vectors.append({t: w / norm for t, w in top if w > 0} if norm else {})
+    return slugs, vectors
+
+
+def pick(slugs: list[str], i: int, scores, k: int) -> list[str]:
+    """Os k vizinhos de maior score (> 0); empate: slug."""
+    best = heapq.nsmallest(k, ((-round(float(score), SCORE_DIGITS), slugs[j])
+                               for j, score in scores if j != i and score > 0))
+    return [slug for _, slug in best]
+
+
+def top_k_python(slugs: list[str], vectors: list[dict], k: int) -> dict:
+    """Cosseno por lista invertida: só pares que dividem algum termo são somados."""
+    postings = defaultdict(list)
+    for j, vec in enumerate(vectors):
+        for t, w in vec.items():
+            postings[t].append((j, w))
+    related = {}
+    for i, vec in enumerate(vectors):
+        scores = defaultdict(float)
+        for t, w in vec.items():
+            for j, wj in postings[t]:
+                scores[j] += w * wj
+        related[slugs[i]] = pick(slugs, i, scores.items(), k)
+    return related
+
+
+def top_k_numpy(slugs: list[str], vectors: list[dict], k: int) -> dict:
+    """X (artigos x termos, esparsa) vezes X transposta, em blocos de linhas.
+
+    O produto continua esparso (CSR): cada linha só tem os artigos que
+    dividem algum termo com ela, e o top-k sai direto de data/indices.
+    """
+    vocab = {t: c for c, t in enumerate(sorted({t for vec in vectors for t in vec}))}
+    indptr, indices, data = [0], [], []
+    for vec in vectors:
+        for t, w in sorted(vec.items()):
+            indices.append(vocab[t])
+            data.append(w)
+        indptr.append(len(indices))
+    x = sparse.csr_matrix((np.array(data, dtype=np.float64), indices, indptr),
+                          shape=(len(vectors), len(vocab)))
+    xt = x.T.tocsc()
+    related = {}
+    for start in range(0, len(vectors), BLOCK_ROWS):
+        block = (x[start:start + BLOCK_ROWS] @ xt).tocsr()
+        for r in range(block.shape[0]):
+            i = start + r
+            lo, hi = block.indptr[r], block.indptr[r + 1]
+            cols, vals = block.indices[lo:hi], block.data[lo:hi]
+            keep = vals > 0
+            cols, vals = cols[keep], vals[keep]
+            # folga além de k para o desempate por slug ver todos os empatados
+            if len(cols) > 4 * k + 1:
+                top = np.argpartition(vals, -(4 * k + 1))[-(4 * k + 1):]
+                cols, vals = cols[top], vals[top]
+            related[slugs[i]] = pick(slugs, i, zip(cols.tolist(), vals.tolist()), k)
+    return related
+
+
+def related_articles(docs: dict, k: int = RELATED_K) -> dict:
+    """slug -> até k slugs mais parecidos (TF-IDF + cosseno)."""
+    slugs, vectors = tfidf_vectors(docs)
+    if np is not None and len(slugs) > 1:
+        return top_k_numpy(slugs, vectors, k)
+    return top_k_python(slugs, vectors, k)
+
+
+def corpus_digest(docs: dict, k: int) -> str:
+    """Muda quando algum artigo entra, sai ou muda de conteúdo (o IDF é do corpus todo)."""
+    h = hashlib.sha256(f"{CACHE_VERSION}\0{k}\0{MAX_TERMS}\0{MAX_DF_RATIO}\0{MIN_DF_CAP}\0".encode("utf-8"))
+    for slug in sorted(docs):
+        h.update(f"{slug}\0{docs[slug]['digest']}\0".encode("utf-8"))
+    return h.hexdigest()
+
+
+def load_cache(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if data.get("version") == CACHE_VERSION else {}
+
+
+def compute_related(docs: dict, cache_path: str, force: bool = False, k: int = RELATED_K) -> tuple[dict, bool]:
+    """Relacionados de todos os artigos, reaproveitando o cache se o corpus não mudou.
+
+    docs: o cache de busca do build (slug -> {"digest", "terms", ...}).
+    Retorna (slug -> [slugs], se o cache foi regravado).
+    """
+    digest = corpus_digest(docs, k)
+    cache = {} if force else load_cache(cache_path)
+    if cache.get("corpus") == digest:
+        return cache["related"], False
+
+    t0 = time.perf_counter()
+    related = related_articles(docs, k)
+    ms = (time.perf_counter() - t0) * 1000
+    engine = "numpy" if np is not None else "python"
+    print(f"OK: artigos relacionados de {len(docs)} artigo(s) em {ms:.0f} ms ({engine})")
+
+    payload = {"version": CACHE_VERSION, "corpus": digest, "related": related}
+    tmp = cache_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(json.dumps(payload, ensure_ascii=False, separators=(",", ":")) + "\n")
+    os.replace(tmp, cache_path)
+    return related, True
+
+
+def render_related(items: list[dict]) -> str:
+    """Bloco "Leia também" do template; vazio quando não há relacionados."""
+    if not items:
+        return ""
+    links = "\n".join(
+        f'        <li><a href="./{html.escape(it["slug"])}.html" class="block rounded-xl border border-slate-200 '
+        f'p-4 hover:border-emerald-600 transition">'
+        f'<span class="text-xs font-semibold text-emerald-700 uppercase">{html.escape(it["pillar"])}</span>'
+        f'<span class="mt-1 block font-semibold text-slate-900">{html.escape(it["title"])}</span></a></li>'
+        for it in items
+    )
+    return (
+        '<section class="mt-10">\n'
+        '      <h2 class="text-xl font-bold tracking-tight">Leia também</h2>\n'
+        '      <ul class="mt-4 grid gap-3 sm:grid-cols-2">\n'
+        f"{links}\n"
+        "      </ul>\n"
+        "    </section>"
+    )
+
+
+def synthetic_docs(n: int, seed: int = 1) -> dict:
+    """Corpus artificial: cada artigo mistura palavras do seu tema com um
+    vocabulário geral de frequência Zipf, como texto de verdade."""
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(50_000)]
+    zipf = [1 / (i + 1) for i in range(len(vocab))]
+    topics = [[f"t{t}x{i}" for i in range(30)] for t in range(max(1, n // 40))]
+    docs = {}
+    for d in range(n):
+        terms = Counter(rng.choices(vocab, zipf, k=300))
+        terms.update(rng.choices(rng.choice(topics), k=25))
+        docs[f"artigo-{d}"] = {"digest": "", "terms": dict(terms)}
+    return docs
+
+
+def bench(n: int) -> None:
+    docs = synthetic_docs(n)
+    for engine in ("python", "numpy"):
+        if engine == "numpy" and np is None:
+            print("numpy:   (numpy/scipy não instalados)")
+            continue
+        t0 = time.perf_counter()
+        slugs, vectors = tfidf_vectors(docs)
+        t1 = time.perf_counter()
+        (top_k_numpy if engine == "numpy" else top_k_python)(slugs, vectors, RELATED_K)
+        t2 = time.perf_counter()
+        print(f"{engine + ':':<8} {len(docs)} artigos, vetores {(t1 - t0) * 1000:.0f} ms, "
+              f"vizinhos {(t2 - t1) * 1000:.0f} ms")
+
+
+def check_parity(n: int) -> int:
+    """numpy e Python têm de dar os mesmos relacionados; devolve o código de saída."""
+    if np is None:
+        print("ERRO: numpy/scipy não instalados (pip install -r scripts/requirements.txt)")
+        return 1
+    slugs, vectors = tfidf_vectors(synthetic_docs(n))
+    expected = top_k_python(slugs, vectors, RELATED_K)
+    got = top_k_numpy(slugs, vectors, RELATED_K)
+    diff = [s for s in slugs if expected[s] != got[s]]
+    if diff:
+        print(f"ERRO: numpy e Python divergem em {len(diff)} de {len(slugs)} artigo(s), ex.: "
+              f"{diff[0]}: {got[diff[0]]} != {expected[diff[0]]}")
+        return 1
+    print(f"OK: numpy e Python iguais em {len(slugs)} artigo(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dos artigos relacionados.")
+    parser.add_argument("--articles", type=int, default=10_000,
+                        help="tamanho do corpus artificial (padrão: 10000)")
+    parser.add_argument("--check", action="store_true",
+                        help="compara numpy e Python no corpus artificial (sai com erro se divergirem)")
+    args = parser.parse_args()
+    if args.check:
+        raise SystemExit(check_parity(args.articles))
+    bench(args.articles)
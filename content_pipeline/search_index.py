@@ -0,0 +1,173 @@
+from __future__ import annotations
+import argparse
+import html
+import io
+import json
+import re
+import time
+import unicodedata
+from collections import Counter
+from contextlib import redirect_stdout
+
+from listing import dumps, hashed_name, publish_hashed
+
+MANIFEST_NAME = "index.json"
+
+# termos são agrupados em shards pelas primeiras letras: o navegador só baixa
+# os shards dos termos da busca
+PREFIX_LEN = 2
+
+# peso de cada campo no score
+FIELD_WEIGHTS = {"title": 5, "description": 3, "intro": 2, "body": 1}
+
+MIN_TERM_LEN = 2
+
+# metadados dos docs (slug, título, ...) em blocos de ids consecutivos: a
+# busca baixa só os blocos dos resultados, não a lista do site inteiro
+DOCS_PER_SHARD = 256
+
+# stopwords em português já sem acento (o texto é normalizado antes)
+STOPWORDS = frozenset("""
+a ao aos as ate com como da das de dela dele deles do dos e ela elas ele eles em entre
+era essa esse esta este eu foi ha isso isto ja lhe mais mas me mesmo meu minha muito na
+nao nas nem no nos num numa o os ou para pela pelas pelo pelos por qual quando que quem
+se sem ser seu seus sua suas so tambem te tem tu um uma umas uns voce voces vai sao
+""".split())
+
+TAG_RE = re.compile(r"<[^>]+>")
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def fold(text: str) -> str:
+    """Minúsculas e sem acento: "Vitamina Ação" -> "vitamina acao"."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> list[str]:
+    text = html.unescape(TAG_RE.sub(" ", text or ""))
+    return [t for t in TOKEN_RE.findall(fold(text))
+            if len(t) >= MIN_TERM_LEN and t not in STOPWORDS]
+
+
+def article_terms(fields: dict) -> dict:
+    """Peso de cada termo no artigo: frequência por campo x peso do campo."""
+    weights = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        for term in tokenize(fields.get(field, "")):
+            weights[term] += weight
+    return dict(weights)
+
+
+def assign_ids(docs: dict) -> None:
+    """Põe "id" nos docs que ainda não têm.
+
+    O id fica no cache de busca e não muda enquanto o artigo existir: um
+    artigo novo no começo do alfabeto não desloca os outros, e só o bloco
+    de docs e os shards dos termos dele são regravados. Artigo novo pega o
+    menor id livre (os de artigos removidos são reaproveitados).
+    """
+    used = {d["id"] for d in docs.values() if d.get("id") is not None}
+    free = (i for i in range(len(docs) + len(used)) if i not in used)
+    for slug in sorted(docs):
+        if docs[slug].get("id") is None:
+            docs[slug]["id"] = next(free)
+
+
+def build_index(docs: dict) -> tuple[dict, dict]:
+    """docs: slug -> {"id", "title", "pillar", "description", "terms"}.
+
+    Retorna (manifesto, {arquivo: conteúdo}). Cada shard guarda
+    termo -> [[id do doc, peso], ...]; os docs (id -> slug/título/...)
+    ficam em blocos de DOCS_PER_SHARD ids: o doc `id` está no bloco
+    id // DOCS_PER_SHARD, na posição id % DOCS_PER_SHARD (id livre: null).
+    """
+    assign_ids(docs)
+    by_id = sorted(docs, key=lambda s: docs[s]["id"])
+    doc_rows = [None] * (docs[by_id[-1]]["id"] + 1 if by_id else 0)
+    for s in by_id:
+        doc_rows[docs[s]["id"]] = [s, docs[s]["title"], docs[s]["pillar"], docs[s]["description"]]
+
+    postings: dict[str, dict[str, list]] = {}
+    for slug in by_id:
+        doc_id = docs[slug]["id"]
+        for term, weight in docs[slug]["terms"].items():
+            postings.setdefault(term[:PREFIX_LEN], {}).setdefault(term, []).append([doc_id, weight])
+
+    files = {}
+    docs_names = []
+    for n, start in enumerate(range(0, len(doc_rows), DOCS_PER_SHARD)):
+        body = dumps(doc_rows[start:start + DOCS_PER_SHARD]) + "\n"
+        name = hashed_name(f"docs-{n}", body)
+        files[name] = body
+        docs_names.append(name)
+
+    shards = {}
+    for prefix in sorted(postings):
+        terms = postings[prefix]
+        body = dumps({t: terms[t] for t in sorted(terms)}) + "\n"
+        name = hashed_name(f"t-{prefix}", body)
+        files[name] = body
+        shards[prefix] = name
+
+    manifest = {
+        "prefix_len": PREFIX_LEN,
+        "min_term_len": MIN_TERM_LEN,
+        "stopwords": sorted(STOPWORDS),
+        "docs_per_shard": DOCS_PER_SHARD,
+        "docs": docs_names,
+        "shards": shards,
+    }
+    return manifest, files
+
+
+def publish_search_index(docs: dict, out_dir: str) -> dict:
+    t0 = time.perf_counter()
+    manifest, files = build_index(docs)
+    result = publish_hashed(out_dir, files, MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=2) + "\n")
+    size = sum(len(b.encode("utf-8")) for b in files.values())
+    ms = (time.perf_counter() - t0) * 1000
+    print(f"OK: índice de busca com {len(docs)} artigo(s), {len(manifest['shards'])} shard(s), "
+          f"{size / 1024:.1f} KiB em {ms:.0f} ms")
+    return result
+
+
+def bench(copies: int) -> None:
+    """Mede o índice sobre o articles.json real replicado `copies` vezes."""
+    from build_articles import DATA_PATH, get_body_html, iter_articles, safe, search_fields
+
+    base = list(iter_articles(DATA_PATH))
+    t0 = time.perf_counter()
+    docs = {}
+    for i in range(copies):
+        for a in base:
+            # os avisos de body_file ausente já aparecem no build; aqui repetiriam `copies` vezes
+            with redirect_stdout(io.StringIO()):
+                body_html = get_body_html(a)
+            fields = search_fields(a, body_html)
+            docs[f"{a['slug']}-{i}"] = {
+                "title": fields["title"], "pillar": safe(a.get("pillar", "Conteúdo")),
+                "description": fields["description"], "terms": article_terms(fields),
+            }
+    t1 = time.perf_counter()
+    manifest, files = build_index(docs)
+    t2 = time.perf_counter()
+
+    sizes = {name: len(b.encode("utf-8")) for name, b in files.items()}
+    docs_sizes = [sizes[name] for name in manifest["docs"]]
+    shard_sizes = sorted(sizes[name] for name in manifest["shards"].values()) or [0]
+    print(f"artigos:       {len(docs)}")
+    print(f"tokenização:   {(t1 - t0) * 1000:.0f} ms")
+    print(f"montagem:      {(t2 - t1) * 1000:.0f} ms")
+    print(f"shards:        {len(manifest['shards'])}")
+    print(f"tamanho total: {sum(sizes.values()) / 1024:.1f} KiB "
+          f"(docs {sum(docs_sizes) / 1024:.1f} KiB em {len(docs_sizes)} bloco(s), "
+          f"maior {max(docs_sizes, default=0) / 1024:.1f} KiB)")
+    print(f"maior shard:   {shard_sizes[-1] / 1024:.1f} KiB; mediana {shard_sizes[len(shard_sizes) // 2] / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do índice de busca.")
+    parser.add_argument("--copies", type=int, default=100,
+                        help="quantas vezes replicar o articles.json (padrão: 100)")
+    bench(parser.parse_args().copies)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+import re
+
+# placeholders no formato {{CHAVE}} (maiúsculas, dígitos e _)
+PLACEHOLDER_RE = re.compile(r"\{\{([A-Z0-9_]+)\}\}")
+
+
+class TemplateError(ValueError):
+    pass
+
+
+class CompiledTemplate:
+    """Template {{CHAVE}} compilado uma única vez.
+
+    O texto é quebrado em literais e slots alternados
+    (literal, slot, literal, ..., literal); renderizar é só um join,
+    em vez de copiar a página inteira uma vez por chave com str.replace.
+    """
+
+    def __init__(self, source: str):
+        parts = PLACEHOLDER_RE.split(source)
+        self.literals: list[str] = parts[0::2]
+        self.slots: list[str] = parts[1::2]
+        self.placeholders: frozenset[str] = frozenset(self.slots)
+
+    def check(self, ctx: dict) -> tuple[list[str], list[str]]:
+        """Retorna (chaves desconhecidas no ctx, placeholders sem valor)."""
+        unknown = sorted(ctx.keys() - self.placeholders)
+        missing = sorted(self.placeholders - ctx.keys())
+        return unknown, missing
+
+    def render(self, ctx: dict, strict: bool = True) -> str:
+        if strict:
+            unknown, missing = self.check(ctx)
+            if unknown or missing:
+                raise TemplateError(format_problems(unknown, missing))
+
+        literals = self.literals
+        out = [literals[0]]
+        for i, key in enumerate(self.slots):
+            if key in ctx:
+                out.append(str(ctx[key]))
+            else:
+                # sem valor: mantém o placeholder, como o replace antigo fazia
+                out.append("{{" + key + "}}")
+            out.append(literals[i + 1])
+        return "".join(out)
+
+
+def compile_template(source: str) -> CompiledTemplate:
+    return CompiledTemplate(source)
+
+
+def format_problems(unknown: list[str], missing: list[str]) -> str:
+    msgs = []
+    if unknown:
+        msgs.append("chaves sem placeholder no template: " + ", ".join(unknown))
+    if missing:
+        msgs.append("placeholders sem valor: " + ", ".join(missing))
+    return "; ".join(msgs)
@@ -0,0 +1,308 @@
+# scripts/bench_pipeline.py
+"""Benchmark do pipeline num site sintético (1k/10k/100k páginas).
+
+Copia o código (scripts/, content_pipeline/, seo_audit/) para uma pasta
+temporária, gera lá um articles.json com N artigos e uma árvore de páginas
+estáticas, e roda cada etapa do site_pipeline.py em três cenários:
+
+- cold: sem manifesto/cache/estado nenhum;
+- warm: de novo, sem mudar nada;
+- incremental: 1% dos artigos e das páginas alterados.
+
+Cada etapa roda num processo próprio; de cada uma sai o tempo da etapa, o
+pico de memória (RSS), os arquivos abertos para leitura/escrita (audit hook
+no processo) e os que de fato mudaram (comparando a árvore antes e depois).
+Os números são comparados com scripts/bench_baseline.json (--save-baseline
+atualiza).
+Baseline é da máquina onde foi gravado: compare sempre na mesma.
+"""
+from pathlib import Path
+import argparse
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = Path(__file__).resolve().parents[1]
+
+BASELINE_PATH = ROOT / "scripts" / "bench_baseline.json"
+BASELINE_VERSION = 1
+
+DEFAULT_SIZES = (1000,)
+DEFAULT_STAGES = ("build", "audit", "sitemap")
+SCENARIOS = ("cold", "warm", "incremental")
+
+# só o código vai para o site sintético; estados e caches ficam para trás (cold)
+CODE_DIRS = ("scripts", "content_pipeline", "seo_audit")
+IGNORE = shutil.ignore_patterns("__pycache__", "*_state.json", "*_cache.json", "build_manifest.json",
+                                "articles.json", "article_bodies", "bench_baseline.json")
+
+# páginas estáticas (fora do articles.json): 10% do total
+STATIC_SHARE = 0.10
+STATIC_DIR = "paginas"
+# fração alterada no cenário incremental
+CHANGE_SHARE = 0.01
+
+# acima disso é regressão (e só se a diferença passar do ruído)
+TOLERANCE = 0.25
+NOISE_SECONDS = 0.05
+
+WORDS = """
+sono energia magnesio potassio vitamina zinco imunidade rotina creatina ossos calcio
+treino recuperacao estresse alimentacao hidratacao proteina fibra intestino cafe luz
+caminhada foco humor ansiedade descanso suplemento dose manha noite refeicao fruta
+""".split()
+
+
+# --- site sintético ---
+
+def base_articles() -> list:
+    data = json.loads((ROOT / "content_pipeline" / "data" / "articles.json").read_text(encoding="utf-8"))
+    return [a for a in data["articles"] if a.get("body_html")]
+
+
+def synthetic_article(base: dict, i: int, rng: random.Random) -> dict:
+    a = {k: v for k, v in base.items() if k != "body_file"}
+    words = " ".join(rng.choice(WORDS) for _ in range(120))
+    a["slug"] = f"{base['slug']}-{i:06d}"
+    a["title"] = f"{base['title']} ({i})"
+    a["h1"] = a["title"]
+    a["body_html"] = base["body_html"] + f"<h2>Notas {i}</h2><p>{words}</p>"
+    return a
+
+
+def static_page(i: int, slugs: list, rng: random.Random) -> str:
+    links = "".join(f'<li><a href="/artigos/{s}.html">{s}</a></li>' for s in rng.sample(slugs, min(5, len(slugs))))
+    return (
+        '<!doctype html>\n<html lang="pt-BR">\n<head>\n<meta charset="utf-8">\n'
+        f"<title>Página {i}</title>\n"
+        f'<meta name="description" content="Página sintética {i} do benchmark.">\n'
+        f'<link rel="canonical" href="https://saudenaturalglobal.com.br/{STATIC_DIR}/p-{i:06d}.html">\n'
+        "</head>\n<body>\n"
+        f'<h1>Página {i}</h1>\n<p>{" ".join(rng.choice(WORDS) for _ in range(60))}</p>\n'
+        f'<ul>{links}</ul>\n<a href="/index.html">Início</a>\n</body>\n</html>\n'
+    )
+
+
+def make_site(dest: Path, pages: int, seed: int = 1) -> None:
+    """Código do repo + articles.json com ~90% das páginas + páginas estáticas."""
+    for d in CODE_DIRS:
+        shutil.copytree(ROOT / d, dest / d, ignore=IGNORE)
+    shutil.copy2(ROOT / "index.html", dest / "index.html")
+
+    rng = random.Random(seed)
+    bases = base_articles()
+    n_static = int(pages * STATIC_SHARE)
+    articles = [synthetic_article(bases[i % len(bases)], i, rng) for i in range(pages - n_static)]
+    write_articles(dest, articles)
+
+    slugs = [a["slug"] for a in articles]
+    (dest / STATIC_DIR).mkdir()
+    for i in range(n_static):
+        (dest / STATIC_DIR / f"p-{i:06d}.html").write_text(static_page(i, slugs, rng), encoding="utf-8")
+
+
+def write_articles(dest: Path, articles: list) -> None:
+    path = dest / "content_pipeline" / "data" / "articles.json"
+    path.write_text(json.dumps({"articles": articles}, ensure_ascii=False), encoding="utf-8")
+
+
+def touch_some(dest: Path, share: float = CHANGE_SHARE, seed: int = 2) -> int:
+    """Altera `share` dos artigos e das páginas estáticas. Retorna quantos."""
+    rng = random.Random(seed)
+    path = dest / "content_pipeline" / "data" / "articles.json"
+    articles = json.loads(path.read_text(encoding="utf-8"))["articles"]
+    picked = rng.sample(range(len(articles)), max(1, int(len(articles) * share)))
+    for i in picked:
+        articles[i]["description"] += " Atualizado."
+    write_articles(dest, articles)
+
+    statics = sorted((dest / STATIC_DIR).glob("*.html"))
+    changed = picked
+    if statics:
+        changed = picked + rng.sample(statics, max(1, int(len(statics) * share)))
+        for p in changed[len(picked):]:
+            p.write_text(p.read_text(encoding="utf-8").replace("</h1>", " (atualizada)</h1>", 1), encoding="utf-8")
+    return len(changed)
+
+
+# --- medição ---
+
+# roda o site_pipeline.py com um audit hook que anota os arquivos abertos do
+# site (código .py e stdlib fora), para contar leituras/escritas de verdade
+RUNNER = """
+import atexit, json, os, runpy, sys
+script, site = sys.argv[1], sys.argv[2]
+sys.argv = [script] + sys.argv[3:]
+sys.path.insert(0, os.path.dirname(script))
+reads, writes = set(), set()
+WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_CREAT
+def hook(event, args):
+    if event != "open" or not isinstance(args[0], str):
+        return
+    path = os.path.abspath(args[0])
+    if not path.startswith(site) or path.endswith((".py", ".pyc")):
+        return
+    mode, flags = args[1], args[2] or 0
+    writing = any(c in mode for c in "wax+") if mode else bool(flags & WRITE_FLAGS)
+    (writes if writing else reads).add(path)
+def peak_kib():
+    # VmHWM e não ru_maxrss: o ru_maxrss herda o pico do processo pai pelo fork
+    try:
+        with open("/proc/self/status") as f:
+            return next(int(l.split()[1]) for l in f if l.startswith("VmHWM:"))
+    except (OSError, StopIteration):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+atexit.register(lambda: print("BENCH_IO " + json.dumps([len(reads), len(writes), peak_kib()]), file=sys.stderr))
+sys.addaudithook(hook)
+runpy.run_path(script, run_name="__main__")
+"""
+
+
+def snapshot(root: Path) -> dict:
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d != "__pycache__"]
+        for fn in filenames:
+            st = os.stat(os.path.join(dirpath, fn))
+            files[os.path.join(dirpath, fn)] = (st.st_size, st.st_mtime_ns)
+    return files
+
+
+def run_stage(site: Path, stage: str, jobs: int) -> dict:
+    """Roda uma etapa num processo novo e mede tempo, RSS e arquivos."""
+    before = snapshot(site)
+    cmd = [sys.executable, "-c", RUNNER, str(site / "scripts" / "site_pipeline.py"), str(site) + os.sep,
+           "--only", stage, "--jobs", str(jobs)]
+    proc = subprocess.Popen(cmd, cwd=site, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    out = proc.stdout.read()
+    if proc.wait() != 0:
+        print(out)
+        raise SystemExit(f"Etapa '{stage}' falhou no site sintético ({site}).")
+    after = snapshot(site)
+
+    seconds = re.search(rf"^{re.escape(stage)}\s+([\d.]+)s\b", out, re.M)
+    io = re.search(r"^BENCH_IO (\[.*\])$", out, re.M)
+    opened_read, opened_write, peak = json.loads(io.group(1)) if io else (None, None, 0)
+    return {
+        "seconds": round(float(seconds.group(1)), 3) if seconds else None,
+        "max_rss_mib": round(peak / 1024, 1),
+        # abertos pelo processo (com --jobs > 1, os workers não entram)
+        "files_read": opened_read,
+        "files_opened_for_write": opened_write,
+        # os que de fato mudaram em disco
+        "files_written": sum(1 for p, st in after.items() if before.get(p) != st),
+        "files_removed": sum(1 for p in before if p not in after),
+    }
+
+
+def bench_size(pages: int, stages: list, jobs: int, keep: bool) -> dict:
+    tmp = Path(tempfile.mkdtemp(prefix=f"bench-{pages}-"))
+    try:
+        make_site(tmp, pages)
+        print(f"OK: site sintético com {pages} página(s) em {tmp}")
+        results = {stage: {} for stage in stages}
+        for scenario in SCENARIOS:
+            if scenario == "incremental":
+                print(f"OK: {touch_some(tmp)} arquivo(s) alterado(s)")
+            for stage in stages:
+                results[stage][scenario] = run_stage(tmp, stage, jobs)
+        return results
+    finally:
+        if keep:
+            print(f"OK: site sintético mantido em {tmp}")
+        else:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+# --- baseline ---
+
+def load_baseline(path: Path) -> dict:
+    if path.exists():
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data.get("version") == BASELINE_VERSION:
+                return data.get("results", {})
+        except ValueError:
+            print(f"⚠️ baseline inválido, ignorado: {path}")
+    return {}
+
+
+def save_baseline(path: Path, results: dict) -> None:
+    merged = {**load_baseline(path), **results}
+    payload = json.dumps({"version": BASELINE_VERSION, "results": dict(sorted(merged.items(), key=lambda kv: int(kv[0])))},
+                         ensure_ascii=False, indent=2) + "\n"
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(payload, encoding="utf-8")
+    os.replace(tmp, path)
+    print(f"OK: baseline gravado em {path.relative_to(ROOT)}")
+
+
+def is_regression(now: float | None, base: float | None, tolerance: float) -> bool:
+    if now is None or base is None:
+        return False
+    return now > base * (1 + tolerance) and now - base > NOISE_SECONDS
+
+
+def report(results: dict, baseline: dict, tolerance: float) -> list:
+    """Imprime a tabela e devolve as regressões [(páginas, etapa, cenário)]."""
+    regressions = []
+    print(f"\n{'páginas':>8} {'etapa':<9} {'cenário':<12} {'tempo':>8} {'base':>8} {'Δ':>6} "
+          f"{'RSS MiB':>8} {'lidos':>7} {'escritos':>9}")
+    for pages, stages in results.items():
+        for stage, scenarios in stages.items():
+            for scenario, m in scenarios.items():
+                base = baseline.get(pages, {}).get(stage, {}).get(scenario, {}).get("seconds")
+                delta = f"{100 * (m['seconds'] / base - 1):+.0f}%" if base and m["seconds"] is not None else "-"
+                flag = ""
+                if is_regression(m["seconds"], base, tolerance):
+                    regressions.append((pages, stage, scenario))
+                    flag = " ⚠️"
+                print(f"{pages:>8} {stage:<9} {scenario:<12} {m['seconds'] or 0:>7.3f}s "
+                      f"{(f'{base:.3f}s' if base else '-'):>8} {delta:>6} {m['max_rss_mib']:>8.1f} "
+                      f"{m['files_read'] if m['files_read'] is not None else '-':>7} "
+                      f"{m['files_written'] + m['files_removed']:>9}{flag}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline num site sintético.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="tamanhos do site em páginas, separados por vírgula (ex.: 1000,10000,100000)")
+    parser.add_argument("--stages", default=",".join(DEFAULT_STAGES),
+                        help=f"etapas medidas, na ordem (padrão: {','.join(DEFAULT_STAGES)})")
+    parser.add_argument("--jobs", type=int, default=1, metavar="N",
+                        help="repassado ao pipeline (padrão: 1)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH,
+                        help="arquivo de baseline para comparar")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="grava os resultados como novo baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help=f"piora de tempo tolerada, em fração (padrão: {TOLERANCE})")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="sai com erro se alguma etapa ficar mais lenta que o baseline")
+    parser.add_argument("--keep", action="store_true",
+                        help="não apaga o site sintético no fim")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+
+    results = {str(n): bench_size(n, stages, args.jobs, args.keep) for n in sizes}
+    regressions = report(results, load_baseline(args.baseline), args.tolerance)
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+    if regressions and args.fail_on_regression:
+        raise SystemExit(f"{len(regressions)} medição(ões) mais lenta(s) que o baseline (tolerância {args.tolerance:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+# scripts/critical_css.py
+"""CSS crítico (acima da dobra) inline + Tailwind CDN com defer.
+
+As páginas não têm folha de estilo: o CSS sai do script do Tailwind (Play
+CDN), que bloqueia a primeira pintura. Esta etapa compila, com o CLI do
+Tailwind v3, só as classes usadas acima da dobra de cada template; na cópia
+publicada (scripts/optimize_assets.py, em dist/) o resultado vai num <style
+data-critical> no <head> e o script do CDN ganha defer e gera o resto depois
+da pintura. As páginas do repositório não são tocadas.
+
+O CSS é calculado uma vez por template (não por artigo) e fica no estado,
+com o hash das classes, junto com o grupo de cada página. As classes do
+<html> e do <body> (fundo, cor do texto, antialiased) entram junto com as do
+topo. Sem mudança no topo do template, não recompila (nem precisa do CLI).
+Sem o CLI e sem cache, o grupo fica sem CSS crítico.
+"""
+from pathlib import Path
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import tempfile
+
+ROOT = Path(__file__).resolve().parents[1]
+
+STATE_PATH = ROOT / "scripts" / "critical_css_state.json"
+STATE_VERSION = 1
+
+# mesma versão servida pelo cdn.tailwindcss.com (entra no hash do cache)
+TAILWIND_VERSION = "3.4.17"
+# comando do CLI: TAILWIND_CMD (ex.: "npx tailwindcss@3") ou tailwindcss no PATH
+TAILWIND_CMD = os.environ.get("TAILWIND_CMD", "")
+
+# grupo -> (onde ler o topo da página, páginas que recebem o CSS)
+# para os artigos gerados o topo vem do template: um cálculo para todos
+GROUPS = {
+    "artigo": ("content_pipeline/templates/article_template.html", "artigos/*.html"),
+    "artigos-index": (None, "artigos/index.html"),
+    "produto": (None, "produtos/*.html"),
+    "home": (None, "index.html"),
+}
+# grupos de páginas geradas pelo template: só entram as saídas do build
+# (build_manifest.json); as escritas à mão que casam com o padrão (ex.:
+# artigos/guia-rapido-*.html) ganham um grupo próprio, com o topo delas
+TEMPLATE_GROUPS = {"artigo"}
+BUILD_MANIFEST = ROOT / "content_pipeline" / "data" / "build_manifest.json"
+
+# marcador explícito de fim da dobra; sem ele, vai até o fim da 1ª <section>
+FOLD_MARKER = "<!-- critical:end -->"
+FOLD_CHARS = 12000
+
+CDN_RE = re.compile(r'<script\b([^>]*)\bsrc="https://cdn\.tailwindcss\.com[^"]*"([^>]*)>', re.I)
+CRITICAL_RE = re.compile(r"<style data-critical[^>]*>.*?</style>\n?[ \t]*", re.S | re.I)
+BODY_RE = re.compile(r"<body\b[^>]*>", re.I)
+HTML_RE = re.compile(r"<html\b[^>]*>", re.I)
+CLASS_RE = re.compile(r"""\bclass\s*=\s*(?:"([^"]*)"|'([^']*)')""", re.I)
+
+INPUT_CSS = "@tailwind base;\n@tailwind components;\n@tailwind utilities;\n"
+
+
+def read_file(path: Path) -> bytes:
+    return path.read_bytes()
+
+
+def fold_bounds(html: str) -> tuple[int, int]:
+    """(início, fim) em `html` do trecho do <body> visível antes de rolar."""
+    m = BODY_RE.search(html)
+    start = m.end() if m else 0
+    marker = html.find(FOLD_MARKER, start)
+    if marker >= 0:
+        return start, marker
+    end = html.find("</section>", start)
+    if 0 <= end - start < FOLD_CHARS * 2:
+        return start, end + len("</section>")
+    return start, min(len(html), start + FOLD_CHARS)
+
+
+def above_the_fold(html: str) -> str:
+    """Trecho do <body> que aparece antes de rolar (cabeçalho + hero)."""
+    start, end = fold_bounds(html)
+    return html[start:end]
+
+
+def class_names(text: str) -> set:
+    classes = set()
+    for m in CLASS_RE.finditer(text):
+        value = m.group(1) if m.group(1) is not None else m.group(2)
+        classes.update(c for c in value.split() if "{{" not in c)
+    return classes
+
+
+def root_classes(html: str) -> set:
+    """Classes do <html> e do <body>: valem para a página inteira."""
+    tags = [m.group(0) for m in (HTML_RE.search(html), BODY_RE.search(html)) if m]
+    return class_names(" ".join(tags))
+
+
+def fold_classes(html: str) -> set:
+    return root_classes(html) | class_names(above_the_fold(html))
+
+
+def css_selector(name: str) -> str:
+    # escape do Tailwind: md:flex -> .md\:flex, w-1/2 -> .w-1\/2
+    return "." + re.sub(r"([^A-Za-z0-9_-])", r"\\\1", name)
+
+
+def missing_classes(classes: set, css: str) -> list:
+    return sorted(c for c in classes if css_selector(c) not in css)
+
+
+def generated_pages(read) -> set | None:
+    """Saídas do build de artigos (build_manifest.json); None sem manifesto."""
+    try:
+        data = json.loads(read(BUILD_MANIFEST).decode("utf-8"))
+    except (OSError, ValueError):
+        return None
+    return {a["output"].replace(os.sep, "/") for a in data.get("articles", {}).values() if a.get("output")}
+
+
+def plan_groups(files: list, generated: set | None) -> list:
+    """[(grupo, fonte do topo, páginas)]; com `generated`, os grupos de
+    template só levam páginas geradas e o resto vira grupo de uma página."""
+    fixed = {name: [f for f in files if fnmatch.fnmatchcase(f, pattern)]
+             for name, (_, pattern) in GROUPS.items() if name not in TEMPLATE_GROUPS}
+    claimed = {f for pages in fixed.values() for f in pages}
+    plan, own = [], []
+    for name, (source, pattern) in GROUPS.items():
+        if name not in TEMPLATE_GROUPS:
+            plan.append((name, source, fixed[name]))
+            continue
+        pages = [f for f in files if fnmatch.fnmatchcase(f, pattern) and f not in claimed]
+        if generated is not None:
+            own += [f for f in pages if f not in generated]
+            pages = [f for f in pages if f in generated]
+        plan.append((name, source, pages))
+    # grupo próprio: o nome é o caminho sem .html (vai no data-critical)
+    plan += [(rel[:-len(".html")], None, [rel]) for rel in own]
+    return plan
+
+
+def tailwind_command() -> list | None:
+    if TAILWIND_CMD:
+        return shlex.split(TAILWIND_CMD)
+    found = shutil.which("tailwindcss")
+    return [found] if found else None
+
+
+def compile_css(classes: set, cmd: list) -> str:
+    """Roda o CLI do Tailwind com as classes como único conteúdo."""
+    with tempfile.TemporaryDirectory() as tmp:
+        content = Path(tmp) / "content.html"
+        content.write_text(f'<div class="{" ".join(sorted(classes))}"></div>\n', encoding="utf-8")
+        src = Path(tmp) / "input.css"
+        src.write_text(INPUT_CSS, encoding="utf-8")
+        out = Path(tmp) / "out.css"
+        subprocess.run(cmd + ["-i", str(src), "-o", str(out), "--content", str(content), "--minify"],
+                       check=True, capture_output=True)
+        return out.read_text(encoding="utf-8").strip()
+
+
+def cache_key(classes: set) -> str:
+    h = hashlib.sha256(TAILWIND_VERSION.encode("utf-8"))
+    h.update("\0".join(sorted(classes)).encode("utf-8"))
+    return h.hexdigest()
+
+
+def inline_critical(html: str, name: str, css: str) -> str:
+    """Põe/atualiza o <style data-critical> antes do script do CDN e adia o CDN."""
+    html = CRITICAL_RE.sub("", html)
+    m = CDN_RE.search(html)
+    if not m:
+        return html
+    attrs = m.group(1) + m.group(2)
+    tag = m.group(0) if re.search(r"\bdefer\b", attrs) else m.group(0).replace("<script", "<script defer", 1)
+    # indentação da linha do script, para o HTML continuar legível
+    line_start = html.rfind("\n", 0, m.start()) + 1
+    indent = html[line_start:m.start()] if not html[line_start:m.start()].strip() else ""
+    style = f'<style data-critical="{name}">{css}</style>\n{indent}'
+    return html[:m.start()] + style + tag + html[m.end():]
+
+
+def read_state() -> dict:
+    if STATE_PATH.exists():
+        try:
+            state = json.loads(STATE_PATH.read_text(encoding="utf-8"))
+            if state.get("version") == STATE_VERSION:
+                return state
+        except ValueError:
+            print(f"⚠️ estado do CSS crítico inválido, recalculando: {STATE_PATH}")
+    return {}
+
+
+def load_state() -> dict:
+    return read_state().get("groups", {})
+
+
+def load_critical() -> dict:
+    """página -> (grupo, CSS) para o inline_critical da cópia publicada."""
+    state = read_state()
+    groups = state.get("groups", {})
+    return {rel: (name, groups[name]["css"]) for rel, name in state.get("pages", {}).items() if name in groups}
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    if path.exists() and path.read_text(encoding="utf-8") == text:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+    return True
+
+
+def process(files=None, read=read_file, force: bool = False) -> dict:
+    """Calcula o CSS crítico de cada grupo e grava no estado (não mexe nas páginas).
+
+    Devolve {"written": [...], "removed": [...]}.
+    """
+    if files is None:
+        files = [p.relative_to(ROOT).as_posix() for p in ROOT.rglob("*.html")]
+    files = sorted(files)
+    previous = {} if force else load_state()
+    groups, assigned, written, removed = {}, {}, [], []
+    cmd = tailwind_command()
+
+    generated = generated_pages(read)
+    if generated is None:
+        print(f"⚠️ sem {BUILD_MANIFEST.relative_to(ROOT)}: grupos de template com todas as páginas do padrão")
+
+    for name, source, pages in plan_groups(files, generated):
+        if not pages:
+            continue
+        sources = [source] if source else pages
+        classes, roots = set(), set()
+        for rel in sources:
+            text = read(ROOT / rel).decode("utf-8")
+            classes |= fold_classes(text)
+            roots |= root_classes(text)
+        key = cache_key(classes)
+
+        prev = previous.get(name)
+        if prev and prev["key"] == key:
+            groups[name] = prev
+        elif cmd is None:
+            print(f"⚠️ CLI do Tailwind não encontrado: CSS crítico de '{name}' não atualizado "
+                  f"(defina TAILWIND_CMD ou instale o tailwindcss {TAILWIND_VERSION})")
+            if not prev:
+                continue
+            groups[name] = prev  # o CSS anterior ainda vale para quase tudo
+        else:
+            css = compile_css(classes, cmd)
+            groups[name] = {"key": key, "classes": len(classes), "css": css}
+            print(f"OK: CSS crítico '{name}': {len(classes)} classe(s), {len(css.encode('utf-8')) / 1024:.1f} KiB")
+        css = groups[name]["css"]
+        # sem as classes do <body> a página pinta sem fundo/cor até o CDN rodar
+        missing = missing_classes(roots, css)
+        if missing:
+            print(f"⚠️ CSS crítico '{name}' sem classes do <html>/<body>: {', '.join(missing)}")
+        assigned.update((rel, name) for rel in pages)
+        print(f"OK: CSS crítico '{name}' para {len(pages)} página(s).")
+
+    payload = json.dumps({"version": STATE_VERSION, "groups": dict(sorted(groups.items())),
+                          "pages": dict(sorted(assigned.items()))},
+                         ensure_ascii=False, indent=2) + "\n"
+    if write_if_changed(STATE_PATH, payload):
+        written.append(STATE_PATH)
+    return {"written": written, "removed": removed}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="CSS crítico inline por template (Tailwind).")
+    parser.add_argument("--force", action="store_true",
+                        help="ignora o cache e recompila o CSS de todos os grupos")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    process(force=args.force)
+
+
+if __name__ == "__main__":
+    main()
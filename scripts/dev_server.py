@@ -0,0 +1,138 @@
+# scripts/dev_server.py
+"""Servidor local do site com live reload (usado pelo site_pipeline.py --watch).
+
+Serve a raiz do repositório como o GitHub Pages serviria e injeta nas
+páginas HTML um script que escuta /__livereload (Server-Sent Events): a
+cada rebuild o watcher chama reload() e as abas abertas recarregam.
+
+Também roda sozinho, sem watcher: python scripts/dev_server.py --port 8000
+"""
+from pathlib import Path
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+import argparse
+import posixpath
+import threading
+
+ROOT = Path(__file__).resolve().parents[1]
+
+DEFAULT_PORT = 8000
+LIVERELOAD_PATH = "/__livereload"
+# o navegador reconecta sozinho; o servidor manda um comentário de tempos em
+# tempos para a conexão não ficar parada
+KEEPALIVE_SECONDS = 15
+
+LIVERELOAD_SNIPPET = (
+    "<script>(function(){var s=new EventSource(\"" + LIVERELOAD_PATH + "\");"
+    "s.addEventListener(\"reload\",function(){location.reload()});})();</script>"
+)
+
+
+class LiveReload:
+    """Contador de versões: cada reload() acorda quem está esperando."""
+
+    def __init__(self):
+        self.version = 0
+        self.cond = threading.Condition()
+
+    def reload(self) -> None:
+        with self.cond:
+            self.version += 1
+            self.cond.notify_all()
+
+    def wait(self, version: int, timeout: float) -> int:
+        with self.cond:
+            self.cond.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+
+class DevHandler(SimpleHTTPRequestHandler):
+    livereload: LiveReload = None
+
+    def log_message(self, fmt, *args):
+        pass  # o terminal é do watcher
+
+    def do_GET(self):
+        if urlsplit(self.path).path == LIVERELOAD_PATH:
+            return self.serve_events()
+        page = self.html_path()
+        if page is None:
+            return super().do_GET()
+        body = page.read_bytes()
+        marker = body.lower().rfind(b"</body>")
+        snippet = LIVERELOAD_SNIPPET.encode("utf-8")
+        body = body[:marker] + snippet + body[marker:] if marker >= 0 else body + snippet
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def html_path(self) -> Path | None:
+        """Arquivo .html que a URL serve (pasta -> index.html), ou None."""
+        rel = posixpath.normpath(unquote(urlsplit(self.path).path)).lstrip("/")
+        if rel.startswith(".."):
+            return None
+        path = Path(self.directory) / rel
+        if path.is_dir():
+            if not self.path.split("?")[0].endswith("/"):
+                return None  # o handler padrão redireciona para a barra
+            path = path / "index.html"
+        return path if path.suffix == ".html" and path.is_file() else None
+
+    def end_headers(self):
+        # nada de cache no preview: o arquivo muda a cada rebuild
+        self.send_header("Cache-Control", "no-store")
+        super().end_headers()
+
+    def serve_events(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        version = self.livereload.version
+        try:
+            while True:
+                new = self.livereload.wait(version, KEEPALIVE_SECONDS)
+                if new != version:
+                    version = new
+                    self.wfile.write(b"event: reload\ndata: reload\n\n")
+                else:
+                    self.wfile.write(b": ping\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # aba fechada ou recarregada
+
+
+class DevServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = DEFAULT_PORT, root: Path = ROOT):
+        self.livereload = LiveReload()
+        handler = type("Handler", (DevHandler,), {"livereload": self.livereload})
+        super().__init__(("127.0.0.1", port),
+                         lambda *a, **kw: handler(*a, directory=str(root), **kw))
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+    def reload(self) -> None:
+        self.livereload.reload()
+
+
+def start_server(port: int = DEFAULT_PORT, root: Path = ROOT) -> DevServer:
+    """Sobe o servidor numa thread; pare com .shutdown()."""
+    server = DevServer(port, root)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local do site com live reload.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    server = DevServer(parser.parse_args().port)
+    print(f"OK: site em {server.url} (Ctrl+C para sair)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,125 @@
+# scripts/fingerprint.py
+"""Nomes com hash do conteúdo para os assets publicados em dist/.
+
+img/logo.png -> img/logo.3f9a0c1b2d.png: o nome muda quando o arquivo
+muda, então o servidor pode mandar o navegador guardar para sempre
+(Cache-Control immutable) e só o HTML é revalidado.
+
+No GitHub Pages (onde o site é publicado) só metade disso vale: o Pages
+ignora o _headers e manda Cache-Control: max-age=600 para tudo. O que se
+ganha lá é o nome novo a cada mudança: asset alterado nunca sai do cache
+velho do navegador ou da CDN. O cache longo (render_headers) só vale num
+host que leia o _headers (Netlify, Cloudflare Pages).
+
+Usado pelo optimize_assets.py: os fontes do repositório não mudam, só a
+cópia em dist/ ganha os nomes novos e as páginas de dist/ passam a
+apontar para eles. O arquivo original continua publicado (links de fora,
+PDFs compartilhados), só sem cache longo.
+"""
+import hashlib
+import json
+import posixpath
+import re
+from urllib.parse import quote, unquote
+
+# o que ganha nome com hash
+FINGERPRINT_EXTS = (".png", ".jpg", ".jpeg", ".webp", ".avif", ".gif", ".svg", ".ico",
+                    ".pdf", ".css", ".js")
+# já têm hash no nome (img/r/, artigos/listing/, artigos/search/ e as cópias daqui)
+HASHED_RE = re.compile(r"\.[0-9a-f]{8,}\.[A-Za-z0-9]+$")
+HASH_LEN = 10
+
+MANIFEST_NAME = "asset-manifest.json"
+# formato _headers (Netlify, Cloudflare Pages); o GitHub Pages ignora
+HEADERS_NAME = "_headers"
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# atributos com URLs de recursos; srcset (e o imagesrcset do preload) tem várias
+URL_ATTR_RE = re.compile(r"""\b(src|href|srcset|imagesrcset|poster|data-src)(\s*=\s*)(["'])(.*?)\3""", re.I | re.S)
+
+
+def is_fingerprintable(rel: str) -> bool:
+    return rel.lower().endswith(FINGERPRINT_EXTS) and not HASHED_RE.search(rel)
+
+
+def is_hashed(rel: str) -> bool:
+    return bool(HASHED_RE.search(rel))
+
+
+def fingerprint_name(rel: str, data: bytes) -> str:
+    stem, ext = posixpath.splitext(rel)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LEN]}{ext}"
+
+
+def build_manifest(assets) -> dict:
+    """assets: [(caminho relativo, bytes)] -> {original: com hash}."""
+    return {rel: fingerprint_name(rel, data) for rel, data in sorted(assets)}
+
+
+def manifest_digest(manifest: dict) -> str:
+    return hashlib.sha256(json.dumps(manifest, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def rewrite_url(page: str, url: str, manifest: dict) -> str:
+    """URL local que aponta para um asset do manifesto -> versão com hash.
+
+    Mantém o estilo do original (/absoluto ou relativo, %20 ou espaço) e
+    ?query/#fragmento.
+    """
+    cut = min([i for i in (url.find("?"), url.find("#")) if i >= 0] or [len(url)])
+    path, rest = url[:cut], url[cut:]
+    if not path or path.startswith(("http:", "https:", "//", "data:", "mailto:", "{{", "${")):
+        return url
+    # o manifesto tem o nome do arquivo em disco: "guia%20rapido.pdf" -> "guia rapido.pdf"
+    plain = unquote(path)
+    if plain.startswith("/"):
+        target = posixpath.normpath(plain.lstrip("/"))
+    else:
+        target = posixpath.normpath(posixpath.join(posixpath.dirname(page), plain))
+    hashed = manifest.get(target)
+    if hashed is None:
+        return url
+    if plain.startswith("/"):
+        new = "/" + hashed
+    else:
+        new = posixpath.relpath(hashed, posixpath.dirname(page) or ".")
+    return (quote(new) if plain != path else new) + rest
+
+
+def rewrite_srcset(page: str, value: str, manifest: dict) -> str:
+    parts = []
+    for candidate in value.split(","):
+        bits = candidate.strip().split(None, 1)
+        if not bits:
+            continue
+        bits[0] = rewrite_url(page, bits[0], manifest)
+        parts.append(" ".join(bits))
+    return ", ".join(parts)
+
+
+def rewrite_html(page: str, html: str, manifest: dict) -> str:
+    if not manifest:
+        return html
+
+    def replace(m):
+        name, eq, quote, value = m.groups()
+        if name.lower() in ("srcset", "imagesrcset"):
+            new = rewrite_srcset(page, value, manifest)
+        else:
+            new = rewrite_url(page, value.strip(), manifest)
+        return m.group(0) if new == value.strip() else f"{name}{eq}{quote}{new}{quote}"
+
+    return URL_ATTR_RE.sub(replace, html)
+
+
+def render_headers(paths) -> str:
+    """Regras do _headers: cache longo só para arquivos com hash no nome.
+
+    Uma regra por arquivo: com um curinga (/img/*) os hosts somam os
+    Cache-Control das regras que casam, e o original sem hash também
+    ficaria imutável.
+    """
+    lines = []
+    for rel in sorted(paths):
+        lines += [f"/{rel}", f"  Cache-Control: {IMMUTABLE}"]
+    return "\n".join(lines) + "\n" if lines else ""
@@ -1,12 +1,40 @@
 # scripts/generate_sitemap.py
 from pathlib import Path
 from datetime import datetime, timezone
+import gzip
+import hashlib
+import json
 import os
+import re
+import time
 
 # Base do site
 BASE_URL = os.environ.get("BASE_URL", "https://saudenaturalglobal.com.br").rstrip("/")
 ROOT = Path(__file__).resolve().parents[1]
 
+# URL -> hash do conteúdo normalizado + lastmod (e o digest de cada shard).
+# Versionado junto com o site: no CI o checkout é novo (mtime = agora), então
+# o lastmod sai daqui.
+STATE_PATH = ROOT / "scripts" / "sitemap_state.json"
+
+# o índice que aponta para os shards sitemap-<seção>-<n>.xml.gz fica no
+# mesmo endereço do sitemap.xml antigo: é a URL já enviada ao Search Console
+# e citada no robots.txt, então ela não pode virar 404
+SITEMAP_INDEX = ROOT / "sitemap.xml"
+# nome usado por uma versão anterior do índice; removido se existir
+STALE_INDEX = ROOT / "sitemap_index.xml"
+SHARD_SECTIONS = ("artigos", "produtos")  # o resto vai para a seção "root"
+
+# limites do protocolo por arquivo de sitemap
+MAX_URLS_PER_SHARD = 50_000
+MAX_SHARD_BYTES = 50 * 1024 * 1024
+
+URLSET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+URLSET_TAIL = "</urlset>\n"
+
 # Excluir arquivos específicos
 EXCLUDE_FILES = {
     "index2.html",   # rascunho
@@ -21,6 +49,7 @@ EXCLUDE_DIRS = {
     "seo_audit",
     "analytics_report",
     "scripts",      # opcional: não listar nada dentro
+    "dist",         # cópia otimizada do site (mesmas URLs)
     "assets", "img", "jp", "en",  # ajuste se quiser indexar subpastas
 }
 
@@ -49,8 +78,13 @@ def should_exclude(path: Path) -> bool:
     return False
 
 
-def iter_html_files(root: Path):
-    for p in root.rglob("*.html"):
+def iter_html_files(root: Path, files=None):
+    """Páginas do sitemap. `files` (caminhos relativos) evita o rglob quando
+    quem chama já tem a lista de arquivos (ex.: o inventário do pipeline)."""
+    candidates = root.rglob("*.html") if files is None else (
+        root / f for f in files if f.endswith(".html")
+    )
+    for p in candidates:
         if should_exclude(p):
             continue
         yield p
@@ -74,37 +108,158 @@ def url_for(path: Path) -> str:
     return f"{BASE_URL}/{rel}".replace("//", "/").replace(":/", "://")
 
 
-def lastmod_iso(path: Path) -> str:
-    ts = path.stat().st_mtime
-    dt = datetime.fromtimestamp(ts, tz=timezone.utc)
-    return dt.strftime("%Y-%m-%d")
+def read_page(path: Path) -> bytes:
+    return path.read_bytes()
 
 
-def build_sitemap() -> str:
-    # Usa dict para deduplicar URLs (caso apareçam equivalentes)
-    url_map = {}
+def content_digest(data: bytes) -> str:
+    """Hash do conteúdo normalizado: mudar só espaços/quebras de linha não conta."""
+    text = " ".join(data.decode("utf-8", errors="ignore").split())
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def today_iso() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+def seed_from_sitemap(path: Path) -> dict:
+    """lastmod já publicado no sitemap.xml (migração: evita "tudo mudou hoje").
+
+    Só vale para o sitemap.xml antigo, de URLs; o índice não tem páginas.
+    """
+    if not path.exists():
+        return {}
+    text = path.read_text(encoding="utf-8")
+    if "<urlset" not in text:
+        return {}
+    pairs = re.findall(r"<loc>(.*?)</loc>\s*<lastmod>(.*?)</lastmod>", text)
+    return {loc: {"sha256": None, "lastmod": lastmod} for loc, lastmod in pairs}
 
-    for f in iter_html_files(ROOT):
+
+def load_state() -> dict:
+    if STATE_PATH.exists():
+        try:
+            state = json.loads(STATE_PATH.read_text(encoding="utf-8"))
+            return {"urls": state.get("urls", {}), "shards": state.get("shards", {})}
+        except ValueError:
+            print(f"⚠️ estado do sitemap inválido, recomeçando: {STATE_PATH}")
+    return {"urls": seed_from_sitemap(SITEMAP_INDEX), "shards": {}}
+
+
+def collect_urls(files=None, read=read_page, state=None, timings=None) -> dict:
+    """URL -> {"sha256", "lastmod"}; lastmod só avança quando o hash muda.
+
+    Em `timings` entra (arquivo, início, duração, pid) de cada página.
+    """
+    state = load_state()["urls"] if state is None else state
+    today = today_iso()
+    pid = os.getpid()
+
+    # Usa dict para deduplicar URLs (caso apareçam equivalentes)
+    urls = {}
+    for f in iter_html_files(ROOT, files):
+        start = time.perf_counter()
         loc = url_for(f)
-        url_map[loc] = lastmod_iso(f)
-
-    urls = sorted(url_map.items())
-
-    lines = []
-    lines.append('<?xml version="1.0" encoding="UTF-8"?>')
-    lines.append('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">')
-    for loc, lastmod in urls:
-        lines.append("  <url>")
-        lines.append(f"    <loc>{loc}</loc>")
-        lines.append(f"    <lastmod>{lastmod}</lastmod>")
-        lines.append("  </url>")
-    lines.append("</urlset>")
+        digest = content_digest(read(f))
+        prev = state.get(loc)
+        if prev and prev.get("sha256") in (digest, None) and prev.get("lastmod"):
+            # sha256 None = semente vinda do sitemap.xml antigo
+            urls[loc] = {"sha256": digest, "lastmod": prev["lastmod"]}
+        else:
+            urls[loc] = {"sha256": digest, "lastmod": today}
+        if timings is not None:
+            timings.append((f.relative_to(ROOT).as_posix(), start, time.perf_counter() - start, pid))
+    return dict(sorted(urls.items()))
+
+
+def url_xml(loc: str, lastmod: str) -> str:
+    return f"  <url>\n    <loc>{loc}</loc>\n    <lastmod>{lastmod}</lastmod>\n  </url>\n"
+
+
+def section_for(loc: str) -> str:
+    path = loc[len(BASE_URL):].lstrip("/")
+    first = path.split("/", 1)[0] if "/" in path else ""
+    return first if first in SHARD_SECTIONS else "root"
+
+
+def plan_shards(urls: dict) -> dict:
+    """Agrupa as URLs por seção e quebra nos limites do protocolo.
+
+    Retorna {nome do shard: [(loc, lastmod), ...]} na ordem das URLs.
+    """
+    by_section: dict[str, list] = {}
+    for loc, entry in urls.items():
+        by_section.setdefault(section_for(loc), []).append((loc, entry["lastmod"]))
+
+    base_size = len(URLSET_HEAD) + len(URLSET_TAIL)
+    shards = {}
+    for section in sorted(by_section):
+        n, count, size, current = 1, 0, base_size, []
+        for loc, lastmod in by_section[section]:
+            entry_size = len(url_xml(loc, lastmod).encode("utf-8"))
+            if current and (count >= MAX_URLS_PER_SHARD or size + entry_size > MAX_SHARD_BYTES):
+                shards[f"sitemap-{section}-{n}.xml.gz"] = current
+                n, count, size, current = n + 1, 0, base_size, []
+            current.append((loc, lastmod))
+            count += 1
+            size += entry_size
+        if current:
+            shards[f"sitemap-{section}-{n}.xml.gz"] = current
+    return shards
+
+
+def shard_digest(entries: list) -> str:
+    h = hashlib.sha256()
+    for loc, lastmod in entries:
+        h.update(f"{loc}\t{lastmod}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def write_shard(path: Path, entries: list) -> None:
+    """Escreve o shard em streaming direto no gzip (sem montar o XML na memória).
+
+    mtime=0 e sem nome no cabeçalho: mesmo conteúdo, mesmos bytes.
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp, "wb") as raw, gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as gz:
+            gz.write(URLSET_HEAD.encode("utf-8"))
+            for loc, lastmod in entries:
+                gz.write(url_xml(loc, lastmod).encode("utf-8"))
+            gz.write(URLSET_TAIL.encode("utf-8"))
+        os.replace(tmp, path)
+    finally:
+        # falhou no meio (disco cheio, Ctrl+C): não deixa o .tmp para trás
+        if tmp.exists():
+            tmp.unlink()
+
+
+def build_index(shards: dict) -> str:
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+    ]
+    for name, entries in shards.items():
+        lines.append("  <sitemap>")
+        lines.append(f"    <loc>{BASE_URL}/{name}</loc>")
+        lines.append(f"    <lastmod>{max(lastmod for _, lastmod in entries)}</lastmod>")
+        lines.append("  </sitemap>")
+    lines.append("</sitemapindex>")
     return "\n".join(lines) + "\n"
 
 
-def ensure_robots():
+def write_if_changed(path: Path, text: str) -> bool:
+    if path.exists() and path.read_text(encoding="utf-8") == text:
+        return False
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+    return True
+
+
+def ensure_robots() -> bool:
     robots = ROOT / "robots.txt"
-    sitemap_line = f"Sitemap: {BASE_URL}/sitemap.xml"
+    sitemap_line = f"Sitemap: {BASE_URL}/{SITEMAP_INDEX.name}"
 
     base_lines = [
         "User-agent: *",
@@ -132,13 +287,70 @@ def ensure_robots():
         content.append("")
     content.append(sitemap_line)
 
-    robots.write_text("\n".join(content).strip() + "\n", encoding="utf-8")
+    return write_if_changed(robots, "\n".join(content).strip() + "\n")
+
+
+def unlinked_pages(urls: dict, index) -> list:
+    """Páginas do sitemap que nenhuma outra página linka (pelo LinkIndex da auditoria).
+
+    Só o sitemap leva o buscador até elas: vale um link no menu ou num artigo.
+    """
+    return [page for page in index.orphans() if url_for(ROOT / page) in urls]
+
+
+def generate(files=None, read=read_page, index=None) -> dict:
+    """Atualiza shards, o índice (sitemap.xml), robots.txt e o estado.
+
+    `index` é o LinkIndex que a auditoria acabou de montar (o pipeline o
+    repassa); sem ele, a checagem de páginas sem link interno fica de fora
+    em vez de usar um export antigo.
+
+    Só regrava os shards cujas entradas mudaram. Devolve
+    {"written": [...], "removed": [...], "stats"}; nos stats, hits são as
+    páginas com o mesmo hash do estado anterior.
+    """
+    written, removed = [], []
+    state = load_state()
+    timings = []
+    urls = collect_urls(files, read, state["urls"], timings)
+    shards = plan_shards(urls)
+
+    digests = {}
+    for name, entries in shards.items():
+        path = ROOT / name
+        digests[name] = shard_digest(entries)
+        if state["shards"].get(name) == digests[name] and path.exists():
+            continue
+        write_shard(path, entries)
+        written.append(path)
+
+    # shards que sumiram (ex.: seção esvaziou) e o índice com o nome antigo
+    stale = [ROOT / name for name in state["shards"] if name not in shards] + [STALE_INDEX]
+    for path in stale:
+        if path.exists():
+            path.unlink()
+            removed.append(path)
+
+    if write_if_changed(SITEMAP_INDEX, build_index(shards)):
+        written.append(SITEMAP_INDEX)
+    if ensure_robots():
+        written.append(ROOT / "robots.txt")
+    payload = json.dumps({"urls": urls, "shards": digests}, ensure_ascii=False, indent=2) + "\n"
+    if write_if_changed(STATE_PATH, payload):
+        written.append(STATE_PATH)
+
+    changed = ", ".join(p.name for p in written + removed) or "nada mudou"
+    print(f"OK: sitemap com {len(urls)} URLs em {len(shards)} shard(s) ({changed}).")
+    orphans = unlinked_pages(urls, index) if index is not None else []
+    if orphans:
+        print(f"⚠️ {len(orphans)} página(s) do sitemap sem link interno: {', '.join(orphans)}")
+    hits = sum(1 for loc, u in urls.items() if state["urls"].get(loc, {}).get("sha256") == u["sha256"])
+    return {"written": written, "removed": removed,
+            "stats": {"files": timings, "hits": hits, "misses": len(urls) - hits}}
 
 
 def main():
-    (ROOT / "sitemap.xml").write_text(build_sitemap(), encoding="utf-8")
-    ensure_robots()
-    print("OK: sitemap.xml e robots.txt atualizados.")
+    generate()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,306 @@
+# scripts/minify.py
+"""Minificação conservadora de HTML, CSS, JS e JSON (só stdlib).
+
+Conservadora de propósito: nada de renomear variáveis ou reescrever
+expressões. Tira comentários e espaços que não mudam o significado:
+
+- HTML: comentários (menos os condicionais <!--[if ...]-->) e sequências
+  de espaço viram um só, menos dentro de valores de atributo entre aspas
+  (title, alt, value, data-*); <pre>/<textarea> ficam intactos; <script> e
+  <style> passam pelos minificadores de JS/CSS/JSON.
+- CSS: comentários (menos /*! ... */), espaços em volta de { } ; , > e o
+  último ; de cada bloco. Strings intactas.
+- JS: comentários e indentação; quebras de linha que podem importar para a
+  inserção automática de ; são mantidas. Strings, template literals e
+  regex literais intactos.
+"""
+import json
+import re
+
+# --- HTML ---
+
+HTML_TOKEN_RE = re.compile(
+    r"<!--.*?-->|<(script|style|pre|textarea)\b([^>]*)>(.*?)</\1\s*>",
+    re.I | re.S,
+)
+TYPE_RE = re.compile(r"""\btype\s*=\s*["']?([^"'\s>]+)""", re.I)
+JS_TYPES = {"", "text/javascript", "application/javascript", "module"}
+JSON_TYPES = {"application/ld+json", "application/json", "importmap"}
+SPACE_RE = re.compile(r"\s+")
+# tag com atributos; os valores entre aspas podem ter ">" e espaços, mas não "<":
+# uma aspa sobrando (class="x"") não engole o resto da página, a tag só não casa
+TAG_RE = re.compile(r"""<[A-Za-z/!?][^>"']*(?:(?:"[^"<]*"|'[^'<]*')[^>"']*)*>""")
+QUOTED_RE = re.compile(r""""[^"]*"|'[^']*'""")
+
+
+def collapse_runs(text: str) -> str:
+    # quebra de linha e espaço são equivalentes no HTML: mantém um só caractere
+    return SPACE_RE.sub(lambda m: "\n" if "\n" in m.group(0) else " ", text)
+
+
+def collapse_attrs(tag: str) -> str:
+    """Espaços entre atributos; o valor entre aspas fica como está."""
+    out, pos = [], 0
+    for m in QUOTED_RE.finditer(tag):
+        out.append(collapse_runs(tag[pos:m.start()]))
+        out.append(m.group(0))
+        pos = m.end()
+    out.append(collapse_runs(tag[pos:]))
+    return "".join(out)
+
+
+def collapse_space(text: str) -> str:
+    out, pos = [], 0
+    for m in TAG_RE.finditer(text):
+        out.append(collapse_runs(text[pos:m.start()]))
+        out.append(collapse_attrs(m.group(0)))
+        pos = m.end()
+    out.append(collapse_runs(text[pos:]))
+    return "".join(out)
+
+
+def minify_json(text: str) -> str:
+    try:
+        return json.dumps(json.loads(text), ensure_ascii=False, separators=(",", ":"))
+    except ValueError:
+        return text.strip()
+
+
+def minify_html(html: str) -> str:
+    out = []
+    text = []   # marcação entre blocos brutos (comentários removidos)
+    pos = 0
+    for m in HTML_TOKEN_RE.finditer(html):
+        text.append(html[pos:m.start()])
+        pos = m.end()
+        token = m.group(0)
+        if token.startswith("<!--"):
+            if token.startswith("<!--[if") or token.startswith("<!--<![endif"):
+                text.append(token)
+            continue
+
+        tag, attrs, body = m.group(1).lower(), m.group(2), m.group(3)
+        if tag == "script":
+            t = TYPE_RE.search(attrs)
+            kind = t.group(1).lower() if t else ""
+            if kind in JS_TYPES:
+                body = minify_js(body)
+            elif kind in JSON_TYPES:
+                body = minify_json(body)
+        elif tag == "style":
+            body = minify_css(body)
+        close = token[token.rfind("</"):]
+        out.append(collapse_space("".join(text)))
+        out.append(f"<{m.group(1)}{collapse_attrs(attrs)}>{body}{close}")
+        text = []
+    text.append(html[pos:])
+    out.append(collapse_space("".join(text)))
+    return "".join(out).strip() + "\n"
+
+
+# --- CSS ---
+
+CSS_TOKEN_RE = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*.*?\*/', re.S)
+CSS_PUNCT_RE = re.compile(r"\s*([{};,>])\s*")
+
+
+def minify_css_code(code: str) -> str:
+    code = SPACE_RE.sub(" ", code)
+    code = CSS_PUNCT_RE.sub(r"\1", code)
+    return code.replace(";}", "}")
+
+
+def minify_css(css: str) -> str:
+    out = []
+    code = []   # trecho de CSS entre strings (comentários já viram espaço)
+    pos = 0
+    for m in CSS_TOKEN_RE.finditer(css):
+        code.append(css[pos:m.start()])
+        pos = m.end()
+        token = m.group(0)
+        if token.startswith("/*") and not token.startswith("/*!"):
+            code.append(" ")  # a/**/b não pode virar ab
+            continue
+        out.append(minify_css_code("".join(code)))
+        out.append(token)
+        code = []
+    code.append(css[pos:])
+    out.append(minify_css_code("".join(code)))
+    return "".join(out).strip()
+
+
+# --- JS ---
+
+WORD_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$\\")
+# depois destes caracteres, "/" começa um regex literal (e não uma divisão)
+REGEX_PREFIX = frozenset("(,=:[!&|?{};+-*%<>~^")
+REGEX_KEYWORDS = {"return", "typeof", "case", "do", "else", "in", "of", "new",
+                  "delete", "void", "throw", "instanceof", "yield", "await"}
+# quebra de linha depois/antes destes nunca é fim de instrução
+NO_NEWLINE_AFTER = frozenset("{[(,;:")
+NO_NEWLINE_BEFORE = frozenset("}]),;")
+
+
+def skip_string(js: str, i: int) -> int:
+    quote = js[i]
+    i += 1
+    while i < len(js):
+        c = js[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == quote or c == "\n":
+            return i + 1
+        i += 1
+    return i
+
+
+def skip_braces(js: str, i: int) -> int:
+    """Do conteúdo de um ${ ... } até depois do } que fecha."""
+    depth = 1
+    while i < len(js):
+        c = js[i]
+        if c in "\"'":
+            i = skip_string(js, i)
+            continue
+        if c == "`":
+            i = skip_template(js, i)
+            continue
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def skip_template(js: str, i: int) -> int:
+    i += 1
+    while i < len(js):
+        c = js[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "`":
+            return i + 1
+        if c == "$" and js.startswith("{", i + 1):
+            i = skip_braces(js, i + 2)
+            continue
+        i += 1
+    return i
+
+
+def skip_regex(js: str, i: int) -> int:
+    i += 1
+    in_class = False
+    while i < len(js):
+        c = js[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "\n":
+            return i
+        if c == "[":
+            in_class = True
+        elif c == "]":
+            in_class = False
+        elif c == "/" and not in_class:
+            i += 1
+            while i < len(js) and js[i] in WORD_CHARS:  # flags
+                i += 1
+            return i
+        i += 1
+    return i
+
+
+def ends_with(out: list, suffix: str) -> bool:
+    """A saída já emitida termina em `suffix` (pode estar em mais de um pedaço)."""
+    tail = ""
+    for piece in reversed(out):
+        tail = piece + tail
+        if len(tail) >= len(suffix):
+            break
+    return tail.endswith(suffix)
+
+
+def starts_regex(out: list, last: str) -> bool:
+    """"/" aqui começa um regex literal? Depois de operador, sim; depois de
+    valor (nome, número, ")", "]", a++), é divisão."""
+    if not last:
+        return True
+    if last in "+-":
+        # a++ / b: o ++ pós-fixo fecha um valor (a+ +/x/ tem o espaço no meio)
+        return not ends_with(out, last * 2)
+    if last in REGEX_PREFIX:
+        return True
+    return last in WORD_CHARS and last_word(out) in REGEX_KEYWORDS
+
+
+def last_word(out: list) -> str:
+    word = []
+    for piece in reversed(out):
+        for c in reversed(piece):
+            if c in WORD_CHARS:
+                word.append(c)
+            else:
+                return "".join(reversed(word))
+    return "".join(reversed(word))
+
+
+def minify_js(js: str) -> str:
+    out = []
+    last = ""       # último caractere significativo já emitido
+    pending = ""    # espaço acumulado: "", " " ou "\n"
+    i, n = 0, len(js)
+
+    def emit(piece: str) -> None:
+        nonlocal last, pending
+        first = piece[0]
+        if pending == "\n" and last and last not in NO_NEWLINE_AFTER and first not in NO_NEWLINE_BEFORE:
+            out.append("\n")
+        elif pending and last and (
+            (last in WORD_CHARS and first in WORD_CHARS)
+            or (last == first and first in "+-/")
+        ):
+            out.append(" ")
+        out.append(piece)
+        last = piece[-1]
+        pending = ""
+
+    while i < n:
+        c = js[i]
+        if c in " \t\r\n\f\v":
+            if c == "\n":
+                pending = "\n"
+            elif not pending:
+                pending = " "
+            i += 1
+        elif js.startswith("//", i):
+            end = js.find("\n", i)
+            i = n if end < 0 else end
+        elif js.startswith("/*", i):
+            end = js.find("*/", i + 2)
+            end = n if end < 0 else end + 2
+            if "\n" in js[i:end]:
+                pending = "\n"
+            elif not pending:
+                pending = " "
+            i = end
+        elif c in "\"'":
+            end = skip_string(js, i)
+            emit(js[i:end])
+            i = end
+        elif c == "`":
+            end = skip_template(js, i)
+            emit(js[i:end])
+            i = end
+        elif c == "/" and starts_regex(out, last):
+            end = skip_regex(js, i)
+            emit(js[i:end])
+            i = end
+        else:
+            emit(c)
+            i += 1
+    return "".join(out)
@@ -0,0 +1,305 @@
+# scripts/optimize_assets.py
+"""Pós-build: cópia otimizada do site em dist/.
+
+dist/ é o que vai para o ar: o workflow publica essa pasta no GitHub Pages
+(actions/deploy-pages), não a raiz do repositório.
+
+HTML/CSS/JS/JSON saem minificados (scripts/minify.py) e, ao lado de cada
+arquivo de texto ou PDF, vão as versões .gz e .br pré-comprimidas para o
+servidor entregar sem comprimir a cada requisição. O resto (imagens, .xml.gz
+do sitemap, ...) é só espelhado (hardlink quando dá).
+
+O HTML de dist/ é o publicado: os <img> locais ganham srcset, dimensões e
+lazy abaixo da dobra (scripts/responsive_images.py, variantes em img/r/), o
+<head> ganha o CSS crítico com o Tailwind CDN em defer (scripts/critical_css.py)
+e o prefetch/preload calculado pela etapa hints (scripts/resource_hints.py);
+os links para PDFs apontam para a cópia otimizada (scripts/optimize_pdfs.py,
+em assets/pdf/).
+
+Imagens, PDFs, CSS e JS ganham também uma cópia com o hash do conteúdo no
+nome (scripts/fingerprint.py) e o HTML de dist/ passa a apontar para ela;
+dist/asset-manifest.json mapeia original -> com hash e dist/_headers marca
+todo arquivo com hash no nome como imutável (cache de um ano).
+
+No GitHub Pages valem a minificação e os nomes com hash; o Pages comprime
+por conta própria e ignora _headers e os .gz/.br, que ficam para um host que
+os use (Netlify, Cloudflare Pages, nginx com gzip_static/brotli_static).
+
+Os fontes no repositório não são tocados: index.html & cia continuam
+editáveis à mão. O estado guarda o hash de cada fonte, então só o que mudou
+é minificado e comprimido de novo. O relatório com os bytes economizados
+por arquivo vai para analytics_report/asset_sizes.csv.
+"""
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+
+from critical_css import inline_critical, load_critical
+from fingerprint import (HEADERS_NAME, MANIFEST_NAME, build_manifest, is_fingerprintable, is_hashed,
+                         manifest_digest, render_headers, rewrite_html)
+from minify import minify_css, minify_html, minify_js, minify_json
+from optimize_pdfs import load_links as load_pdf_links, rewrite_page as pdf_page
+from resource_hints import inject_hints, load_hints
+from responsive_images import load_state as load_images, rewrite_page as responsive_page
+
+try:
+    import brotli
+except ImportError:  # opcional: sem o pacote, só .gz
+    brotli = None
+
+ROOT = Path(__file__).resolve().parents[1]
+DIST_DIR = ROOT / "dist"
+
+STATE_PATH = ROOT / "scripts" / "optimize_state.json"
+STATE_VERSION = 2
+REPORT_PATH = ROOT / "analytics_report" / "asset_sizes.csv"
+
+# não são publicados
+SKIP_DIRS = {".git", ".github", "node_modules", "content_pipeline", "seo_audit",
+             "analytics_report", "scripts", "dist"}
+
+MINIFIERS = {
+    ".html": minify_html,
+    ".css": minify_css,
+    ".js": minify_js,
+    ".json": minify_json,
+}
+# ganham irmãos .gz/.br
+COMPRESS_EXTS = (".html", ".css", ".js", ".json", ".xml", ".txt", ".svg", ".pdf")
+# só grava a versão comprimida se ela economizar pelo menos isso
+MIN_RATIO = 0.95
+
+
+def read_file(path: Path) -> bytes:
+    return path.read_bytes()
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def iter_site_files(files=None):
+    if files is None:
+        files = [p.relative_to(ROOT).as_posix() for p in ROOT.rglob("*") if p.is_file()]
+    for rel in sorted(files):
+        parts = rel.split("/")
+        if parts[0] in SKIP_DIRS or any(p.startswith(".") for p in parts):
+            continue
+        yield rel
+
+
+def gzip_bytes(data: bytes) -> bytes:
+    buf = io.BytesIO()
+    # mtime=0: mesma entrada, mesmos bytes
+    with gzip.GzipFile(fileobj=buf, mode="wb", compresslevel=9, mtime=0) as gz:
+        gz.write(data)
+    return buf.getvalue()
+
+
+def write_bytes(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def mirror(src: Path, dest: Path) -> None:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    if dest.exists():
+        dest.unlink()
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copy2(src, dest)
+
+
+def optimize_file(job: tuple) -> dict:
+    """Minifica/comprime um arquivo para dist/ (processo principal ou worker).
+
+    Retorna o registro do estado: hash da fonte, tamanhos e saídas geradas.
+    """
+    rel, data, digest, manifest, images, pdf_links, hints, critical = job
+    ext = os.path.splitext(rel)[1].lower()
+    dest = DIST_DIR / rel
+    entry = {"sha256": digest, "original": len(data), "minified": len(data),
+             "gzip": None, "brotli": None, "outputs": [rel]}
+
+    minify = MINIFIERS.get(ext)
+    if minify is None:
+        body = data
+        mirror(ROOT / rel, dest)
+    else:
+        try:
+            text = data.decode("utf-8")
+            if ext == ".html":
+                text = responsive_page(rel, text, images)
+                text = pdf_page(rel, text, pdf_links)
+                if critical:
+                    text = inline_critical(text, *critical)
+                text = inject_hints(text, hints)
+                text = rewrite_html(rel, text, manifest)
+            body = minify(text).encode("utf-8")
+        except UnicodeDecodeError:
+            body = data
+        if len(body) >= len(data) and ext != ".html":
+            body = data  # nada a ganhar (ex.: JSON já compacto)
+        entry["minified"] = len(body)
+        write_bytes(dest, body)
+
+    if ext in COMPRESS_EXTS:
+        compressors = [("gzip", ".gz", gzip_bytes)]
+        if brotli is not None:
+            compressors.append(("brotli", ".br", lambda b: brotli.compress(b, quality=11)))
+        for key, suffix, compress in compressors:
+            packed = compress(body)
+            if len(packed) <= len(body) * MIN_RATIO:
+                write_bytes(DIST_DIR / (rel + suffix), packed)
+                entry[key] = len(packed)
+                entry["outputs"].append(rel + suffix)
+
+    # cópia com hash: mesmos bytes (e mesmos .gz/.br) com outro nome
+    hashed = manifest.get(rel)
+    if hashed is not None:
+        for out in list(entry["outputs"]):
+            target = hashed + out[len(rel):]
+            mirror(DIST_DIR / out, DIST_DIR / target)
+            entry["outputs"].append(target)
+    return entry
+
+
+def transfer_size(entry: dict) -> int:
+    return min(v for v in (entry["minified"], entry["gzip"], entry["brotli"]) if v is not None)
+
+
+def load_state() -> dict:
+    if STATE_PATH.exists():
+        try:
+            state = json.loads(STATE_PATH.read_text(encoding="utf-8"))
+            if state.get("version") == STATE_VERSION:
+                return state.get("files", {})
+        except ValueError:
+            print(f"⚠️ estado da otimização inválido, refazendo tudo: {STATE_PATH}")
+    return {}
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    if path.exists() and path.read_text(encoding="utf-8") == text:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+    return True
+
+
+def render_report(files: dict) -> str:
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(["file", "original", "minified", "gzip", "brotli", "saved_bytes"])
+    for rel, e in files.items():
+        if rel.endswith(COMPRESS_EXTS) or e["minified"] != e["original"]:
+            w.writerow([rel, e["original"], e["minified"], e["gzip"] or "", e["brotli"] or "",
+                        e["original"] - transfer_size(e)])
+    return buf.getvalue()
+
+
+def optimize(files=None, read=read_file, jobs: int = 1, force: bool = False) -> dict:
+    """Atualiza dist/ e devolve {"written": [...], "removed": [...]}."""
+    if brotli is None:
+        print("⚠️ pacote brotli não instalado: só .gz (pip install -r scripts/requirements.txt)")
+    previous = {} if force else load_state()
+    current, todo = {}, []
+
+    site = list(iter_site_files(files))
+    manifest = build_manifest((rel, read(ROOT / rel)) for rel in site if is_fingerprintable(rel))
+    images = load_images()
+    pdf_links = load_pdf_links()
+    hints = load_hints()
+    critical = load_critical()
+    # o HTML de dist/ aponta para os nomes com hash e para as variantes das
+    # imagens: muda quando qualquer asset ou variante muda (ou as dicas e o
+    # CSS crítico da página)
+    assets_digest = sha256_bytes("".join(manifest_digest(m) for m in (manifest, images, pdf_links)).encode("ascii"))
+
+    for rel in site:
+        data = read(ROOT / rel)
+        digest = sha256_bytes(data)
+        tags = hints.get(rel, [])
+        page_css = critical.get(rel)
+        if rel.endswith(".html"):
+            extra = "\0".join(tags + list(page_css or ()))
+            digest = sha256_bytes((digest + assets_digest + extra).encode("utf-8"))
+        prev = previous.get(rel)
+        if prev and prev["sha256"] == digest and all((DIST_DIR / o).exists() for o in prev["outputs"]):
+            current[rel] = prev
+        else:
+            todo.append((rel, data, digest, manifest, images, pdf_links, tags, page_css))
+
+    if jobs > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(optimize_file, todo, chunksize=max(1, len(todo) // (jobs * 4))))
+    else:
+        results = [optimize_file(job) for job in todo]
+
+    written, removed = [], []
+    for (rel, *_), entry in zip(todo, results):
+        current[rel] = entry
+        written += [DIST_DIR / o for o in entry["outputs"]]
+        if entry["minified"] != entry["original"] or entry["gzip"]:
+            print(f"OK: {rel}: {entry['original'] / 1024:.1f} -> {transfer_size(entry) / 1024:.1f} KiB")
+
+    extras = {
+        MANIFEST_NAME: json.dumps(manifest, ensure_ascii=False, indent=2) + "\n",
+        HEADERS_NAME: render_headers(o for e in current.values() for o in e["outputs"]
+                                     if is_hashed(o)),
+    }
+    for name, text in extras.items():
+        if write_if_changed(DIST_DIR / name, text):
+            written.append(DIST_DIR / name)
+
+    # saídas de fontes que mudaram de tipo ou sumiram
+    keep = {o for e in current.values() for o in e["outputs"]} | set(extras)
+    if DIST_DIR.exists():
+        for path in sorted(DIST_DIR.rglob("*")):
+            if path.is_file() and path.relative_to(DIST_DIR).as_posix() not in keep:
+                path.unlink()
+                removed.append(path)
+
+    current = dict(sorted(current.items()))
+    payload = json.dumps({"version": STATE_VERSION, "files": current}, ensure_ascii=False, indent=2) + "\n"
+    if write_if_changed(STATE_PATH, payload):
+        written.append(STATE_PATH)
+    if write_if_changed(REPORT_PATH, render_report(current)):
+        written.append(REPORT_PATH)
+
+    original = sum(e["original"] for rel, e in current.items() if rel.endswith(COMPRESS_EXTS))
+    transfer = sum(transfer_size(e) for rel, e in current.items() if rel.endswith(COMPRESS_EXTS))
+    saved = 100 * (1 - transfer / original) if original else 0
+    print(f"OK: dist/ com {len(current)} arquivo(s) ({len(todo)} reprocessado(s), "
+          f"{len(manifest)} com cópia de nome com hash); texto/PDF {original / 1024:.0f} KiB -> {transfer / 1024:.0f} KiB transferidos ({saved:.0f}% a menos).")
+    return {"written": written, "removed": removed}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Minifica e pré-comprime o site em dist/.")
+    parser.add_argument("--jobs", type=int, default=1, metavar="N",
+                        help="processa em N processos (padrão: 1)")
+    parser.add_argument("--force", action="store_true",
+                        help="ignora o estado e refaz todos os arquivos")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    optimize(jobs=args.jobs, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
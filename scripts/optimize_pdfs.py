@@ -0,0 +1,378 @@
+# scripts/optimize_pdfs.py
+"""Guias em PDF otimizados para download.
+
+PDFs idênticos (mesmo hash, ex.: assets/PDF2-ing.pdf e en/7 healthy
+habits.pdf) viram uma cópia só em assets/pdf/, com o hash no nome.
+assets/pdf/ é saída de build, como img/r/: fora do git e guardada no cache
+do CI. Cada cópia passa por:
+
+- Ghostscript, se estiver no PATH (ou em GS_CMD): reescreve o PDF com as
+  fontes reduzidas aos glifos usados (subset) e imagens reamostradas;
+  só fica com o resultado se ele for menor;
+- pikepdf: JPEGs grandes reduzidos e recomprimidos, fontes/CMaps embutidos
+  várias vezes (um por página, comum em PDFs exportados do Canva)
+  guardados uma vez só, object streams e linearização (o leitor mostra a
+  primeira página antes de o download terminar).
+
+O estado guarda o resultado por hash da origem: PDF que não mudou não é
+reprocessado. As páginas do repositório não são tocadas: rewrite_page()
+aponta os <a href> para a cópia otimizada só na cópia publicada
+(scripts/optimize_assets.py, em dist/) e na versão que a auditoria confere;
+os originais continuam publicados para links de fora. O relatório vai para
+analytics_report/pdf_sizes.csv.
+"""
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import unquote
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import posixpath
+import re
+import shlex
+import shutil
+import subprocess
+import tempfile
+import unicodedata
+
+try:
+    import pikepdf
+    from pikepdf import Name, PdfImage
+    from PIL import Image
+except ImportError:  # etapa opcional: sem pikepdf, os PDFs saem como estão
+    pikepdf = None
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# cópias otimizadas (não são origem de novas cópias)
+OUT_DIR = "assets/pdf"
+
+# hash da origem -> cópia gerada, tamanhos e ferramentas usadas
+STATE_PATH = ROOT / "scripts" / "pdf_state.json"
+STATE_VERSION = 1
+REPORT_PATH = ROOT / "analytics_report" / "pdf_sizes.csv"
+
+# imagens: lado maior (px) e qualidade do JPEG recomprimido; as pequenas ficam como estão
+MAX_IMAGE_SIDE = 1600
+JPEG_QUALITY = 80
+MIN_IMAGE_BYTES = 32 * 1024
+# só troca a imagem se economizar pelo menos isso
+MIN_RATIO = 0.9
+
+# comando do Ghostscript: GS_CMD (ex.: "docker run ... gs") ou gs no PATH
+GS_CMD = os.environ.get("GS_CMD", "")
+GS_ARGS = ["-q", "-dNOPAUSE", "-dBATCH", "-dSAFER", "-sDEVICE=pdfwrite", "-dCompatibilityLevel=1.5",
+           "-dPDFSETTINGS=/ebook", "-dSubsetFonts=true", "-dEmbedAllFonts=true",
+           "-dDetectDuplicateImages=true"]
+GS_TIMEOUT = 120
+
+# mudou algum parâmetro: o cache não vale mais
+SETTINGS = f"{MAX_IMAGE_SIDE}:{JPEG_QUALITY}:{MIN_IMAGE_BYTES}:{' '.join(GS_ARGS)}"
+
+# páginas/arquivos que não são publicados
+SKIP_PREFIXES = (".git/", ".github/", "content_pipeline/", "seo_audit/", "analytics_report/", "scripts/", "dist/",
+                 "node_modules/")
+
+HREF_RE = re.compile(r"""(\bhref\s*=\s*)(["'])([^"']*?\.pdf)([?#][^"']*)?\2""", re.I)
+
+
+def read_file(path: Path) -> bytes:
+    return path.read_bytes()
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def slugify(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "guia"
+
+
+def iter_pdfs(files=None):
+    """PDFs publicados (caminhos relativos, com /), fora as cópias de OUT_DIR."""
+    if files is None:
+        files = [p.relative_to(ROOT).as_posix() for p in ROOT.rglob("*.pdf")]
+    for rel in sorted(files):
+        if rel.lower().endswith(".pdf") and not rel.startswith(SKIP_PREFIXES + (OUT_DIR + "/",)):
+            yield rel
+
+
+def ghostscript_command() -> list | None:
+    if GS_CMD:
+        return shlex.split(GS_CMD)
+    found = shutil.which("gs")
+    return [found] if found else None
+
+
+def run_ghostscript(cmd: list, src: Path, dest: Path) -> bool:
+    try:
+        subprocess.run(cmd + GS_ARGS + [f"-sOutputFile={dest}", str(src)],
+                       check=True, capture_output=True, timeout=GS_TIMEOUT)
+    except (OSError, subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        print(f"⚠️ Ghostscript falhou em {src.name}, seguindo sem ele: {e}")
+        return False
+    return dest.exists()
+
+
+def recompress_images(pdf) -> int:
+    """JPEGs grandes: reduz para MAX_IMAGE_SIDE e recomprime. Retorna quantos."""
+    done = 0
+    for obj in pdf.objects:
+        if not isinstance(obj, pikepdf.Stream) or obj.get("/Subtype") != "/Image":
+            continue
+        # máscaras e /Decode mudam o significado dos pixels: ficam como estão
+        if obj.get("/Filter") != "/DCTDecode" or any(k in obj for k in ("/SMask", "/Mask", "/Decode")):
+            continue
+        raw = obj.read_raw_bytes()
+        if len(raw) < MIN_IMAGE_BYTES:
+            continue
+        try:
+            im = PdfImage(obj).as_pil_image()
+        except (pikepdf.PdfError, NotImplementedError, OSError, ValueError):
+            continue
+        if im.mode not in ("RGB", "L"):
+            continue  # CMYK & cia: o JPEG regravado sai com as cores invertidas
+        if max(im.size) > MAX_IMAGE_SIDE:
+            im.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE), Image.LANCZOS)
+        buf = io.BytesIO()
+        im.save(buf, format="JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        if buf.tell() > len(raw) * MIN_RATIO:
+            continue
+        # o /ColorSpace original (ex.: ICCBased) continua valendo para os mesmos canais
+        obj.write(buf.getvalue(), filter=Name.DCTDecode)
+        obj.Width, obj.Height = im.size
+        obj.BitsPerComponent = 8
+        if "/DecodeParms" in obj:
+            del obj["/DecodeParms"]
+        done += 1
+    return done
+
+
+def stream_key(stream) -> str:
+    h = hashlib.sha256(stream.read_raw_bytes())
+    for k, v in sorted(stream.stream_dict.items()):
+        if k != "/Length":
+            h.update(f"{k}={v!r}".encode("utf-8"))
+    return h.hexdigest()
+
+
+def dedupe_streams(pdf) -> int:
+    """Fontes, CMaps e imagens repetidos passam a ser um objeto só.
+
+    O pikepdf só grava o que continua referenciado, então as cópias somem.
+    Retorna quantas referências foram trocadas.
+    """
+    seen, replaced = {}, 0
+
+    def share(holder, key):
+        nonlocal replaced
+        stream = holder.get(key)
+        if not isinstance(stream, pikepdf.Stream):
+            return
+        first = seen.setdefault(stream_key(stream), stream)
+        if first.objgen != stream.objgen:
+            holder[key] = first
+            replaced += 1
+
+    for obj in pdf.objects:
+        if not isinstance(obj, pikepdf.Dictionary):
+            continue
+        if obj.get("/Type") == "/FontDescriptor":
+            for key in ("/FontFile", "/FontFile2", "/FontFile3", "/CIDSet"):
+                share(obj, key)
+        elif obj.get("/Type") == "/Font":
+            share(obj, "/ToUnicode")
+    for page in pdf.pages:
+        xobjects = page.obj.get("/Resources", {}).get("/XObject")
+        if isinstance(xobjects, pikepdf.Dictionary):
+            for key in list(xobjects.keys()):
+                if isinstance(xobjects[key], pikepdf.Stream) and xobjects[key].get("/Subtype") == "/Image":
+                    share(xobjects, key)
+    return replaced
+
+
+def output_name(rel: str, data: bytes) -> str:
+    return f"{OUT_DIR}/{slugify(Path(rel).stem)}.{sha256_bytes(data)[:8]}.pdf"
+
+
+def optimize_pdf(job: tuple) -> dict:
+    """Otimiza um PDF (processo principal ou worker) e grava a cópia em OUT_DIR."""
+    rel, digest, gs = job
+    src = ROOT / rel
+    ghostscript = False
+    with tempfile.TemporaryDirectory() as tmp:
+        current = src
+        if gs:
+            candidate = Path(tmp) / "gs.pdf"
+            if run_ghostscript(gs, src, candidate) and candidate.stat().st_size < src.stat().st_size:
+                current = candidate
+                ghostscript = True
+        with pikepdf.open(current) as pdf:
+            images = recompress_images(pdf)
+            shared = dedupe_streams(pdf)
+            buf = io.BytesIO()
+            pdf.save(buf, linearize=True, object_stream_mode=pikepdf.ObjectStreamMode.generate,
+                     compress_streams=True, recompress_flate=True, deterministic_id=True)
+    data = buf.getvalue()
+
+    path = output_name(rel, data)
+    tmp_path = ROOT / (path + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, ROOT / path)
+    return {"sha256": digest, "output": path, "original": src.stat().st_size, "optimized": len(data),
+            "images": images, "shared": shared, "ghostscript": ghostscript, "settings": SETTINGS,
+            "gs_available": bool(gs)}
+
+
+def load_links() -> dict:
+    """PDF de origem -> cópia otimizada, para reescrever os links publicados."""
+    return {src: e["output"] for e in load_state().values() for src in e.get("sources", [])}
+
+
+def load_state() -> dict:
+    if STATE_PATH.exists():
+        try:
+            state = json.loads(STATE_PATH.read_text(encoding="utf-8"))
+            if state.get("version") == STATE_VERSION:
+                return state.get("pdfs", {})
+        except ValueError:
+            print(f"⚠️ estado dos PDFs inválido, refazendo tudo: {STATE_PATH}")
+    return {}
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    if path.exists() and path.read_text(encoding="utf-8") == text:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+    return True
+
+
+def render_report(pdfs: dict) -> str:
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(["output", "sources", "copies", "original", "optimized", "saved_bytes"])
+    for e in sorted(pdfs.values(), key=lambda e: e["output"]):
+        copies = len(e["sources"])
+        w.writerow([e["output"], " | ".join(e["sources"]), copies, e["original"], e["optimized"],
+                    e["original"] * copies - e["optimized"]])
+    return buf.getvalue()
+
+
+# --- links nas páginas ---
+
+def resolve_href(page: str, href: str) -> str | None:
+    if href.startswith(("http:", "https:", "//", "data:", "mailto:")):
+        return None
+    href = unquote(href)
+    path = href.lstrip("/") if href.startswith("/") else posixpath.join(posixpath.dirname(page), href)
+    path = posixpath.normpath(path)
+    return None if path.startswith("..") else path
+
+
+def rewrite_page(page: str, text: str, links: dict) -> str:
+    """HTML publicado de `page`: links para PDFs de origem apontam para a cópia."""
+    if not links:
+        return text
+
+    def replace(m):
+        prefix, quote, href, rest = m.groups()
+        target = links.get(resolve_href(page, href))
+        if target is None:
+            return m.group(0)
+        # mesmo estilo do site: caminhos absolutos a partir da raiz
+        return f"{prefix}{quote}/{target}{rest or ''}{quote}"
+
+    return HREF_RE.sub(replace, text)
+
+
+def process(files=None, read=read_file, jobs: int = 1, force: bool = False) -> dict:
+    """Gera as cópias que faltam e limpa as órfãs (as páginas não são tocadas).
+
+    Devolve {"written": [...], "removed": [...]}.
+    """
+    written, removed = [], []
+    if pikepdf is None:
+        print("⚠️ pikepdf não instalado: PDFs não otimizados (pip install -r scripts/requirements.txt)")
+        return {"written": written, "removed": removed}
+
+    gs = ghostscript_command()
+    if gs is None:
+        print("⚠️ Ghostscript não encontrado: PDFs otimizados sem subset de fontes "
+              "(instale o ghostscript ou defina GS_CMD)")
+
+    # PDFs iguais: uma cópia só; o nome vem do primeiro caminho
+    groups: dict[str, list] = {}
+    for rel in iter_pdfs(files):
+        groups.setdefault(sha256_bytes(read(ROOT / rel)), []).append(rel)
+
+    previous = {} if force else load_state()
+    pdfs, todo = {}, []
+    (ROOT / OUT_DIR).mkdir(parents=True, exist_ok=True)
+    for digest, rels in groups.items():
+        prev = previous.get(digest)
+        # resultado sem o Ghostscript é refeito quando ele aparece
+        if (prev and prev["settings"] == SETTINGS and (prev["gs_available"] or not gs)
+                and (ROOT / prev["output"]).exists()):
+            pdfs[digest] = dict(prev, sources=rels)
+        else:
+            todo.append((rels[0], digest, gs))
+
+    if jobs > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(optimize_pdf, todo))
+    else:
+        results = [optimize_pdf(job) for job in todo]
+    for (rel, digest, _), entry in zip(todo, results):
+        pdfs[digest] = dict(entry, sources=groups[digest])
+        written.append(ROOT / entry["output"])
+        print(f"OK: {rel} -> {entry['output']}: {entry['original'] / 1024:.0f} -> "
+              f"{entry['optimized'] / 1024:.0f} KiB ({entry['images']} imagem(ns) recomprimida(s), "
+              f"{entry['shared']} objeto(s) repetido(s))")
+
+    # cópias de PDFs que mudaram ou sumiram
+    keep = {e["output"] for e in pdfs.values()}
+    for path in sorted((ROOT / OUT_DIR).iterdir()):
+        if path.relative_to(ROOT).as_posix() not in keep:
+            path.unlink()
+            removed.append(path)
+
+    payload = json.dumps({"version": STATE_VERSION, "pdfs": dict(sorted(pdfs.items()))},
+                         ensure_ascii=False, indent=2) + "\n"
+    if write_if_changed(STATE_PATH, payload):
+        written.append(STATE_PATH)
+    if write_if_changed(REPORT_PATH, render_report(pdfs)):
+        written.append(REPORT_PATH)
+
+    files_total = sum(len(e["sources"]) for e in pdfs.values())
+    original = sum(e["original"] * len(e["sources"]) for e in pdfs.values())
+    optimized = sum(e["optimized"] for e in pdfs.values())
+    saved = 100 * (1 - optimized / original) if original else 0
+    print(f"OK: {files_total} PDF(s), {len(pdfs)} único(s), {len(todo)} otimizado(s); "
+          f"{original / 1024:.0f} KiB -> {optimized / 1024:.0f} KiB ({saved:.0f}% a menos).")
+    return {"written": written, "removed": removed}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Deduplica e otimiza os PDFs do site em assets/pdf/.")
+    parser.add_argument("--jobs", type=int, default=1, metavar="N",
+                        help="otimiza em N processos (padrão: 1)")
+    parser.add_argument("--force", action="store_true",
+                        help="ignora o estado e refaz todos os PDFs")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    process(jobs=args.jobs, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# scripts/pipeline_trace.py
+"""Métricas do site_pipeline.py: tempo por etapa e por arquivo, bytes lidos
+e escritos e taxa de acerto dos caches.
+
+As etapas não dependem deste módulo: cada uma devolve, junto com
+written/removed, um "stats" opcional:
+
+    {"files": [(arquivo, início, duração, pid), ...], "hits": n, "misses": m,
+     "read": [arquivos, bytes]}
+
+(início em time.perf_counter(), que no Linux é o mesmo relógio em todos os
+processos, então os tempos medidos nos workers do --jobs se alinham). O
+Tracer junta isso num trace no formato do Chrome (chrome://tracing,
+ui.perfetto.dev) e numa tabela de resumo.
+
+Lidos = leituras pelo inventário do pipeline + o "read" que a etapa
+informa para o que ela lê direto do disco (o build lê articles.json,
+template e corpos sem passar pelo inventário).
+"""
+from __future__ import annotations
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# páginas mais lentas listadas no resumo
+TOP_FILES = 5
+
+
+@dataclass
+class StageMetrics:
+    name: str
+    start: float
+    seconds: float = 0.0
+    files_read: int = 0
+    bytes_read: int = 0
+    files_written: int = 0
+    bytes_written: int = 0
+    files_removed: int = 0
+    hits: int | None = None
+    misses: int | None = None
+    files: list = field(default_factory=list)   # (arquivo, início, duração, pid)
+
+    @property
+    def hit_rate(self) -> float | None:
+        total = (self.hits or 0) + (self.misses or 0)
+        return None if self.hits is None or not total else self.hits / total
+
+
+class Tracer:
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.pid = os.getpid()
+        self.stages: list[StageMetrics] = []
+
+    def start(self, name: str) -> StageMetrics:
+        stage = StageMetrics(name, time.perf_counter())
+        self.stages.append(stage)
+        return stage
+
+    def finish(self, stage: StageMetrics, result: dict | None, files_read: int, bytes_read: int) -> None:
+        """Fecha a etapa com o que ela devolveu e as leituras do inventário."""
+        stage.seconds = time.perf_counter() - stage.start
+        result = result or {}
+        stats = result.get("stats") or {}
+        own_files, own_bytes = stats.get("read") or (0, 0)
+        stage.files_read = files_read + own_files
+        stage.bytes_read = bytes_read + own_bytes
+        for p in result.get("written", []):
+            try:
+                stage.bytes_written += os.path.getsize(p)
+                stage.files_written += 1
+            except OSError:
+                pass  # escrito e removido na mesma etapa
+        stage.files_removed = len(result.get("removed", []))
+        stage.hits = stats.get("hits")
+        stage.misses = stats.get("misses")
+        stage.files = list(stats.get("files", []))
+
+    # --- saídas ---
+
+    def us(self, t: float) -> float:
+        return round((t - self.t0) * 1e6, 1)
+
+    def chrome_trace(self) -> dict:
+        """Trace-event format: uma faixa para as etapas, uma por processo (worker)."""
+        events = [{"name": "thread_name", "ph": "M", "pid": self.pid, "tid": 0, "args": {"name": "etapas"}}]
+        lanes = set()
+        for s in self.stages:
+            args = {"files_read": s.files_read, "bytes_read": s.bytes_read,
+                    "files_written": s.files_written, "bytes_written": s.bytes_written,
+                    "files_removed": s.files_removed}
+            if s.hits is not None:
+                args.update(cache_hits=s.hits, cache_misses=s.misses)
+            events.append({"name": s.name, "cat": "stage", "ph": "X", "pid": self.pid, "tid": 0,
+                           "ts": self.us(s.start), "dur": round(s.seconds * 1e6, 1), "args": args})
+            for rel, start, seconds, pid in s.files:
+                lanes.add(pid)
+                events.append({"name": rel, "cat": s.name, "ph": "X", "pid": self.pid, "tid": pid,
+                               "ts": self.us(start), "dur": round(seconds * 1e6, 1)})
+            events.append({"name": "bytes", "ph": "C", "pid": self.pid, "ts": self.us(s.start + s.seconds),
+                           "args": {"read": s.bytes_read, "written": s.bytes_written}})
+        for pid in sorted(lanes):
+            label = "principal" if pid == self.pid else f"worker {pid}"
+            events.append({"name": "thread_name", "ph": "M", "pid": self.pid, "tid": pid, "args": {"name": label}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(self.chrome_trace(), ensure_ascii=False) + "\n", encoding="utf-8")
+        os.replace(tmp, path)
+        print(f"OK: trace em {path} (abra em chrome://tracing ou ui.perfetto.dev)")
+
+    def summary(self, top: int = TOP_FILES) -> str:
+        lines = [f"{'Etapa':<10} {'Tempo':>8} {'Lidos':>7} {'KiB lidos':>10} {'Escritos':>9} "
+                 f"{'KiB escritos':>13} {'Cache':>6}"]
+        for s in self.stages:
+            rate = f"{s.hit_rate:.0%}" if s.hit_rate is not None else "-"
+            lines.append(f"{s.name:<10} {s.seconds:>7.3f}s {s.files_read:>7} {s.bytes_read / 1024:>10.1f} "
+                         f"{s.files_written:>9} {s.bytes_written / 1024:>13.1f} {rate:>6}")
+        total = sum(s.seconds for s in self.stages)
+        lines.append(f"{'total':<10} {total:>7.3f}s {sum(s.files_read for s in self.stages):>7} "
+                     f"{sum(s.bytes_read for s in self.stages) / 1024:>10.1f} "
+                     f"{sum(s.files_written for s in self.stages):>9} "
+                     f"{sum(s.bytes_written for s in self.stages) / 1024:>13.1f}")
+
+        slowest = sorted(((seconds, s.name, rel) for s in self.stages for rel, _, seconds, _ in s.files),
+                         reverse=True)[:top]
+        if slowest:
+            lines.append(f"\nArquivos mais lentos (top {len(slowest)}):")
+            lines += [f"  {seconds * 1000:>8.1f} ms  {name:<8} {rel}" for seconds, name, rel in slowest]
+        return "\n".join(lines)
@@ -0,0 +1,318 @@
+# scripts/resource_hints.py
+"""<link rel="prefetch"> e <link rel="preload"> gerados a partir do grafo de links.
+
+Para cada página publicada:
+
+- prefetch das próximas navegações prováveis: os links internos (para
+  outras páginas .html) são pontuados pelo destaque na página (botão de
+  CTA, card com imagem, link no conteúdo, posição) e pela popularidade do
+  destino no grafo (quantas páginas linkam para ele); os MAX_PREFETCH
+  melhores entram no <head>. O navegador baixa com prioridade mínima, no
+  ocioso, e o clique abre do cache, sem JS nenhum;
+- preload da imagem do hero (primeira <img> local acima da dobra, fora do
+  cabeçalho e sem loading="lazy"), com o mesmo srcset/sizes do <img> para
+  não baixar duas vezes.
+
+As páginas do repositório não são tocadas: as tags de cada página ficam no
+estado ("hints") e o optimize_assets.py as põe só na cópia publicada em
+dist/. Por isso os fatos saem da página como é publicada (srcset do
+scripts/responsive_images.py), e o hero é o da versão publicada. Os fatos
+(links pontuados e hero) ficam no estado pelo hash dessa versão; o ranking é
+refeito sempre porque depende do site todo. O grafo é o LinkIndex que a
+auditoria acabou de montar (o pipeline o repassa); rodando sozinho, é
+montado aqui. A auditoria aponta excesso de preload.
+"""
+from pathlib import Path
+import argparse
+import hashlib
+import html
+import json
+import math
+import os
+import re
+import sys
+
+from lxml import etree, html as lxml_html
+
+from critical_css import above_the_fold
+from responsive_images import load_state as load_images, rewrite_page as responsive_page
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "seo_audit"))
+
+from link_index import LinkIndex, is_local  # noqa: E402
+
+STATE_PATH = ROOT / "scripts" / "hints_state.json"
+STATE_VERSION = 2
+
+# limites por página
+MAX_PREFETCH = 3
+MAX_PRELOAD = 1   # só a imagem do hero (LCP): preload demais disputa banda com ela
+
+# pontos de cada link; um destino soma os pontos de todos os links para ele
+CTA_POINTS = 3        # botão: fundo colorido (bg-*) ou role="button"
+CARD_POINTS = 2       # link com imagem dentro (card de artigo/produto)
+LINK_POINTS = 1
+EARLY_POINTS = 1      # entre os primeiros EARLY_LINKS links do conteúdo
+EARLY_LINKS = 8
+CHROME_FACTOR = 0.25  # menu/cabeçalho/rodapé: está em toda página, diz pouco
+CHROME_TAGS = {"header", "nav", "footer"}
+# popularidade do destino no grafo: GRAPH_WEIGHT * log(1 + links de entrada)
+GRAPH_WEIGHT = 0.5
+# abaixo disso não vale o prefetch (ex.: um link solto no rodapé)
+MIN_SCORE = 2.0
+
+# páginas que não são publicadas ou não são do site
+SKIP_PREFIXES = (".git/", ".github/", "content_pipeline/", "seo_audit/", "analytics_report/", "scripts/", "dist/",
+                 "node_modules/")
+
+HINT_RE = re.compile(r"[ \t]*<link\b[^>]*\bdata-hint\b[^>]*>\n?", re.I)
+HEAD_END_RE = re.compile(r"</head\s*>", re.I)
+BG_RE = re.compile(r"(?:^|\s)bg-(?!white\b|transparent\b)")
+
+
+def read_file(path: Path) -> bytes:
+    return path.read_bytes()
+
+
+def sha256_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def iter_pages(files):
+    for rel in sorted(files):
+        if rel.endswith(".html") and not rel.startswith(SKIP_PREFIXES):
+            yield rel
+
+
+def strip_hints(text: str) -> str:
+    return HINT_RE.sub("", text)
+
+
+def in_chrome(el) -> bool:
+    return any(a.tag in CHROME_TAGS for a in el.iterancestors())
+
+
+def link_points(a, early: bool) -> float:
+    classes = a.get("class") or ""
+    if BG_RE.search(classes) or a.get("role") == "button":
+        points = CTA_POINTS
+    elif a.find(".//img") is not None:
+        points = CARD_POINTS
+    else:
+        points = LINK_POINTS
+    if in_chrome(a):
+        return points * CHROME_FACTOR
+    return points + (EARLY_POINTS if early else 0)
+
+
+def scored_links(doc) -> list:
+    """[[href, pontos]] dos <a> locais, na ordem da página (antes de resolver)."""
+    links, content = [], 0
+    for a in doc.iter("a"):
+        href = (a.get("href") or "").strip()
+        if not is_local(href) or "download" in a.attrib or "nofollow" in (a.get("rel") or ""):
+            continue
+        early = not in_chrome(a) and content < EARLY_LINKS
+        if not in_chrome(a):
+            content += 1
+        links.append([href, link_points(a, early)])
+    return links
+
+
+def hero_preload(text: str) -> dict | None:
+    """Atributos do preload da imagem do hero, ou None."""
+    fold = above_the_fold(text)
+    if not fold.strip():
+        return None
+    try:
+        top = lxml_html.fromstring(f"<div>{fold}</div>")
+    except (etree.ParserError, ValueError):
+        return None
+    for img in top.iter("img"):
+        src = (img.get("src") or "").strip()
+        if in_chrome(img) or not is_local(src):
+            continue
+        # o autor pediu lazy: preload anularia isso e o hero não é esta imagem
+        if (img.get("loading") or "").strip().lower() == "lazy":
+            continue
+        attrs = {"as": "image", "href": src}
+        # o parser do libxml2 não conhece <source> vazio e põe o <img> dentro dele
+        picture = next((a for a in img.iterancestors() if a.tag == "picture"), None)
+        source = None
+        if picture is not None:
+            source = next((s for s in picture.iter("source") if s.get("srcset")), None)
+        if source is not None:
+            # <picture>: o navegador que entende o type usa a 1ª <source>
+            attrs["imagesrcset"] = source.get("srcset")
+            attrs["imagesizes"] = source.get("sizes") or img.get("sizes") or ""
+            if source.get("type"):
+                attrs["type"] = source.get("type")
+        elif img.get("srcset"):
+            attrs["imagesrcset"] = img.get("srcset")
+            attrs["imagesizes"] = img.get("sizes") or ""
+        attrs["fetchpriority"] = "high"
+        return {k: v for k, v in attrs.items() if v}
+    return None
+
+
+def page_facts(text: str) -> dict:
+    doc = lxml_html.fromstring(text)
+    hero = hero_preload(text)
+    return {"links": scored_links(doc), "preload": [hero] if hero else []}
+
+
+def preload_tags(text: str) -> list:
+    """Só o preload do hero (sem o grafo): a auditoria confere o preload
+    como sai em dist/ sem depender desta etapa, que roda depois dela."""
+    hero = hero_preload(text)
+    return render_hints([], [hero] if hero else [])
+
+
+def page_url(rel: str) -> str:
+    """Caminho publicado, no estilo do site: /artigos/ e não /artigos/index.html."""
+    if rel == "index.html":
+        return "/"
+    if rel.endswith("/index.html"):
+        return "/" + rel[:-len("index.html")]
+    return "/" + rel
+
+
+def rank_prefetch(page: str, facts: dict, index: LinkIndex, inbound: dict) -> list:
+    scores = {}
+    for href, points in facts["links"]:
+        target = index.resolve(page, href)
+        if target and target != page and target.endswith(".html"):
+            scores[target] = scores.get(target, 0.0) + points
+    ranked = sorted(((s + GRAPH_WEIGHT * math.log1p(inbound.get(t, 0)), t) for t, s in scores.items()),
+                    key=lambda st: (-st[0], st[1]))
+    return [t for s, t in ranked if s >= MIN_SCORE][:MAX_PREFETCH]
+
+
+def render_hints(prefetch: list, preload: list) -> list:
+    tags = []
+    for attrs in preload[:MAX_PRELOAD]:
+        body = "".join(f' {k}="{html.escape(v)}"' for k, v in attrs.items())
+        tags.append(f'<link rel="preload"{body} data-hint>')
+    for target in prefetch:
+        tags.append(f'<link rel="prefetch" href="{html.escape(page_url(target))}" data-hint>')
+    return tags
+
+
+def inject_hints(text: str, tags: list) -> str:
+    """Tira as dicas anteriores e põe as novas logo antes do </head>."""
+    text = strip_hints(text)
+    m = HEAD_END_RE.search(text)
+    if not m or not tags:
+        return text
+    line_start = text.rfind("\n", 0, m.start()) + 1
+    indent = text[line_start:m.start()] if not text[line_start:m.start()].strip() else ""
+    # mesma indentação das tags do <head>: a do </head> + 2
+    block = "".join(f"{indent}  {t}\n" for t in tags)
+    if indent or line_start == m.start():
+        return text[:line_start] + block + text[line_start:]
+    return text[:m.start()] + "\n" + block + text[m.start():]
+
+
+def read_state() -> dict:
+    if STATE_PATH.exists():
+        try:
+            state = json.loads(STATE_PATH.read_text(encoding="utf-8"))
+            if state.get("version") == STATE_VERSION:
+                return state
+        except ValueError:
+            print(f"⚠️ estado das dicas de recursos inválido, refazendo: {STATE_PATH}")
+    return {}
+
+
+def load_state() -> dict:
+    return read_state().get("pages", {})
+
+
+def load_hints() -> dict:
+    """página -> tags <link> do <head> publicado (optimize_assets.py)."""
+    return read_state().get("hints", {})
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    if path.exists() and path.read_text(encoding="utf-8") == text:
+        return False
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+    return True
+
+
+def process(files=None, read=read_file, force: bool = False, index: LinkIndex | None = None) -> dict:
+    """Calcula as dicas de todas as páginas e grava no estado (não mexe nas páginas).
+
+    `index` é o grafo da auditoria; sem ele, é montado com os links das páginas.
+
+    Devolve {"written": [...], "removed": [...]}.
+    """
+    if files is None:
+        files = [p.relative_to(ROOT).as_posix() for p in ROOT.rglob("*") if p.is_file()
+                 and ".git" not in p.parts and "dist" not in p.relative_to(ROOT).parts[:1]]
+    files = sorted(files)
+    previous = {} if force else load_state()
+    images = load_images()
+    pages, written = {}, []
+
+    parsed = 0
+    for rel in iter_pages(files):
+        # a página como vai para dist/: o hero é o <img> com srcset e sem lazy
+        text = responsive_page(rel, strip_hints(read(ROOT / rel).decode("utf-8")), images)
+        digest = sha256_text(text)
+        prev = previous.get(rel)
+        if prev and prev["sha256"] == digest:
+            pages[rel] = prev
+        else:
+            pages[rel] = {"sha256": digest, **page_facts(text)}
+            parsed += 1
+
+    # grafo: o da auditoria; sem ele, montado aqui com as mesmas regras
+    # de resolução (/artigos -> artigos/index.html)
+    if index is not None:
+        inbound = index.inbound
+    else:
+        index, inbound = LinkIndex(files), {}
+        for rel, facts in pages.items():
+            for target in {index.resolve(rel, href) for href, _ in facts["links"]} - {rel, None}:
+                inbound[target] = inbound.get(target, 0) + 1
+
+    hints = {}
+    prefetched = preloaded = 0
+    for rel, facts in pages.items():
+        prefetch = rank_prefetch(rel, facts, index, inbound)
+        preload = [p for p in facts["preload"] if index.resolve(rel, p["href"])]
+        tags = render_hints(prefetch, preload)
+        prefetched += len(prefetch)
+        preloaded += min(len(preload), MAX_PRELOAD)
+        if tags:
+            hints[rel] = tags
+
+    payload = json.dumps({"version": STATE_VERSION, "pages": dict(sorted(pages.items())),
+                          "hints": dict(sorted(hints.items()))},
+                         ensure_ascii=False, indent=2) + "\n"
+    if write_if_changed(STATE_PATH, payload):
+        written.append(STATE_PATH)
+
+    print(f"OK: dicas de recursos de {len(pages)} página(s) ({parsed} reanalisada(s)): "
+          f"{prefetched} prefetch, {preloaded} preload.")
+    return {"written": written, "removed": []}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Gera <link rel=prefetch/preload> a partir do grafo de links.")
+    parser.add_argument("--force", action="store_true",
+                        help="ignora o estado e reanalisa todas as páginas")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    process(force=args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+# scripts/responsive_images.py
+"""Variantes responsivas das imagens de img/ + srcset nas páginas publicadas.
+
+Para cada imagem de img/ gera versões menores (WIDTHS) em webp e avif em
+img/r/, com o hash do próprio arquivo gerado no nome: o _headers marca img/r/
+como imutável, então bytes novos têm de vir com URL nova. img/r/ é saída de
+build (fora do git, refeita no CI); o estado guarda o hash de cada origem e
+os parâmetros (SETTINGS): imagem que não mudou, com os mesmos parâmetros,
+não é recodificada.
+
+As páginas do repositório não são tocadas (são editadas à mão). rewrite_page()
+reescreve os <img> locais na cópia publicada (scripts/optimize_assets.py, em
+dist/) e na versão que a auditoria confere: srcset/sizes, width/height (evita
+layout shift) e, abaixo da dobra, loading="lazy" quando a página não diz
+nada; acima da dobra (o hero, a imagem do LCP) a imagem continua carregando
+na hora. Com avif disponível, o <img> vai dentro de um <picture
+data-responsive> com a <source> avif.
+"""
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import hashlib
+import html
+import io
+import json
+import os
+import posixpath
+import re
+
+from critical_css import fold_bounds
+
+try:
+    from PIL import Image, features
+except ImportError:  # etapa opcional: sem Pillow, o site sai como está
+    Image = None
+
+ROOT = Path(__file__).resolve().parents[1]
+
+IMG_DIR = "img"
+# variantes geradas (não são origem de novas variantes)
+OUT_DIR = "img/r"
+SOURCE_EXTS = (".png", ".jpg", ".jpeg", ".webp")
+
+# origem -> hash + dimensões + variantes geradas
+STATE_PATH = ROOT / "scripts" / "image_state.json"
+STATE_VERSION = 1
+
+# larguras geradas (só as menores que a original; a original entra se couber)
+WIDTHS = (320, 640, 960, 1280, 1920)
+# ordem = preferência no <picture>; o último vai no srcset do próprio <img>
+FORMATS = ("avif", "webp")
+QUALITY = {"avif": 55, "webp": 78}
+
+# mudou algum parâmetro: o cache não vale mais
+SETTINGS = f"{','.join(map(str, WIDTHS))}:{','.join(f'{f}={QUALITY[f]}' for f in FORMATS)}"
+
+# a maioria das imagens fica num card de grid (2 colunas a partir do md)
+DEFAULT_SIZES = "(min-width: 768px) 50vw, 100vw"
+
+# páginas que não são publicadas ou não são do site
+SKIP_PREFIXES = (".git/", ".github/", "content_pipeline/", "seo_audit/", "analytics_report/", "scripts/", "dist/")
+
+# <img> e as bordas de <picture> do autor (dentro delas o <img> não é mexido)
+TAG_RE = re.compile(r"<picture\b[^>]*>|</picture\s*>|<img\b[^>]*>", re.I)
+PICTURE_RE = re.compile(
+    r"<picture data-responsive[^>]*>\s*(?:<source\b[^>]*>\s*)*(<img\b[^>]*>)\s*</picture>", re.I
+)
+ATTR_RE = re.compile(r"""([^\s=/>]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?""")
+
+
+def read_file(path: Path) -> bytes:
+    return path.read_bytes()
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def available_formats() -> tuple:
+    return tuple(f for f in FORMATS if features.check(f))
+
+
+def iter_sources(files=None):
+    """Imagens de origem (caminhos relativos, com /)."""
+    if files is None:
+        files = [p.relative_to(ROOT).as_posix() for p in (ROOT / IMG_DIR).glob("*")]
+    for rel in sorted(files):
+        if posixpath.dirname(rel) == IMG_DIR and rel.lower().endswith(SOURCE_EXTS):
+            yield rel
+
+
+def target_widths(width: int) -> list:
+    widths = [w for w in WIDTHS if w < width]
+    if width <= WIDTHS[-1]:
+        widths.append(width)
+    return widths
+
+
+def variant_name(rel: str, data: bytes, width: int, fmt: str) -> str:
+    """Nome pelo hash dos bytes gerados: recodificar muda a URL."""
+    stem = Path(rel).stem
+    return f"{OUT_DIR}/{stem}-{width}.{sha256_bytes(data)[:8]}.{fmt}"
+
+
+def encode_image(job: tuple) -> dict:
+    """Gera as variantes de uma imagem (roda no processo principal ou num worker)."""
+    rel, digest, formats = job
+    with Image.open(ROOT / rel) as im:
+        im.load()
+        width, height = im.size
+        if im.mode not in ("RGB", "RGBA"):
+            im = im.convert("RGBA" if "transparency" in im.info or im.mode in ("LA", "P") else "RGB")
+        variants = []
+        for w in target_widths(width):
+            h = max(1, round(height * w / width))
+            resized = im if w == width else im.resize((w, h), Image.LANCZOS)
+            for fmt in formats:
+                buf = io.BytesIO()
+                resized.save(buf, format=fmt.upper(), quality=QUALITY[fmt])
+                data = buf.getvalue()
+                path = variant_name(rel, data, w, fmt)
+                tmp = ROOT / (path + ".tmp")
+                tmp.write_bytes(data)
+                os.replace(tmp, ROOT / path)
+                variants.append({"width": w, "format": fmt, "path": path})
+    return {"sha256": digest, "settings": SETTINGS, "width": width, "height": height, "variants": variants}
+
+
+def load_state() -> dict:
+    if STATE_PATH.exists():
+        try:
+            state = json.loads(STATE_PATH.read_text(encoding="utf-8"))
+            if state.get("version") == STATE_VERSION:
+                return state.get("images", {})
+        except ValueError:
+            print(f"⚠️ estado das imagens inválido, recodificando tudo: {STATE_PATH}")
+    return {}
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    if path.exists() and path.read_text(encoding="utf-8") == text:
+        return False
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+    return True
+
+
+# --- reescrita dos <img> ---
+
+def parse_attrs(tag: str) -> list:
+    """[(nome, valor ou None)] na ordem do HTML, sem o "<img" e o ">"."""
+    inner = tag[4:-1].rstrip("/")
+    attrs = []
+    for m in ATTR_RE.finditer(inner):
+        value = next((v for v in m.groups()[1:] if v is not None), None)
+        attrs.append((m.group(1), None if value is None else html.unescape(value)))
+    return attrs
+
+
+def format_attrs(attrs: list) -> str:
+    return "".join(f" {k}" if v is None else f' {k}="{html.escape(v)}"' for k, v in attrs)
+
+
+def resolve_src(page: str, src: str) -> str | None:
+    src = src.split("#")[0].split("?")[0]
+    if not src or src.startswith(("http:", "https:", "//", "data:")):
+        return None
+    path = src.lstrip("/") if src.startswith("/") else posixpath.join(posixpath.dirname(page), src)
+    path = posixpath.normpath(path)
+    return None if path.startswith("..") else path
+
+
+def srcset(info: dict, fmt: str) -> str:
+    # mesmo estilo do site: caminhos absolutos a partir da raiz
+    return ", ".join(f"/{v['path']} {v['width']}w"
+                     for v in info["variants"] if v["format"] == fmt)
+
+
+def rewrite_img(page: str, tag: str, images: dict, lazy: bool = True) -> str:
+    attrs = parse_attrs(tag)
+    values = dict(attrs)
+    src = resolve_src(page, values.get("src") or "")
+    info = images.get(src)
+    if not info or not info["variants"]:
+        return tag
+
+    formats = [f for f in FORMATS if any(v["format"] == f for v in info["variants"])]
+    fallback = formats[-1]
+    sizes = values.get("sizes") or DEFAULT_SIZES
+
+    # srcset/width/height são da etapa (refeitos a cada rodada); sizes e
+    # loading da página têm prioridade. Acima da dobra nada de lazy: o
+    # navegador só pediria a imagem do hero depois do layout
+    managed = {"srcset", "width", "height"}
+    attrs = [(k, v) for k, v in attrs if k.lower() not in managed]
+    if "sizes" not in values:
+        attrs.append(("sizes", sizes))
+    if "loading" not in values and lazy:
+        attrs.append(("loading", "lazy"))
+    if "decoding" not in values:
+        attrs.append(("decoding", "async"))
+    attrs += [
+        ("srcset", srcset(info, fallback)),
+        ("width", str(info["width"])),
+        ("height", str(info["height"])),
+    ]
+    img = f"<img{format_attrs(attrs)}>"
+
+    sources = [f'<source type="image/{f}" srcset="{html.escape(srcset(info, f))}" sizes="{html.escape(sizes)}">'
+               for f in formats[:-1]]
+    if not sources:
+        return img
+    # display:contents: o <picture> não interfere no layout do <img>
+    return f'<picture data-responsive style="display:contents">{"".join(sources)}{img}</picture>'
+
+
+def rewrite_page(page: str, text: str, images: dict) -> str:
+    """HTML publicado de `page`: <img> locais com srcset, dimensões e lazy."""
+    if not images or not is_page(page):
+        return text
+    # desfaz o <picture> de rodadas anteriores antes de refazer
+    text = PICTURE_RE.sub(lambda m: m.group(1), text)
+    _, fold = fold_bounds(text)
+
+    # <picture> escrito à mão já escolhe as fontes: não aninha outro dentro
+    depth = 0
+
+    def replace(m):
+        nonlocal depth
+        tag = m.group(0)
+        lower = tag[:9].lower()
+        if lower.startswith("<picture"):
+            depth += 1
+        elif lower.startswith("</picture"):
+            depth = max(0, depth - 1)
+        elif depth == 0:
+            return rewrite_img(page, tag, images, lazy=m.start() >= fold)
+        return tag
+
+    return TAG_RE.sub(replace, text)
+
+
+def is_page(rel: str) -> bool:
+    return rel.endswith(".html") and not rel.startswith(SKIP_PREFIXES)
+
+
+def process(files=None, read=read_file, jobs: int = 1, force: bool = False) -> dict:
+    """Gera variantes que faltam e limpa variantes órfãs.
+
+    Devolve {"written": [...], "removed": [...]}.
+    """
+    written, removed = [], []
+    if Image is None:
+        print("⚠️ Pillow não instalado: imagens responsivas não foram geradas (pip install -r scripts/requirements.txt)")
+        return {"written": written, "removed": removed}
+
+    formats = available_formats()
+    previous = {} if force else load_state()
+    (ROOT / OUT_DIR).mkdir(parents=True, exist_ok=True)
+
+    images, jobs_todo = {}, []
+    for rel in iter_sources(files):
+        digest = sha256_bytes(read(ROOT / rel))
+        prev = previous.get(rel)
+        if (prev and prev["sha256"] == digest and prev.get("settings") == SETTINGS
+                and {v["format"] for v in prev["variants"]} == set(formats)
+                and all((ROOT / v["path"]).exists() for v in prev["variants"])):
+            images[rel] = prev
+        else:
+            jobs_todo.append((rel, digest, formats))
+
+    if jobs > 1 and len(jobs_todo) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(encode_image, jobs_todo))
+    else:
+        results = [encode_image(job) for job in jobs_todo]
+    for (rel, _, _), info in zip(jobs_todo, results):
+        images[rel] = info
+        written += [ROOT / v["path"] for v in info["variants"]]
+        print(f"OK: {len(info['variants'])} variante(s) de {rel}")
+
+    # variantes de origens que mudaram ou sumiram
+    keep = {v["path"] for info in images.values() for v in info["variants"]}
+    for path in sorted((ROOT / OUT_DIR).iterdir()):
+        rel = path.relative_to(ROOT).as_posix()
+        if rel not in keep:
+            path.unlink()
+            removed.append(path)
+
+    payload = json.dumps({"version": STATE_VERSION, "images": dict(sorted(images.items()))},
+                         ensure_ascii=False, indent=2) + "\n"
+    if write_if_changed(STATE_PATH, payload):
+        written.append(STATE_PATH)
+
+    print(f"OK: {len(images)} imagem(ns), {len(jobs_todo)} recodificada(s), "
+          f"{len(removed)} variante(s) removida(s).")
+    return {"written": written, "removed": removed}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Variantes responsivas das imagens de img/ (em img/r/).")
+    parser.add_argument("--jobs", type=int, default=1, metavar="N",
+                        help="recodifica em N processos (padrão: 1)")
+    parser.add_argument("--force", action="store_true",
+                        help="ignora o estado e recodifica todas as imagens")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    process(jobs=args.jobs, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
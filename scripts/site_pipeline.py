@@ -0,0 +1,427 @@
+# scripts/site_pipeline.py
+"""Pipeline do site num comando só:
+build -> images -> pdfs -> critical -> audit -> hints -> sitemap -> optimize.
+
+O repositório é varrido uma única vez para um inventário em memória
+(caminho, tamanho, mtime, hash e bytes lidos sob demanda). As etapas
+consultam o inventário em vez de refazer os.walk/rglob, e avisam o que
+escreveram para ele se manter atualizado.
+
+As páginas escritas à mão não são reescritas: srcset/lazy das imagens, os
+links para os PDFs otimizados, o CSS crítico e o prefetch/preload da etapa
+hints entram só na cópia publicada em dist/ (etapa optimize), e a auditoria
+confere essa versão (published_reader). A hints roda depois da auditoria
+para reaproveitar o grafo de links que ela exporta.
+
+Cada etapa devolve o que escreveu/removeu e, quando tem, "stats" (tempo
+por arquivo, acertos de cache); o resumo no fim sai daí
+(scripts/pipeline_trace.py). --trace grava o trace no formato do Chrome e
+--profile um dump do cProfile.
+
+--watch fica rodando: serve o site em http://127.0.0.1:8000 com live reload
+(scripts/dev_server.py) e, a cada mudança nos dados, templates ou páginas,
+refaz build -> audit -> sitemap. As etapas já são incrementais (manifesto,
+cache da auditoria, estado do sitemap): editar um article_bodies/*.html
+regera só aquele artigo, mexer no template regera todos, e só as páginas
+que mudaram são reauditadas.
+"""
+from __future__ import annotations
+import argparse
+import copy
+import cProfile
+import hashlib
+import io
+import os
+import pstats
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "content_pipeline"), str(ROOT / "seo_audit")]
+
+import build_articles  # noqa: E402
+import critical_css  # noqa: E402
+import audit_site  # noqa: E402
+import generate_sitemap  # noqa: E402
+import optimize_assets  # noqa: E402
+import optimize_pdfs  # noqa: E402
+import resource_hints  # noqa: E402
+import responsive_images  # noqa: E402
+from dev_server import DEFAULT_PORT, start_server  # noqa: E402
+from pipeline_trace import Tracer  # noqa: E402
+
+# dist/ é saída da etapa optimize, não entra no inventário
+SKIP_DIRS = {".git", "dist"}
+
+# --watch: o que dispara um rebuild e o que roda nele
+WATCH_EXTS = (".html", ".json", ".css", ".js")
+# saídas do pipeline e código: não disparam rebuild
+WATCH_SKIP = ("analytics_report/", "artigos/listing/", "artigos/search/", "img/r/", "scripts/", "seo_audit/",
+              "node_modules/")
+WATCH_STAGES = ("build", "audit", "sitemap")
+# só o que está sob content_pipeline/ pede o build; páginas à mão vão direto à auditoria
+BUILD_INPUTS = "content_pipeline/"
+WATCH_INTERVAL = 0.2   # segundos entre varreduras
+DEBOUNCE = 0.1         # espera as mudanças pararem (ex.: editor que salva em 2 passos)
+
+
+@dataclass
+class FileEntry:
+    rel: str
+    size: int
+    mtime: float
+    data: bytes | None = None
+    sha256: str | None = None
+    meta: dict = field(default_factory=dict)  # fatos extraídos pelas etapas
+
+
+class Inventory:
+    """Todos os arquivos do repo, numa passada de os.scandir."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.entries: dict[str, FileEntry] = {}
+        self.files_read = 0
+        self.bytes_read = 0
+        # LinkIndex da auditoria, repassado às dicas e ao sitemap
+        self.link_index = None
+
+    @classmethod
+    def scan(cls, root: Path) -> "Inventory":
+        inv = cls(root)
+        inv._scan_dir(str(root), "")
+        return inv
+
+    def _scan_dir(self, path: str, prefix: str) -> None:
+        # mesma ordem do os.walk: arquivos da pasta, depois as subpastas
+        subdirs = []
+        with os.scandir(path) as it:
+            for e in it:
+                if e.is_dir(follow_symlinks=False):
+                    if e.name not in SKIP_DIRS:
+                        subdirs.append(e)
+                elif e.is_file():
+                    st = e.stat()
+                    rel = prefix + e.name
+                    self.entries[rel] = FileEntry(rel, st.st_size, st.st_mtime)
+        for d in subdirs:
+            self._scan_dir(d.path, prefix + d.name + "/")
+
+    # --- consultas ---
+
+    def rel(self, path) -> str:
+        # sem resolve(): nada de syscalls só para normalizar o caminho
+        return os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+
+    def files(self) -> list[str]:
+        return list(self.entries)
+
+    def exists(self, path) -> bool:
+        return self.rel(path) in self.entries
+
+    def read(self, path) -> bytes:
+        rel = self.rel(path)
+        entry = self.entries.get(rel)
+        if entry is None:
+            raise FileNotFoundError(path)
+        if entry.data is None:
+            with open(self.root / rel, "rb") as f:
+                entry.data = f.read()
+            self.files_read += 1
+            self.bytes_read += len(entry.data)
+        return entry.data
+
+    def sha256(self, path) -> str:
+        entry = self.entries[self.rel(path)]
+        if entry.sha256 is None:
+            entry.sha256 = hashlib.sha256(self.read(path)).hexdigest()
+        return entry.sha256
+
+    def size(self, path) -> int:
+        return self.entries[self.rel(path)].size
+
+    def mtime(self, path) -> float:
+        return self.entries[self.rel(path)].mtime
+
+    # --- atualizações feitas pelas etapas ---
+
+    def refresh(self, paths) -> None:
+        """Re-stat de arquivos escritos por uma etapa (conteúdo relido sob demanda)."""
+        for p in paths:
+            rel = self.rel(p)
+            st = os.stat(self.root / rel)
+            old = self.entries.get(rel)
+            entry = FileEntry(rel, st.st_size, st.st_mtime)
+            if old is not None:
+                entry.meta = old.meta
+            self.entries[rel] = entry
+
+    def remove(self, paths) -> None:
+        for p in paths:
+            self.entries.pop(self.rel(p), None)
+
+
+# --- etapas ---
+
+def stage_build(inv: Inventory, args) -> dict:
+    result = build_articles.build(force=args.force, jobs=args.jobs, exists=inv.exists)
+    inv.refresh(result["written"])
+    inv.remove(result["removed"])
+    return result
+
+
+def stage_images(inv: Inventory, args) -> dict:
+    result = responsive_images.process(files=inv.files(), read=inv.read, jobs=args.jobs, force=args.force)
+    inv.refresh(result["written"])
+    inv.remove(result["removed"])
+    return result
+
+
+def stage_pdfs(inv: Inventory, args) -> dict:
+    result = optimize_pdfs.process(files=inv.files(), read=inv.read, jobs=args.jobs, force=args.force)
+    inv.refresh(result["written"])
+    inv.remove(result["removed"])
+    return result
+
+
+def stage_critical(inv: Inventory, args) -> dict:
+    result = critical_css.process(files=inv.files(), read=inv.read, force=args.force)
+    inv.refresh(result["written"])
+    inv.remove(result["removed"])
+    return result
+
+
+def stage_hints(inv: Inventory, args) -> dict:
+    result = resource_hints.process(files=inv.files(), read=inv.read, force=args.force,
+                                    index=inv.link_index)
+    inv.refresh(result["written"])
+    inv.remove(result["removed"])
+    return result
+
+
+def published_reader(inv: Inventory):
+    """read() que devolve as páginas como saem em dist/ (antes de minificar):
+    a auditoria confere o HTML publicado, com srcset/lazy das imagens, os
+    links para os PDFs otimizados, o CSS crítico (CDN em defer) e o preload do hero (o prefetch não entra: depende
+    do grafo, feito depois)."""
+    images = responsive_images.load_state()
+    critical = critical_css.load_critical()
+    pdf_links = optimize_pdfs.load_links()
+
+    def read(path) -> bytes:
+        data = inv.read(path)
+        rel = inv.rel(path)
+        if not responsive_images.is_page(rel):
+            return data
+        text = responsive_images.rewrite_page(rel, data.decode("utf-8"), images)
+        text = optimize_pdfs.rewrite_page(rel, text, pdf_links)
+        if rel in critical:
+            text = critical_css.inline_critical(text, *critical[rel])
+        return resource_hints.inject_hints(text, resource_hints.preload_tags(text)).encode("utf-8")
+
+    return read
+
+
+def stage_audit(inv: Inventory, args) -> dict:
+    result = audit_site.run_audit(inv.files(), jobs=args.jobs, force=args.force,
+                                  read=published_reader(inv), size=inv.size, external=args.external)
+    inv.refresh(result["written"])
+    inv.link_index = result["index"]
+    for row in result["rows"]:
+        entry = inv.entries.get(row["file"].replace(os.sep, "/"))
+        if entry is not None:
+            entry.meta["audit"] = row
+    return result
+
+
+def stage_sitemap(inv: Inventory, args) -> dict:
+    result = generate_sitemap.generate(files=inv.files(), read=inv.read, index=inv.link_index)
+    inv.refresh(result["written"])
+    inv.remove(result["removed"])
+    return result
+
+
+def stage_optimize(inv: Inventory, args) -> dict:
+    # dist/ fica fora do inventário; só o estado e o relatório voltam para ele
+    result = optimize_assets.optimize(files=inv.files(), read=inv.read, jobs=args.jobs, force=args.force)
+    inv.refresh(p for p in result["written"] if not inv.rel(p).startswith("dist/"))
+    return result
+
+
+STAGES = [
+    ("build", stage_build),
+    ("images", stage_images),
+    ("pdfs", stage_pdfs),
+    ("critical", stage_critical),
+    ("audit", stage_audit),
+    ("hints", stage_hints),
+    ("sitemap", stage_sitemap),
+    ("optimize", stage_optimize),
+]
+
+
+# --- --watch ---
+
+def is_watched(rel: str) -> bool:
+    return (rel.endswith(WATCH_EXTS) and not rel.startswith(WATCH_SKIP)
+            and not any(part in SKIP_DIRS for part in rel.split("/")[:-1]))
+
+
+def watch_snapshot(root: Path = ROOT) -> dict:
+    """rel -> (mtime_ns, tamanho) dos arquivos observados."""
+    snap = {}
+
+    def scan(path: str, prefix: str) -> None:
+        with os.scandir(path) as it:
+            for e in it:
+                rel = prefix + e.name
+                if e.is_dir(follow_symlinks=False):
+                    if e.name not in SKIP_DIRS and not (rel + "/").startswith(WATCH_SKIP):
+                        scan(e.path, rel + "/")
+                elif is_watched(rel):
+                    st = e.stat()
+                    snap[rel] = (st.st_mtime_ns, st.st_size)
+
+    scan(str(root), "")
+    return snap
+
+
+def wait_for_change(snap: dict) -> dict:
+    """Bloqueia até algo mudar e as mudanças pararem por DEBOUNCE segundos."""
+    while True:
+        time.sleep(WATCH_INTERVAL)
+        new = watch_snapshot()
+        if new != snap:
+            break
+    while True:
+        time.sleep(DEBOUNCE)
+        latest = watch_snapshot()
+        if latest == new:
+            return new
+        new = latest
+
+
+def rebuild(inv: Inventory, args, changed: list) -> list:
+    """Roda as etapas do watch afetadas por `changed`; devolve o que elas escreveram."""
+    stages = [s for s in WATCH_STAGES if not args.only or s in args.only]
+    if not any(rel.startswith(BUILD_INPUTS) for rel in changed):
+        stages = [s for s in stages if s != "build"]
+    touched = []
+    for name, fn in STAGES:
+        if name in stages:
+            result = fn(inv, args)
+            touched += result["written"] + result.get("removed", [])
+    return touched
+
+
+def watch(inv: Inventory, args) -> None:
+    # rebuilds do watch: incrementais e sem rede
+    args = copy.copy(args)
+    args.force = args.external = False
+    server = start_server(args.port)
+    print(f"\nOK: site em {server.url} com live reload; observando mudanças (Ctrl+C para sair)")
+
+    snap = watch_snapshot()
+    try:
+        while True:
+            new = wait_for_change(snap)
+            changed = sorted(rel for rel in set(snap) | set(new) if snap.get(rel) != new.get(rel))
+            t0 = time.perf_counter()
+            inv.refresh(ROOT / rel for rel in changed if rel in new)
+            inv.remove(ROOT / rel for rel in changed if rel not in new)
+            print(f"\n--- {len(changed)} arquivo(s) alterado(s): {', '.join(changed[:5])}"
+                  f"{' ...' if len(changed) > 5 else ''}")
+            try:
+                touched = rebuild(inv, args, changed)
+            except (Exception, SystemExit) as e:
+                # erro no template/JSON: avisa e continua observando
+                print(f"⚠️ rebuild falhou: {e}")
+                touched = []
+
+            # o que o próprio pipeline escreveu não dispara outro rebuild
+            for p in touched:
+                rel = inv.rel(p)
+                if is_watched(rel):
+                    try:
+                        st = os.stat(ROOT / rel)
+                        new[rel] = (st.st_mtime_ns, st.st_size)
+                    except FileNotFoundError:
+                        new.pop(rel, None)
+            snap = new
+            server.reload()
+            print(f"OK: rebuild em {time.perf_counter() - t0:.2f}s; navegador recarregado")
+    except KeyboardInterrupt:
+        print("\nOK: watch encerrado")
+    finally:
+        server.shutdown()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline do site: build, imagens, CSS crítico, audit, sitemap e otimização.")
+    parser.add_argument("--jobs", type=int, default=1, metavar="N",
+                        help="processos para o build, as imagens, a auditoria e a otimização (padrão: 1)")
+    parser.add_argument("--force", action="store_true",
+                        help="ignora manifesto/caches e refaz tudo")
+    parser.add_argument("--external", action="store_true",
+                        help="a auditoria checa também os links externos (com cache)")
+    parser.add_argument("--fail-on-budget", action="store_true",
+                        help="sai com erro se a auditoria achar página acima do orçamento")
+    parser.add_argument("--only", action="append", choices=[name for name, _ in STAGES],
+                        help="roda só esta etapa (pode repetir)")
+    parser.add_argument("--trace", type=Path, metavar="ARQUIVO",
+                        help="grava um trace das etapas e arquivos no formato do Chrome (chrome://tracing)")
+    parser.add_argument("--profile", type=Path, metavar="ARQUIVO",
+                        help="roda sob o cProfile e grava o dump do pstats (workers do --jobs ficam de fora)")
+    parser.add_argument("--watch", action="store_true",
+                        help="depois da 1ª rodada, serve o site com live reload e refaz build/audit/sitemap a cada mudança")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help=f"porta do servidor do --watch (padrão: {DEFAULT_PORT})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    tracer = Tracer()
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+
+    stage = tracer.start("scan")
+    inv = Inventory.scan(ROOT)
+    tracer.finish(stage, None, 0, 0)
+    print(f"OK: inventário com {len(inv.entries)} arquivos")
+
+    for name, fn in STAGES:
+        if args.only and name not in args.only:
+            continue
+        files_read, bytes_read = inv.files_read, inv.bytes_read
+        stage = tracer.start(name)
+        result = fn(inv, args)
+        tracer.finish(stage, result, inv.files_read - files_read, inv.bytes_read - bytes_read)
+
+    if profiler:
+        profiler.disable()
+        args.profile.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(args.profile))
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(15)
+        print(out.getvalue().rstrip())
+        print(f"OK: perfil em {args.profile} (python -m pstats {args.profile})")
+
+    print()
+    print(tracer.summary())
+    if args.trace:
+        tracer.write_chrome_trace(args.trace)
+
+    # depois de todas as etapas: relatórios gravados mesmo quando falha
+    if args.fail_on_budget and not args.watch:
+        audit_site.check_budgets([e.meta["audit"] for e in inv.entries.values() if "audit" in e.meta])
+
+    if args.watch:
+        watch(inv, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,6 @@ import re
 
 ROOT = Path(__file__).resolve().parents[1]
 
-HTML_FILES = list(ROOT.rglob("*.html"))
-
 def extract_tag(html: str, pattern: str) -> str | None:
     m = re.search(pattern, html, flags=re.IGNORECASE | re.DOTALL)
     return m.group(1).strip() if m else None
@@ -24,7 +22,8 @@ def extract_all_imgs_without_alt(html: str) -> int:
 
 def main() -> None:
     rows = []
-    for f in HTML_FILES:
+    # varre só quando roda (antes o rglob acontecia já no import)
+    for f in ROOT.rglob("*.html"):
         # ignora pastas que você não quer auditar, se necessário
         # exemplo: if "node_modules" in str(f): continue
         html = f.read_text(encoding="utf-8", errors="ignore")
@@ -1,58 +1,391 @@
 from __future__ import annotations
+import argparse
 import csv
+import hashlib
+import io
+import json
 import os
-from bs4 import BeautifulSoup
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+from lxml import etree
+
+from external_links import broken_count, check_pages
+from link_index import LinkIndex, build_link_index, is_local, iter_site_files
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # repo root
 OUTPUT = os.path.join(BASE_DIR, "analytics_report", "seo_report.csv")
 
-def iter_html_files(root: str):
-    for dirpath, _, filenames in os.walk(root):
-        for fn in filenames:
-            if fn.lower().endswith(".html"):
-                yield os.path.join(dirpath, fn)
+# cache da auditoria: arquivo -> sha256 do conteúdo + fatos extraídos
+CACHE_PATH = os.path.join(BASE_DIR, "analytics_report", "audit_cache.json")
+# suba quando mudar o que PageFacts extrai (invalida o cache inteiro)
+CACHE_VERSION = 6
+
+# grafo de links do site, exportado para as outras etapas reaproveitarem
+LINK_INDEX_PATH = os.path.join(BASE_DIR, "analytics_report", "link_index.json")
+
+# texto dentro destas tags não conta no get_text() do h1
+NON_TEXT_TAGS = {"script", "style", "template", "rt", "rp"}
+
+WS_RE = re.compile(r"\S+")
+
+# imagem local servida sem srcset acima disto é "oversized"
+# (scripts/responsive_images.py gera as variantes)
+MAX_IMAGE_BYTES = 150 * 1024
+
+# orçamentos por página: "default" (a meta) + exceções em "pages" (caminho
+# relativo). A exceção é linha de base em catraca: o valor medido quando a
+# página entrou acima da meta, que só pode descer
+BUDGETS_PATH = os.path.join(BASE_DIR, "seo_audit", "budgets.json")
+DEFAULT_BUDGETS = {"page_weight_kib": 1024, "render_blocking": 3, "third_party_origins": 8, "preloads": 3}
+# issue de cada orçamento estourado
+BUDGET_ISSUES = {
+    "page_weight_kib": "page_weight_over_budget",
+    "render_blocking": "render_blocking_over_budget",
+    "third_party_origins": "third_party_over_budget",
+    # preload demais disputa banda com o que importa (scripts/resource_hints.py)
+    "preloads": "preloads_over_budget",
+}
+
+# o próprio site não conta como terceiro
+SITE_HOST = urlsplit(os.environ.get("BASE_URL", "https://saudenaturalglobal.com.br")).hostname
+SITE_HOSTS = {SITE_HOST, "www." + SITE_HOST}
+
+# largura usada para escolher o candidato do srcset no cálculo do peso
+VIEWPORT_WIDTH = 1280
+# <link rel> que baixam algo junto com a página
+RESOURCE_RELS = {"stylesheet", "preload", "modulepreload", "icon"}
+
+# fim da dobra, como em scripts/critical_css.py: o marcador <!-- critical:end -->
+# ou, sem ele, o fim da 1ª <section> do <body>. Imagem acima da dobra (o hero)
+# não deve ser lazy; abaixo dela, deve
+FOLD_MARKER = "critical:end"
+
+class PageFacts:
+    """Alvo SAX para o parser HTML do lxml: extrai tudo numa passada só.
+
+    Não monta árvore; só guarda title, description, canonical, h1s, imagens
+    (contagem e src) e hrefs dos <a>, com as mesmas regras que as buscas do
+    BeautifulSoup usavam.
+    """
+
+    def __init__(self):
+        self.title = None           # None = ainda não achou <title>
+        self.title_parts = []
+        self.title_children = 0
+        self.in_title = False
+        self.description = None
+        self.canonical = None
+        self.h1s = []
+        self.open_h1 = []           # (índice em h1s, partes) dos h1s abertos
+        self.text = []              # nó de texto atual
+        self.skip_text = 0          # dentro de script/style/...
+        self.images = 0
+        self.images_missing_alt = 0
+        self.srcs = []
+        self.srcs_no_srcset = []    # <img> sem srcset: baixa sempre o arquivo inteiro
+        self.hrefs = []
+        # desempenho
+        self.in_head = False
+        self.render_blocking = 0    # <script src> síncrono / CSS no <head>
+        self.assets = []            # URLs baixadas com a página (img, css, js, pdf)
+        self.hosts = set()          # hosts de todos os recursos externos
+        self.images_missing_dimensions = 0
+        self.images_not_lazy = 0    # abaixo da dobra sem loading
+        self.images_lazy_above_fold = 0
+        self.in_body = False
+        self.below_fold = False
+        self.preloads = []          # URLs de cada <link rel=preload> (href + imagesrcset)
+        self.resources = set()      # URLs que a página usa de fato (img, source, script, css)
+
+    # --- eventos do parser ---
+
+    def start(self, tag, attrib):
+        self.flush_text()
+        if self.in_title:
+            self.title_children += 1
+
+        if tag == "title" and self.title is None and not self.in_title:
+            self.in_title = True
+        elif tag == "head":
+            self.in_head = True
+        elif tag == "body":
+            self.in_body = True
+        elif tag == "script":
+            src = (attrib.get("src") or "").strip()
+            if src:
+                self.add_asset(src)
+                self.resources.add(src)
+                blocking = not ("async" in attrib or "defer" in attrib or attrib.get("type") == "module")
+                if self.in_head and blocking:
+                    self.render_blocking += 1
+        elif tag in ("iframe", "embed", "object"):
+            src = (attrib.get("src") or attrib.get("data") or "").strip()
+            if src and is_pdf(src):
+                self.add_asset(src)
+            elif src:
+                self.add_host(src)
+        elif tag == "meta":
+            if self.description is None and attrib.get("name") == "description":
+                self.description = attrib.get("content", "").strip()
+        elif tag == "link":
+            rels = {r.lower() for r in WS_RE.findall(attrib.get("rel") or "")}
+            if self.canonical is None and "canonical" in rels:
+                self.canonical = attrib.get("href", "").strip()
+            href = (attrib.get("href") or "").strip()
+            if href and "stylesheet" in rels:
+                self.add_asset(href)
+                self.resources.add(href)
+            elif href and rels & RESOURCE_RELS:
+                self.add_host(href)
+            if href and "preload" in rels:
+                self.preloads.append([href, *srcset_urls(attrib.get("imagesrcset") or "")])
+            if href and rels & RESOURCE_RELS:
+                media = (attrib.get("media") or "all").strip().lower()
+                if self.in_head and "stylesheet" in rels and media in ("all", "screen") and "disabled" not in attrib:
+                    self.render_blocking += 1
+        elif tag == "h1":
+            # reserva a posição: find_all("h1") lista na ordem de abertura
+            self.open_h1.append((len(self.h1s), []))
+            self.h1s.append("")
+        elif tag == "img":
+            self.images += 1
+            alt = attrib.get("alt")
+            if alt is None or not alt.strip():
+                self.images_missing_alt += 1
+            src = (attrib.get("src") or "").strip()
+            self.resources.update(srcset_urls(attrib.get("srcset") or ""), [src] if src else [])
+            if src:
+                self.srcs.append(src)
+                if not (attrib.get("srcset") or "").strip():
+                    self.srcs_no_srcset.append(src)
+            chosen = pick_candidate(attrib.get("srcset") or "", src)
+            if chosen:
+                self.add_asset(chosen)
+            if not (attrib.get("width") and attrib.get("height")):
+                self.images_missing_dimensions += 1
+            if not self.below_fold:
+                if (attrib.get("loading") or "").strip().lower() == "lazy":
+                    self.images_lazy_above_fold += 1
+            elif "loading" not in attrib:
+                self.images_not_lazy += 1
+        elif tag == "source":
+            self.resources.update(srcset_urls(attrib.get("srcset") or ""))
+        elif tag == "a":
+            href = (attrib.get("href") or "").strip()
+            self.hrefs.append(href)
+            if is_pdf(href):
+                self.add_asset(href)
+
+        if tag in NON_TEXT_TAGS:
+            self.skip_text += 1
+
+    def end(self, tag):
+        self.flush_text()
+        if tag in NON_TEXT_TAGS and self.skip_text:
+            self.skip_text -= 1
+        if tag == "head":
+            self.in_head = False
+        if tag == "section" and self.in_body:
+            self.below_fold = True
+        if tag == "title" and self.in_title:
+            self.in_title = False
+            # equivalente a soup.title.string: só vale se o único filho for texto
+            self.title = "".join(self.title_parts) if self.title_children == 1 and self.title_parts else ""
+        elif tag == "h1" and self.open_h1:
+            i, parts = self.open_h1.pop()
+            self.h1s[i] = "".join(parts)
+
+    def data(self, data):
+        self.text.append(data)
+
+    def comment(self, text):
+        self.flush_text()
+        if text.strip() == FOLD_MARKER:
+            self.below_fold = True
+        if self.in_title:
+            self.title_children += 1
+
+    def close(self):
+        self.flush_text()
+        if self.in_title:
+            self.end("title")
+        while self.open_h1:
+            self.end("h1")
+        return self
+
+    # --- auxiliares ---
+
+    def add_host(self, url):
+        host = urlsplit(url).hostname if url.startswith(("http:", "https:", "//")) else None
+        if host:
+            self.hosts.add(host.lower())
+
+    def add_asset(self, url):
+        if url not in self.assets:
+            self.assets.append(url)
+        self.add_host(url)
+
+    def flush_text(self):
+        if not self.text:
+            return
+        s = "".join(self.text)
+        self.text = []
+        if self.in_title:
+            self.title_parts.append(s)
+            self.title_children += 1
+        if self.open_h1 and not self.skip_text:
+            # get_text(strip=True): cada nó de texto sem espaços nas pontas
+            piece = s.strip()
+            if piece:
+                for _, parts in self.open_h1:
+                    parts.append(piece)
+
+def is_pdf(url: str) -> bool:
+    return url.split("#")[0].split("?")[0].lower().endswith(".pdf")
+
+def srcset_urls(srcset: str) -> list:
+    return [part.split()[0] for part in srcset.split(",") if part.strip()]
+
+def pick_candidate(srcset: str, src: str) -> str:
+    """O arquivo que um desktop (VIEWPORT_WIDTH) baixaria: maior candidato
+    "Nw" que cabe na largura, ou o menor se nenhum couber."""
+    widths = []
+    for part in srcset.split(","):
+        bits = part.split()
+        if len(bits) == 2 and bits[1].endswith("w") and bits[1][:-1].isdigit():
+            widths.append((int(bits[1][:-1]), bits[0]))
+    if not widths:
+        return src
+    fitting = [c for c in widths if c[0] <= VIEWPORT_WIDTH]
+    return max(fitting)[1] if fitting else min(widths)[1]
+
+def parse_page(html: str) -> PageFacts:
+    if html[:1] == "\ufeff":
+        html = html[1:]
+    facts = PageFacts()
+    parser = etree.HTMLParser(target=facts, strip_cdata=False, recover=True)
+    # documento inteiro de uma vez, como o BeautifulSoup fazia: em blocos, o
+    # libxml2 pode perder um </script> que caia na fronteira entre dois feeds
+    parser.feed(html)
+    return parser.close()
+
+def page_facts(html: str) -> dict:
+    """Fatos da página em formato serializável (é o que vai para o cache)."""
+    facts = parse_page(html)
+    return {
+        "title": (facts.title or "").strip(),
+        "description": facts.description or "",
+        "canonical": facts.canonical or "",
+        "h1s": facts.h1s,
+        "images": facts.images,
+        "images_missing_alt": facts.images_missing_alt,
+        "srcs": facts.srcs,
+        "srcs_no_srcset": facts.srcs_no_srcset,
+        "hrefs": facts.hrefs,
+        "render_blocking": facts.render_blocking,
+        "assets": facts.assets,
+        "hosts": sorted(facts.hosts),
+        "images_missing_dimensions": facts.images_missing_dimensions,
+        "images_not_lazy": facts.images_not_lazy,
+        "images_lazy_above_fold": facts.images_lazy_above_fold,
+        "preloads": facts.preloads,
+        "resources": sorted(facts.resources),
+    }
 
-def read_file(path: str) -> str:
-    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+def read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
         return f.read()
 
-def audit_html(path: str) -> dict:
-    html = read_file(path)
-    soup = BeautifulSoup(html, "lxml")
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
 
-    title = (soup.title.string.strip() if soup.title and soup.title.string else "")
-    desc_tag = soup.find("meta", attrs={"name": "description"})
-    desc = desc_tag.get("content", "").strip() if desc_tag else ""
+def facts_for_bytes(data: bytes) -> tuple[dict, tuple]:
+    """Fatos + (início, duração, pid) do parse (roda nos workers do --jobs).
 
-    canon = soup.find("link", rel=lambda x: x and "canonical" in x)
-    canonical = canon.get("href", "").strip() if canon else ""
+    Recebe os bytes já lidos pelo `read` de collect_facts: o worker não volta
+    ao disco, então a leitura conta uma vez só (no inventário do pipeline).
+    """
+    start = time.perf_counter()
+    facts = page_facts(data.decode("utf-8", errors="ignore"))
+    return facts, (start, time.perf_counter() - start, os.getpid())
 
-    h1s = [h.get_text(strip=True) for h in soup.find_all("h1")]
+def oversized_images(page: str, facts: dict, index: LinkIndex, size=os.path.getsize) -> int:
+    """<img> locais sem srcset cujo arquivo passa de MAX_IMAGE_BYTES."""
+    count = 0
+    for src in facts["srcs_no_srcset"]:
+        if not is_local(src):
+            continue
+        target = index.resolve(page, src)
+        if target and size(os.path.join(BASE_DIR, target)) > MAX_IMAGE_BYTES:
+            count += 1
+    return count
+
+def unused_preloads(page: str, facts: dict, index: LinkIndex) -> int:
+    """<link rel=preload> locais cujo arquivo nenhum img/source/script/css da
+    página usa: o navegador baixa com prioridade alta e joga fora."""
+    used = {index.resolve(page, url) for url in facts["resources"] if is_local(url)}
+    count = 0
+    for urls in facts["preloads"]:
+        targets = {index.resolve(page, url) for url in urls if is_local(url)} - {None}
+        if targets and not targets & used:
+            count += 1
+    return count
+
+def page_weight(page: str, facts: dict, index: LinkIndex, size=os.path.getsize) -> int:
+    """Bytes do HTML + recursos locais que ele referencia (cada arquivo uma vez).
+
+    Recursos de terceiros não entram: o tamanho deles não está no repo.
+    """
+    files = {page}
+    for url in facts["assets"]:
+        if is_local(url):
+            target = index.resolve(page, url)
+            if target:
+                files.add(target)
+    return sum(size(os.path.join(BASE_DIR, f)) for f in files)
+
+def load_budgets(path: str) -> dict:
+    """{"default": {...}, "pages": {"caminho.html": {...}}}; sem arquivo, os padrões."""
+    budgets = {"default": dict(DEFAULT_BUDGETS), "pages": {}}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        budgets["default"].update(data.get("default", {}))
+        budgets["pages"] = data.get("pages", {})
+    return budgets
+
+def budgets_for(page: str, budgets: dict) -> dict:
+    return {**budgets["default"], **budgets["pages"].get(page, {})}
+
+def audit_row(path: str, facts: dict, index: LinkIndex, size=os.path.getsize, budgets=None,
+              external=None) -> dict:
+    page = os.path.relpath(path, BASE_DIR).replace(os.sep, "/")
+    title = facts["title"]
+    desc = facts["description"]
+    canonical = facts["canonical"]
+
+    h1s = facts["h1s"]
     h1 = h1s[0] if h1s else ""
 
-    imgs = soup.find_all("img")
-    imgs_missing_alt = 0
-    for img in imgs:
-        alt = img.get("alt")
-        if alt is None or not str(alt).strip():
-            imgs_missing_alt += 1
-
-    # links internos quebrados (simples: checa se arquivo existe no repo)
-    broken_internal = 0
-    for a in soup.find_all("a"):
-        href = (a.get("href") or "").strip()
-        if not href:
-            continue
-        if href.startswith("http") or href.startswith("mailto:") or href.startswith("#"):
-            continue
-        # normaliza
-        href_clean = href.split("#")[0].split("?")[0]
-        if href_clean.startswith("/"):
-            href_clean = href_clean[1:]
-        target = os.path.join(BASE_DIR, href_clean)
-        # só checa se parece arquivo html
-        if href_clean.endswith(".html") and not os.path.exists(target):
-            broken_internal += 1
+    imgs_missing_alt = facts["images_missing_alt"]
+    # links/imagens locais quebrados, resolvidos relativos à página
+    broken_internal = len(index.broken[page])
+    inbound = index.inbound[page]
+    oversized = oversized_images(page, facts, index, size)
+    unused = unused_preloads(page, facts, index)
+    # só com --external; sem checagem a coluna fica vazia
+    broken_external = broken_count(external["pages"][page], external["results"]) if external else ""
+
+    third_party = [h for h in facts["hosts"] if h not in SITE_HOSTS]
+    metrics = {
+        "page_weight_kib": round(page_weight(page, facts, index, size) / 1024, 1),
+        "render_blocking": facts["render_blocking"],
+        "third_party_origins": len(third_party),
+        "preloads": len(facts["preloads"]),
+    }
+    limits = budgets_for(page, budgets or {"default": DEFAULT_BUDGETS, "pages": {}})
 
     issues = []
     if not title: issues.append("missing_title")
@@ -64,6 +397,16 @@ def audit_html(path: str) -> dict:
     if len(h1s) > 1: issues.append("multiple_h1")
     if imgs_missing_alt > 0: issues.append(f"images_missing_alt:{imgs_missing_alt}")
     if broken_internal > 0: issues.append(f"broken_internal_links:{broken_internal}")
+    if broken_external: issues.append(f"broken_external_links:{broken_external}")
+    if index.is_orphan(page): issues.append("orphan_page")
+    if oversized > 0: issues.append(f"oversized_images:{oversized}")
+    if facts["images_missing_dimensions"] > 0: issues.append(f"images_missing_dimensions:{facts['images_missing_dimensions']}")
+    if facts["images_not_lazy"] > 0: issues.append(f"images_not_lazy:{facts['images_not_lazy']}")
+    if facts["images_lazy_above_fold"] > 0: issues.append(f"lazy_above_fold:{facts['images_lazy_above_fold']}")
+    if unused > 0: issues.append(f"unused_preloads:{unused}")
+    for key, issue in BUDGET_ISSUES.items():
+        if metrics[key] > limits[key]:
+            issues.append(issue)
 
     return {
         "file": os.path.relpath(path, BASE_DIR),
@@ -72,28 +415,185 @@ def audit_html(path: str) -> dict:
         "canonical": canonical,
         "h1": h1,
         "h1_count": len(h1s),
-        "images": len(imgs),
+        "images": facts["images"],
         "images_missing_alt": imgs_missing_alt,
         "broken_internal_links": broken_internal,
+        "broken_external_links": broken_external,
+        "inbound_links": inbound,
+        **metrics,
+        "images_missing_dimensions": facts["images_missing_dimensions"],
+        "images_not_lazy": facts["images_not_lazy"],
+        "images_lazy_above_fold": facts["images_lazy_above_fold"],
         "issues": ";".join(issues) if issues else ""
     }
 
-def main():
-    rows = []
-    for path in iter_html_files(BASE_DIR):
-        # ignore node_modules etc se existirem
-        if ".git" in path:
+def load_cache(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        print(f"⚠️ cache inválido, auditando tudo: {path}")
+        return {}
+    if data.get("version") != CACHE_VERSION:
+        return {}
+    return data.get("pages", {})
+
+def write_atomic(path: str, text: str) -> None:
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def save_cache(path: str, pages: dict) -> None:
+    payload = {"version": CACHE_VERSION, "pages": dict(sorted(pages.items()))}
+    write_atomic(path, json.dumps(payload, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+def collect_facts(paths: list, cache: dict, jobs: int = 1, read=read_bytes,
+                  timings: list | None = None) -> tuple[dict, int]:
+    """Fatos de cada página: do cache quando o hash bate, senão parseia.
+
+    `read` devolve os bytes do arquivo (o pipeline passa o inventário em
+    memória). Retorna ({arquivo relativo: {"sha256", "facts"}}, nº de
+    páginas parseadas). Em `timings` entra (arquivo, início, duração, pid)
+    de cada página parseada.
+    """
+    timings = [] if timings is None else timings
+    pages = {}
+    misses = []
+    parsed = 0
+    for path in paths:
+        rel = os.path.relpath(path, BASE_DIR)
+        data = read(path)
+        digest = sha256_bytes(data)
+        hit = cache.get(rel)
+        if hit and hit.get("sha256") == digest:
+            pages[rel] = hit
             continue
-        rows.append(audit_html(path))
+        parsed += 1
+        if jobs > 1:
+            pages[rel] = {"sha256": digest, "facts": None}
+            misses.append((path, data))
+        else:
+            # serial: os bytes já estão em mãos, parseia direto
+            start = time.perf_counter()
+            pages[rel] = {"sha256": digest, "facts": page_facts(data.decode("utf-8", errors="ignore"))}
+            timings.append((rel.replace(os.sep, "/"), start, time.perf_counter() - start, os.getpid()))
+
+    if misses:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunksize = max(1, len(misses) // (jobs * 4))
+            results = pool.map(facts_for_bytes, [data for _, data in misses], chunksize=chunksize)
+            for (path, _), (facts, timing) in zip(misses, results):
+                rel = os.path.relpath(path, BASE_DIR)
+                pages[rel]["facts"] = facts
+                timings.append((rel.replace(os.sep, "/"), *timing))
+    return pages, parsed
+
+def render_csv(rows: list) -> str:
+    buf = io.StringIO()
+    w = csv.DictWriter(buf, fieldnames=list(rows[0].keys()) if rows else ["file"])
+    w.writeheader()
+    for r in rows:
+        w.writerow(r)
+    return buf.getvalue()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Auditoria SEO das páginas .html do repositório.")
+    parser.add_argument("--jobs", type=int, default=1, metavar="N",
+                        help="audita em N processos (padrão: 1, serial)")
+    parser.add_argument("--force", action="store_true",
+                        help="ignora o cache e reaudita todas as páginas")
+    parser.add_argument("--external", action="store_true",
+                        help="checa também os links externos (cache em analytics_report/external_links_cache.json)")
+    parser.add_argument("--fail-on-budget", action="store_true",
+                        help="sai com erro se alguma página estourar o orçamento (seo_audit/budgets.json)")
+    return parser.parse_args(argv)
+
+def run_audit(site_files: list, jobs: int = 1, force: bool = False, read=read_bytes,
+              size=os.path.getsize, external: bool = False) -> dict:
+    """Audita as páginas de `site_files` (caminhos relativos, com /).
+
+    `read`/`size` dão os bytes e o tamanho de um arquivo (o pipeline passa o
+    inventário em memória). `external` checa também os links externos
+    (seo_audit/external_links.py).
+
+    Devolve {"rows", "index", "written", "stats"}; `written` lista os
+    arquivos que foram de fato reescritos (relatório, cache, índice de
+    links); "stats" traz o tempo de parse por página e os acertos do cache.
+    """
+    # ignore node_modules etc se existirem
+    paths = [os.path.join(BASE_DIR, f) for f in site_files
+             if f.lower().endswith(".html") and ".git" not in f]
+
+    cache = {} if force else load_cache(CACHE_PATH)
+    timings = []
+    pages, parsed = collect_facts(paths, cache, jobs, read, timings)
+
+    # checagens entre páginas refeitas sempre, baratas: links vêm do cache e
+    # viram lookups num set com todos os arquivos do site
+    index = build_link_index(site_files, {
+        rel.replace(os.sep, "/"): entry["facts"]["hrefs"] + entry["facts"]["srcs"]
+        for rel, entry in pages.items()
+    })
+
+    written = []
+    checked = None
+    if external:
+        checked = check_pages({rel.replace(os.sep, "/"): e["facts"] for rel, e in pages.items()},
+                              skip_hosts=SITE_HOSTS, force=force)
+        written += checked["written"]
+
+    budgets = load_budgets(BUDGETS_PATH)
+    rows = [audit_row(p, pages[os.path.relpath(p, BASE_DIR)]["facts"], index, size, budgets, checked)
+            for p in paths]
 
     os.makedirs(os.path.dirname(OUTPUT), exist_ok=True)
-    with open(OUTPUT, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=list(rows[0].keys()) if rows else ["file"])
-        w.writeheader()
-        for r in rows:
-            w.writerow(r)
+    report = render_csv(rows)
+    if not os.path.exists(OUTPUT) or read_bytes(OUTPUT) != report.encode("utf-8"):
+        write_atomic(OUTPUT, report)
+        written.append(OUTPUT)
+
+    if pages != cache:
+        save_cache(CACHE_PATH, pages)
+        written.append(CACHE_PATH)
+    if index.save(LINK_INDEX_PATH):
+        written.append(LINK_INDEX_PATH)
+
+    print(f"OK: gerado {OUTPUT} com {len(rows)} arquivos auditados ({parsed} reprocessado(s), {len(rows) - parsed} do cache).")
+    return {"rows": rows, "index": index, "written": written,
+            "stats": {"files": timings, "hits": len(pages) - parsed, "misses": parsed}}
+
+def over_budget(rows: list) -> list:
+    """[(arquivo, [issues de orçamento])] das páginas que estouraram."""
+    budget_issues = set(BUDGET_ISSUES.values())
+    failed = []
+    for r in rows:
+        hit = [i for i in r["issues"].split(";") if i in budget_issues]
+        if hit:
+            failed.append((r["file"], hit))
+    return failed
+
+def check_budgets(rows: list) -> None:
+    failed = over_budget(rows)
+    for file, hit in failed:
+        print(f"⚠️ {file}: {', '.join(hit)}")
+    if failed:
+        raise SystemExit(f"Orçamento estourado em {len(failed)} página(s) (ver {BUDGETS_PATH}).")
 
-    print(f"OK: gerado {OUTPUT} com {len(rows)} arquivos auditados.")
+def main(argv=None):
+    args = parse_args(argv)
+    # uma passada no disco: a lista serve para achar as páginas e para o índice de links
+    result = run_audit(list(iter_site_files(BASE_DIR)), jobs=args.jobs, force=args.force,
+                       external=args.external)
+    if args.fail_on_budget:
+        check_budgets(result["rows"])
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,422 @@
+from __future__ import annotations
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import ssl
+import time
+from urllib.parse import urljoin, urlsplit
+
+# Checador de links externos (afiliados da Amazon/Mercado Livre, imagens
+# remotas, ...). Só stdlib: asyncio com um pool de conexões keep-alive por
+# host, limite de conexões simultâneas por host (como um navegador), retry
+# com backoff para 429/5xx e cache com validade em disco, para não sondar de
+# novo a cada build o que foi checado há pouco.
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # repo root
+CACHE_PATH = os.path.join(BASE_DIR, "analytics_report", "external_links_cache.json")
+CACHE_VERSION = 1
+REPORT_PATH = os.path.join(BASE_DIR, "analytics_report", "external_links.csv")
+
+# validade do resultado no cache: link quebrado é checado de novo antes
+OK_TTL = 7 * 24 * 3600
+BROKEN_TTL = 24 * 3600
+
+MAX_CONCURRENCY = 64     # requisições em voo no total
+PER_HOST = 6             # conexões simultâneas por host
+TIMEOUT = 10.0           # segundos por conexão/resposta
+RETRIES = 2              # tentativas extras para erro de rede, 429 e 5xx
+BACKOFF = 0.5            # segundos; dobra a cada tentativa
+MAX_RETRY_AFTER = 10.0
+MAX_REDIRECTS = 5
+# corpo de GET lido para manter a conexão; maior que isso, fecha
+MAX_DRAIN = 64 * 1024
+
+USER_AGENT = "Mozilla/5.0 (compatible; SiteLinkChecker/1.0)"
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# servidores que não aceitam HEAD: tenta de novo com GET
+HEAD_FALLBACK_STATUS = {403, 405, 501}
+# bloqueio anti-robô: não dá para dizer que o link está quebrado
+INCONCLUSIVE_STATUS = {401, 403, 429, 503}
+
+PLACEHOLDER_MARKERS = ("{{", "${")
+
+
+def is_external(url: str) -> bool:
+    if not url or any(m in url for m in PLACEHOLDER_MARKERS):
+        return False
+    return url.lower().startswith(("http:", "https:", "//"))
+
+
+def normalize_url(url: str) -> str:
+    """Sem #fragmento (não vai para o servidor) e com esquema em //host."""
+    url = url.strip().split("#")[0]
+    return "https:" + url if url.startswith("//") else url
+
+
+def classify(status: int | None, error: str) -> str:
+    """"ok", "broken" ou "inconclusive" (bloqueio, limite de taxa)."""
+    if status is None:
+        return "broken" if error else "inconclusive"
+    if status < 400:
+        return "ok"
+    if status in INCONCLUSIVE_STATUS:
+        return "inconclusive"
+    return "broken"
+
+
+# --- cliente HTTP ---
+
+class Response:
+    def __init__(self, status: int, headers: dict):
+        self.status = status
+        self.headers = headers
+
+
+class ConnectionPool:
+    """Conexões HTTP/1.1 reaproveitáveis por (esquema, host, porta)."""
+
+    def __init__(self, per_host: int = PER_HOST, timeout: float = TIMEOUT):
+        self.per_host = per_host
+        self.timeout = timeout
+        self.idle = {}     # chave -> [(reader, writer)]
+        self.limits = {}   # chave -> Semaphore
+        self.ssl = ssl.create_default_context()
+        self.opened = 0
+
+    async def request(self, method: str, url: str) -> Response:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"URL não suportada: {url}")
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname, port)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        host = parts.hostname if port in (80, 443) else f"{parts.hostname}:{port}"
+
+        limit = self.limits.setdefault(key, asyncio.Semaphore(self.per_host))
+        async with limit:
+            # conexão ociosa pode ter sido fechada pelo servidor: uma nova tentativa
+            for reused in (True, False):
+                conn = self.take_idle(key) if reused else None
+                if reused and conn is None:
+                    continue
+                if conn is None:
+                    conn = await asyncio.wait_for(
+                        asyncio.open_connection(parts.hostname, port,
+                                                ssl=self.ssl if scheme == "https" else None),
+                        self.timeout)
+                    self.opened += 1
+                try:
+                    return await asyncio.wait_for(self.exchange(key, conn, method, target, host), self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError, EOFError):
+                    conn[1].close()
+                    if not reused:
+                        raise
+                except BaseException:
+                    conn[1].close()
+                    raise
+        raise ConnectionError("conexão fechada")
+
+    def take_idle(self, key):
+        conns = self.idle.get(key)
+        while conns:
+            reader, writer = conns.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer
+        return None
+
+    async def exchange(self, key, conn, method: str, target: str, host: str) -> Response:
+        reader, writer = conn
+        writer.write((
+            f"{method} {target} HTTP/1.1\r\n"
+            f"Host: {host}\r\n"
+            f"User-Agent: {USER_AGENT}\r\n"
+            "Accept: */*\r\n"
+            "Accept-Encoding: identity\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        ).encode("latin-1"))
+        await writer.drain()
+
+        line = await reader.readline()
+        if not line:
+            raise EOFError("resposta vazia")
+        bits = line.decode("latin-1").split(None, 2)
+        if len(bits) < 2 or not bits[1].isdigit():
+            raise ConnectionError(f"linha de status inválida: {line[:80]!r}")
+        status = int(bits[1])
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if await self.drain_body(reader, method, status, headers) and headers.get("connection", "").lower() != "close":
+            self.idle.setdefault(key, []).append(conn)
+        else:
+            writer.close()
+        return Response(status, headers)
+
+    async def drain_body(self, reader, method: str, status: int, headers: dict) -> bool:
+        """Consome o corpo para a conexão poder ser reaproveitada; False = fechar."""
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            return True
+        length = headers.get("content-length", "")
+        if "chunked" in headers.get("transfer-encoding", "").lower() or not length.isdigit():
+            return False
+        if int(length) > MAX_DRAIN:
+            return False
+        await reader.readexactly(int(length))
+        return True
+
+    def close(self) -> None:
+        for conns in self.idle.values():
+            for _, writer in conns:
+                writer.close()
+        self.idle.clear()
+
+
+async def probe(pool: ConnectionPool, url: str) -> dict:
+    """Segue redirecionamentos e devolve {"status", "final_url", "error"}."""
+    current, method = url, "HEAD"
+    for _ in range(MAX_REDIRECTS + 1):
+        resp = await pool.request(method, current)
+        if method == "HEAD" and resp.status in HEAD_FALLBACK_STATUS:
+            method = "GET"
+            resp = await pool.request(method, current)
+        location = resp.headers.get("location")
+        if resp.status in (301, 302, 303, 307, 308) and location:
+            current = urljoin(current, location)
+            continue
+        return {"status": resp.status, "final_url": "" if current == url else current, "error": "",
+                "retry_after": resp.headers.get("retry-after", "")}
+    return {"status": None, "final_url": current, "error": "too_many_redirects"}
+
+
+def retry_delay(attempt: int, after: str) -> float:
+    if after.isdigit():
+        return min(float(after), MAX_RETRY_AFTER)
+    return BACKOFF * (2 ** attempt)
+
+
+async def check_url(pool: ConnectionPool, gate: asyncio.Semaphore, url: str) -> dict:
+    result = {"status": None, "final_url": "", "error": ""}
+    after = ""
+    for attempt in range(RETRIES + 1):
+        async with gate:
+            try:
+                result = await probe(pool, url)
+                after = result.pop("retry_after", "")
+            except asyncio.TimeoutError:
+                result = {"status": None, "final_url": "", "error": "timeout"}
+            except (OSError, ConnectionError, EOFError, asyncio.IncompleteReadError, ValueError) as e:
+                result = {"status": None, "final_url": "", "error": type(e).__name__}
+        retryable = result["status"] in RETRY_STATUS or result["error"] in ("timeout", "ConnectionResetError", "EOFError")
+        if not retryable or attempt == RETRIES:
+            break
+        await asyncio.sleep(retry_delay(attempt, after))
+    result["result"] = classify(result["status"], result["error"])
+    result["checked"] = int(time.time())
+    return result
+
+
+async def check_all(urls: list, concurrency: int = MAX_CONCURRENCY, per_host: int = PER_HOST,
+                    timeout: float = TIMEOUT) -> tuple[dict, int]:
+    """Checa `urls` em paralelo. Retorna ({url: resultado}, conexões abertas)."""
+    pool = ConnectionPool(per_host=per_host, timeout=timeout)
+    gate = asyncio.Semaphore(concurrency)
+    try:
+        results = await asyncio.gather(*(check_url(pool, gate, u) for u in urls))
+    finally:
+        pool.close()
+    return dict(zip(urls, results)), pool.opened
+
+
+# --- cache e relatório ---
+
+def load_cache(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        print(f"⚠️ cache de links externos inválido, checando tudo: {path}")
+        return {}
+    if data.get("version") != CACHE_VERSION:
+        return {}
+    return data.get("urls", {})
+
+
+def is_fresh(entry: dict, now: float) -> bool:
+    ttl = OK_TTL if entry.get("result") == "ok" else BROKEN_TTL
+    return now - entry.get("checked", 0) < ttl
+
+
+def write_if_changed(path: str, text: str) -> bool:
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == text:
+                return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+    return True
+
+
+def render_report(results: dict, pages_by_url: dict) -> str:
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(["url", "result", "status", "final_url", "error", "pages"])
+    for url in sorted(results):
+        r = results[url]
+        w.writerow([url, r["result"], r["status"] or "", r["final_url"], r["error"],
+                    " ".join(sorted(pages_by_url.get(url, ())))])
+    return buf.getvalue()
+
+
+def page_urls(facts: dict) -> list:
+    """Links externos da página (hrefs, imagens e recursos), normalizados."""
+    urls = []
+    for raw in facts["hrefs"] + facts["srcs"] + facts["assets"]:
+        if is_external(raw):
+            url = normalize_url(raw)
+            if url not in urls:
+                urls.append(url)
+    return urls
+
+
+def check_pages(page_facts: dict, skip_hosts=(), force: bool = False,
+                cache_path: str = CACHE_PATH, report_path: str = REPORT_PATH) -> dict:
+    """Checa os links externos de {página: fatos da auditoria}.
+
+    Só sonda URLs fora do cache ou vencidas. Devolve {"results": {url:
+    resultado}, "pages": {página: [urls]}, "written": [...]}.
+    """
+    pages = {}
+    pages_by_url = {}
+    for page, facts in page_facts.items():
+        urls = [u for u in page_urls(facts) if (urlsplit(u).hostname or "").lower() not in skip_hosts]
+        pages[page] = urls
+        for u in urls:
+            pages_by_url.setdefault(u, set()).add(page)
+
+    cache = {} if force else load_cache(cache_path)
+    now = time.time()
+    results = {u: cache[u] for u in pages_by_url if u in cache and is_fresh(cache[u], now)}
+    todo = sorted(u for u in pages_by_url if u not in results)
+
+    t0 = time.perf_counter()
+    opened = 0
+    cached = dict(results)
+    if todo:
+        fresh, opened = asyncio.run(check_all(todo))
+        if len(fresh) > 1 and all(r["status"] is None for r in fresh.values()):
+            # tudo falhou na rede (DNS, sem conexão): o problema é aqui, não nos links
+            print("⚠️ nenhum link externo respondeu (sem rede?): resultados fora do cache")
+            for r in fresh.values():
+                r["result"] = "inconclusive"
+        else:
+            cached.update(fresh)
+        results.update(fresh)
+    elapsed = time.perf_counter() - t0
+
+    written = []
+    payload = json.dumps({"version": CACHE_VERSION, "urls": dict(sorted(cached.items()))},
+                         ensure_ascii=False, indent=2) + "\n"
+    if write_if_changed(cache_path, payload):
+        written.append(cache_path)
+    if write_if_changed(report_path, render_report(results, pages_by_url)):
+        written.append(report_path)
+
+    broken = sum(1 for r in results.values() if r["result"] == "broken")
+    print(f"OK: {len(results)} link(s) externo(s), {len(todo)} checado(s) em {elapsed:.1f}s "
+          f"({opened} conexão(ões)), {len(results) - len(todo)} do cache; {broken} quebrado(s).")
+    return {"results": results, "pages": pages, "written": written}
+
+
+def broken_count(urls: list, results: dict) -> int:
+    return sum(1 for u in urls if results.get(u, {}).get("result") == "broken")
+
+
+# --- autoteste com o servidor local ---
+
+def selftest(count: int) -> None:
+    """Checa `count` URLs contra o stub_server local e confere os resultados."""
+    import tempfile
+    from stub_server import start_stub
+
+    server = start_stub()
+    base = server.base_url
+    expected = {}
+    for i in range(count):
+        kind = i % 8
+        if kind == 0:
+            expected[f"{base}/status/404?i={i}"] = "broken"
+        elif kind == 1:
+            expected[f"{base}/redirect/2?i={i}"] = "ok"
+        elif kind == 2:
+            expected[f"{base}/no-head/{i}"] = "ok"
+        elif kind == 3:
+            expected[f"{base}/flaky/{i}"] = "ok"
+        elif kind == 4:
+            expected[f"{base}/status/410?i={i}"] = "broken"
+        else:
+            expected[f"{base}/ok/{i}"] = "ok"
+    expected[f"{base}/loop"] = "broken"
+    expected["http://127.0.0.1:9/closed"] = "broken"  # porta sem servidor
+
+    facts = {"selftest.html": {"hrefs": list(expected), "srcs": [], "assets": []}}
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "cache.json")
+        report_path = os.path.join(tmp, "report.csv")
+        first = check_pages(facts, cache_path=cache_path, report_path=report_path)
+        hits = dict(server.hits)
+        second = check_pages(facts, cache_path=cache_path, report_path=report_path)
+    server.shutdown()
+
+    wrong = [u for u, want in expected.items() if first["results"][u]["result"] != want]
+    for u in wrong[:10]:
+        print(f"⚠️ {u}: esperado {expected[u]}, veio {first['results'][u]}")
+    if server.hits != hits:
+        wrong.append("cache")
+        print("⚠️ a 2ª rodada fez requisições: o cache não foi usado")
+    if second["results"] != first["results"]:
+        wrong.append("cache")
+        print("⚠️ a 2ª rodada deu resultados diferentes")
+    print(f"requisições: {sum(hits.values())} ({', '.join(f'{k} {v}' for k, v in sorted(hits.items()))})")
+    if wrong:
+        raise SystemExit(f"Autoteste falhou: {len(wrong)} problema(s).")
+    print("OK: autoteste do checador de links passou.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Checa os links externos das páginas do site.")
+    parser.add_argument("--force", action="store_true",
+                        help="ignora o cache e checa todas as URLs de novo")
+    parser.add_argument("--selftest", type=int, metavar="N", nargs="?", const=2000,
+                        help="checa N URLs (padrão: 2000) num servidor local, sem rede")
+    args = parser.parse_args(argv)
+    if args.selftest:
+        selftest(args.selftest)
+        return
+
+    # mesmo caminho da auditoria: fatos das páginas do cache, hosts do próprio site ignorados
+    from audit_site import SITE_HOSTS, collect_facts, load_cache as load_audit_cache, CACHE_PATH as AUDIT_CACHE
+    from link_index import iter_site_files
+    paths = [os.path.join(BASE_DIR, f) for f in iter_site_files(BASE_DIR) if f.lower().endswith(".html")]
+    pages, _ = collect_facts(paths, load_audit_cache(AUDIT_CACHE))
+    check_pages({rel.replace(os.sep, "/"): e["facts"] for rel, e in pages.items()},
+                skip_hosts=SITE_HOSTS, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+from __future__ import annotations
+import json
+import os
+import posixpath
+from collections import Counter
+from urllib.parse import unquote
+
+# prefixos que não são arquivos do site
+EXTERNAL_PREFIXES = ("http:", "https:", "//", "mailto:", "tel:", "javascript:", "data:", "#")
+
+# placeholders de template ({{CTA_URL}}, ${href}) não são links de verdade
+PLACEHOLDER_MARKERS = ("{{", "${")
+
+# páginas de entrada: nunca contam como órfãs
+ENTRY_PAGES = {"index.html"}
+# templates e corpos de artigo não são publicados: não faz sentido chamar de órfãos
+UNPUBLISHED_PREFIXES = ("content_pipeline/",)
+
+# dist/ é a cópia otimizada do site (scripts/optimize_assets.py)
+SKIP_DIRS = {".git", "dist"}
+
+
+def iter_site_files(root: str):
+    """Todos os arquivos do repo (caminho relativo, com /), numa passada do os.walk."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        rel_dir = os.path.relpath(dirpath, root)
+        for fn in filenames:
+            rel = fn if rel_dir == "." else os.path.join(rel_dir, fn)
+            yield rel.replace(os.sep, "/")
+
+
+def is_local(href: str) -> bool:
+    if not href:
+        return False
+    if any(m in href for m in PLACEHOLDER_MARKERS):
+        return False
+    return not href.lower().startswith(EXTERNAL_PREFIXES)
+
+
+def normalize(page: str, href: str) -> str | None:
+    """Caminho (relativo à raiz) que `href` aponta a partir de `page`.
+
+    Resolve relativo à pasta da página (artigos/x.html -> artigos/...),
+    tira ?query e #fragmento e decodifica %20. None = sai da raiz do site.
+    """
+    path = unquote(href.split("#")[0].split("?")[0])
+    if not path:
+        return page  # só ?query: a própria página
+    trailing = path.endswith("/")
+    if path.startswith("/"):
+        path = path.lstrip("/")
+    else:
+        path = posixpath.join(posixpath.dirname(page), path)
+    path = posixpath.normpath(path) if path else "."
+    if path == ".." or path.startswith("../"):
+        return None
+    if path == ".":
+        return "index.html"
+    return path + "/" if trailing else path
+
+
+class LinkIndex:
+    """Grafo de links do site: montado uma vez, consultado com lookups em set.
+
+    - files:   todos os arquivos do site
+    - links:   página -> alvos locais resolvidos (html, imagens, pdf, ...)
+    - broken:  página -> hrefs locais que não existem
+    - inbound: página -> nº de páginas (outras) que linkam para ela
+    """
+
+    def __init__(self, files):
+        self.files: set[str] = set(files)
+        self.dirs: set[str] = {posixpath.dirname(f) for f in self.files}
+        self.links: dict[str, list[str]] = {}
+        self.broken: dict[str, list[str]] = {}
+        self.inbound: Counter = Counter()
+
+    def resolve(self, page: str, href: str) -> str | None:
+        """Arquivo servido para `href`, ou None se não existir (link quebrado)."""
+        target = normalize(page, href)
+        if target is None:
+            return None
+        if target.endswith("/"):
+            index = target + "index.html"
+            return index if index in self.files else None
+        if target in self.files:
+            return target
+        # /artigos -> /artigos/index.html ; /sobre-nos -> sobre-nos.html
+        if target in self.dirs and target + "/index.html" in self.files:
+            return target + "/index.html"
+        if target + ".html" in self.files:
+            return target + ".html"
+        return None
+
+    def add_page(self, page: str, hrefs) -> None:
+        resolved = []
+        broken = []
+        for href in hrefs:
+            if not is_local(href):
+                continue
+            target = self.resolve(page, href)
+            if target is None:
+                broken.append(href)
+            else:
+                resolved.append(target)
+        # ordem estável, sem duplicatas
+        self.links[page] = list(dict.fromkeys(resolved))
+        self.broken[page] = broken
+
+    def finalize(self) -> "LinkIndex":
+        self.inbound = Counter()
+        for page, targets in self.links.items():
+            for t in targets:
+                if t != page and t in self.links:
+                    self.inbound[t] += 1
+        return self
+
+    def is_orphan(self, page: str) -> bool:
+        return (page in self.links and self.inbound[page] == 0
+                and page not in ENTRY_PAGES and not page.startswith(UNPUBLISHED_PREFIXES))
+
+    def orphans(self) -> list[str]:
+        return sorted(p for p in self.links if self.is_orphan(p))
+
+    def to_dict(self) -> dict:
+        return {
+            "pages": {
+                page: {
+                    "links": self.links[page],
+                    "broken": self.broken[page],
+                    "inbound": self.inbound[page],
+                }
+                for page in sorted(self.links)
+            },
+            "orphans": self.orphans(),
+        }
+
+    def save(self, path: str) -> bool:
+        """Exporta em JSON; só reescreve se mudou. Retorna True se escreveu."""
+        text = json.dumps(self.to_dict(), ensure_ascii=False, indent=2) + "\n"
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                if f.read() == text:
+                    return False
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+        return True
+
+
+def build_link_index(files, page_links: dict) -> LinkIndex:
+    """files: arquivos do site; page_links: página -> hrefs/srcs crus."""
+    index = LinkIndex(files)
+    for page, hrefs in page_links.items():
+        index.add_page(page, hrefs)
+    return index.finalize()
+
+
+def load_link_index(path: str, files=()) -> LinkIndex | None:
+    """Reabre o índice exportado pela auditoria (sitemap, dicas de recursos).
+
+    `files` (todos os arquivos do site) só é preciso para resolve(); o
+    grafo (links, broken, inbound) vem pronto do JSON.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    pages = data.get("pages", {})
+    index = LinkIndex(files)
+    for page, entry in pages.items():
+        index.links[page] = entry.get("links", [])
+        index.broken[page] = entry.get("broken", [])
+        index.inbound[page] = entry.get("inbound", 0)
+    return index
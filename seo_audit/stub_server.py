@@ -0,0 +1,107 @@
+from __future__ import annotations
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Servidor HTTP local que imita os casos do checador de links externos, para
+# testar sem rede:
+#
+#   /ok/...            200
+#   /status/<código>   responde <código> (404, 410, 500, ...)
+#   /redirect/<n>      n redirecionamentos 301 até /ok
+#   /loop              redireciona para si mesmo
+#   /no-head/...       405 no HEAD, 200 no GET (como alguns CDNs)
+#   /flaky/<id>        503 na 1ª requisição de cada <id>, depois 200
+#   /slow/<ms>         espera <ms> antes de responder 200
+#
+# Conta as requisições recebidas (por método) para o autoteste conferir o
+# cache; mantém as conexões abertas (HTTP/1.1) como um servidor de verdade.
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "StubLinks/1"
+
+    def log_message(self, fmt, *args):
+        pass  # silencioso: milhares de requisições por teste
+
+    def do_HEAD(self):
+        self.respond(head=True)
+
+    def do_GET(self):
+        self.respond(head=False)
+
+    def respond(self, head: bool):
+        stub = self.server
+        with stub.lock:
+            stub.hits[self.command] = stub.hits.get(self.command, 0) + 1
+        parts = self.path.split("?")[0].strip("/").split("/")
+        kind, arg = parts[0], (parts[1] if len(parts) > 1 else "")
+
+        status, headers = 200, {}
+        if kind == "status" and arg.isdigit():
+            status = int(arg)
+        elif kind == "redirect" and arg.isdigit():
+            n = int(arg)
+            status, headers = 301, {"Location": f"/redirect/{n - 1}" if n > 1 else "/ok/"}
+        elif kind == "loop":
+            status, headers = 302, {"Location": "/loop"}
+        elif kind == "no-head" and head:
+            status = 405
+        elif kind == "flaky":
+            with stub.lock:
+                first = arg not in stub.flaky_seen
+                stub.flaky_seen.add(arg)
+            if first:
+                status, headers = 503, {"Retry-After": "0"}
+        elif kind == "slow" and arg.isdigit():
+            time.sleep(int(arg) / 1000)
+        elif kind != "ok" and kind != "no-head":
+            status = 404
+
+        body = f"stub {status}\n".encode("ascii")
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, port: int = 0):
+        super().__init__(("127.0.0.1", port), StubHandler)
+        self.lock = threading.Lock()
+        self.hits = {}
+        self.flaky_seen = set()
+
+    def handle_error(self, request, client_address):
+        pass  # cliente que fecha a conexão no meio faz parte do teste
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+def start_stub(port: int = 0) -> StubServer:
+    """Sobe o servidor numa thread (porta 0 = qualquer livre); pare com .shutdown()."""
+    server = StubServer(port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor HTTP local para testar o checador de links.")
+    parser.add_argument("--port", type=int, default=8765)
+    server = StubServer(parser.parse_args().port)
+    print(f"OK: servidor de teste em {server.base_url} (Ctrl+C para sair)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,81 @@
+# tests/test_json_stream.py
+"""content_pipeline/json_stream.py contra o json.load, com o arquivo cortado
+em blocos de todos os tamanhos (o valor cai na fronteira em algum deles)."""
+from pathlib import Path
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "content_pipeline"))
+
+from json_stream import iter_array_items  # noqa: E402
+
+
+class IterArrayItemsTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def write(self, text: str) -> None:
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def assertSameAsJsonLoad(self, text: str, key: str = "articles"):
+        self.write(text)
+        with open(self.path, "r", encoding="utf-8") as f:
+            expected = json.load(f).get(key, [])
+        for chunk in range(1, len(text) + 2):
+            with self.subTest(chunk=chunk):
+                self.assertEqual(list(iter_array_items(self.path, key, chunk_size=chunk)), expected)
+
+    def assertInvalid(self, text: str):
+        self.write(text)
+        with open(self.path, "r", encoding="utf-8") as f:
+            self.assertRaises(ValueError, json.load, f)
+        for chunk in range(1, len(text) + 2):
+            with self.subTest(chunk=chunk):
+                with self.assertRaises(ValueError):
+                    list(iter_array_items(self.path, "articles", chunk_size=chunk))
+
+    def test_strings_with_escaped_quotes_and_brackets(self):
+        self.assertSameAsJsonLoad(r'{"articles": [{"title": "a \"]\" b ,} [x]", "slug": "s\\"}, '
+                                  r'"é😀 \/ fim"]}')
+
+    def test_numbers(self):
+        self.assertSameAsJsonLoad('{"articles": [1.5, -0.25, 123456, 6.02e23, 0, -7E-3]}')
+
+    def test_literals(self):
+        self.assertSameAsJsonLoad('{"articles": [true, false, null, {"a": null}]}')
+
+    def test_whitespace_between_items(self):
+        self.assertSameAsJsonLoad('\n{ "articles" :\n\t[ 1 ,\r\n "x"\n ,  {"a" : [ ] }  ] \n}\n')
+
+    def test_other_keys_before_and_after(self):
+        self.assertSameAsJsonLoad('{"version": 3, "meta": {"articles": [9]}, "articles": [{"n": 1}, {"n": 2}],'
+                                  ' "tail": ["]", "}"]}')
+
+    def test_empty_and_missing_array(self):
+        self.assertSameAsJsonLoad('{"articles": []}')
+        self.assertSameAsJsonLoad('{}')
+        self.assertSameAsJsonLoad('{"other": [1, 2]}')
+
+    def test_trailing_comma(self):
+        self.assertInvalid('{"articles": [1, 2,]}')
+        self.assertInvalid('{"articles": [1, 2], }')
+
+    def test_missing_comma(self):
+        self.assertInvalid('{"articles": [1 2]}')
+        self.assertInvalid('{"articles": [{"a": 1} {"a": 2}]}')
+
+    def test_truncated(self):
+        self.assertInvalid('{"articles": [1, 2')
+        self.assertInvalid('{"articles": ["abc')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+# tests/test_minify.py
+"""Regressões do scripts/minify.py: o que sai tem de significar o mesmo."""
+from pathlib import Path
+import sys
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from minify import minify_css, minify_html, minify_js  # noqa: E402
+
+
+class MinifyJsTest(unittest.TestCase):
+    def test_newline_kept_where_asi_may_apply(self):
+        self.assertEqual(minify_js("a = 1\nb = 2\n"), "a=1\nb=2")
+        self.assertEqual(minify_js("return\nx"), "return\nx")
+        self.assertEqual(minify_js("a\n++b"), "a\n++b")
+
+    def test_newline_dropped_inside_brackets(self):
+        self.assertEqual(minify_js("foo(\n  1,\n  2\n)\n"), "foo(1,2)")
+        self.assertEqual(minify_js("if (x) {\n  y()\n}\n"), "if(x){y()}")
+
+    def test_regex_after_operator_or_keyword(self):
+        self.assertEqual(minify_js("x = /a  b/g.test(s)"), "x=/a  b/g.test(s)")
+        self.assertEqual(minify_js("return /[/]  x/.test(s)"), "return/[/]  x/.test(s)")
+        self.assertEqual(minify_js("f(a, /\\/  x/)"), "f(a,/\\/  x/)")
+
+    def test_division_after_value(self):
+        self.assertEqual(minify_js("x = a / 2 / b"), "x=a/2/b")
+        self.assertEqual(minify_js("x = (a) / 2 / b"), "x=(a)/2/b")
+        self.assertEqual(minify_js("x = a[0] / 2 / b"), "x=a[0]/2/b")
+
+    def test_division_after_postfix_increment(self):
+        # "/ 2 /" não é regex: o comentário no fim tem de sumir
+        self.assertEqual(minify_js("x = a++ / 2 / b; // it's\ny = 1"), "x=a++/2/b;y=1")
+        self.assertEqual(minify_js("x = a-- / 2"), "x=a--/2")
+        self.assertEqual(minify_js("x = a + +/y/.source"), "x=a+ +/y/.source")
+
+    def test_operators_that_would_merge(self):
+        self.assertEqual(minify_js("a - -b"), "a- -b")
+        self.assertEqual(minify_js("a + +b"), "a+ +b")
+        self.assertEqual(minify_js("a / /re/.source.length"), "a/ /re/.source.length")
+        self.assertEqual(minify_js("typeof  x"), "typeof x")
+
+    def test_strings_and_templates_intact(self):
+        self.assertEqual(minify_js('u = "http://x.com/*a*/"  ;'), 'u="http://x.com/*a*/";')
+        self.assertEqual(minify_js("s = 'it\\'s  // no'"), "s='it\\'s  // no'")
+        self.assertEqual(minify_js("t = `a  ${ b + '}' }  c`"), "t=`a  ${ b + '}' }  c`")
+
+    def test_comments_removed(self):
+        self.assertEqual(minify_js("a/**/b"), "a b")
+        self.assertEqual(minify_js("a /* x */ + b // fim"), "a+b")
+        self.assertEqual(minify_js("a = 1 /* \n */ b = 2"), "a=1\nb=2")
+
+
+class MinifyCssTest(unittest.TestCase):
+    def test_spaces_and_last_semicolon(self):
+        self.assertEqual(minify_css("a , b > c {\n  color: red ;\n  margin: 0 ;\n}\n"),
+                         "a,b>c{color: red;margin: 0}")
+
+    def test_strings_and_comments(self):
+        self.assertEqual(minify_css('a::before { content: "  ;  { } /* x */" }'),
+                         'a::before{content: "  ;  { } /* x */"}')
+        self.assertEqual(minify_css("/*! licença */ a{b:c} /* some */"), "/*! licença */ a{b:c}")
+        self.assertEqual(minify_css("a/**/b{c:d}"), "a b{c:d}")
+
+
+class MinifyHtmlTest(unittest.TestCase):
+    def test_space_collapsed_outside_tags(self):
+        self.assertEqual(minify_html("<p>a   b\n\n  c</p>"), "<p>a b\nc</p>\n")
+
+    def test_attribute_values_intact(self):
+        html = '<p  title="a   b\n c"   class=\'x  y\' data-x="1 > 0">t</p>'
+        self.assertEqual(minify_html(html), '<p title="a   b\n c" class=\'x  y\' data-x="1 > 0">t</p>\n')
+
+    def test_stray_quote_does_not_swallow_page(self):
+        html = '<div class="x""></div>\n\n  <p>a   b</p>'
+        self.assertEqual(minify_html(html), '<div class="x""></div>\n<p>a b</p>\n')
+
+    def test_pre_and_textarea_intact(self):
+        html = "<pre>  a\n\n   b  </pre>  <textarea name=t>  x\n  y</textarea>"
+        self.assertEqual(minify_html(html), "<pre>  a\n\n   b  </pre> <textarea name=t>  x\n  y</textarea>\n")
+
+    def test_script_and_style_minified(self):
+        html = ("<script>\n  var a = 1 // x\n  var b = 2\n</script>"
+                '<script type="application/ld+json">{ "a" : [1, 2] }</script>'
+                "<style> a { color : red ; } </style>")
+        self.assertEqual(minify_html(html),
+                         '<script>var a=1\nvar b=2</script><script type="application/ld+json">{"a":[1,2]}</script>'
+                         "<style>a{color : red}</style>\n")
+
+    def test_unknown_script_type_intact(self):
+        html = '<script type="text/template">  <p>  {{ x }}  </p>  </script>'
+        self.assertEqual(minify_html(html), html + "\n")
+
+    def test_comments(self):
+        html = "<p>a<!-- some --> b</p><!--[if IE]><p>ie</p><![endif]-->"
+        self.assertEqual(minify_html(html), "<p>a b</p><!--[if IE]><p>ie</p><![endif]-->\n")
+
+
+if __name__ == "__main__":
+    unittest.main()